@@ -0,0 +1,90 @@
+import argparse
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Decode cost of an animated GIF/WebP wallpaper before and after conversion.
+#
+# Run from code/scripts:  python bin/tools/animation_bench.py [ANIMATION] [--screen 1920x1080]
+#
+# Converts ANIMATION with convert_animation() (without one, Pillow generates
+# a 1280x720, 100-frame GIF), then plays the original and the video for
+# --seconds each with mpv (decoding only: --vo=null) and reports the CPU time
+# mpv used. POSIX only; needs Pillow, ffmpeg and mpv.
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from core.animation_converter import convert_animation, frame_delays
+from utils.path_utils import get_ffmpeg_path
+
+
+def make_test_gif(path: Path, width: int = 1280, height: int = 720, count: int = 100):
+    from PIL import Image, ImageDraw
+
+    frames = []
+    for i in range(count):
+        frame = Image.new("RGB", (width, height), (20, 24, 40))
+        draw = ImageDraw.Draw(frame)
+        x = i * (width - 200) // count
+        draw.ellipse((x, height // 3, x + 200, height // 3 + 200), fill=(240, 180, 60))
+        draw.rectangle((0, height - 40 - i, width, height), fill=(60, 120 + i, 90))
+        frames.append(frame.quantize(64))
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=40, loop=0)
+
+
+def child_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def play(mpv: str, path: str, seconds: float) -> tuple:
+    before = child_cpu_seconds()
+    started = time.perf_counter()
+    subprocess.run([mpv, "--no-config", "--really-quiet", "--vo=null", "--no-audio", "--loop-file=inf",
+                    f"--length={seconds}", "--hwdec=no", path], check=True)
+    return child_cpu_seconds() - before, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure mpv CPU use on an animated image and its video.")
+    parser.add_argument("animation", nargs="?")
+    parser.add_argument("--screen", default="1920x1080")
+    parser.add_argument("--codec", choices=("h264", "vp9"), default="h264")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.screen.split("x"))
+
+    mpv = shutil.which("mpv")
+    ffmpeg = get_ffmpeg_path()
+    if not mpv or not ffmpeg:
+        sys.exit("mpv and ffmpeg are required")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(args.animation) if args.animation else Path(tmp) / "test.gif"
+        if not args.animation:
+            print("Generating a 100-frame 1280x720 test GIF...")
+            make_test_gif(source)
+        delays = frame_delays(str(source))
+        print(f"{source.name}: {len(delays)} frames, {sum(delays) / 1000:.1f} s, "
+              f"{source.stat().st_size / 1048576:.1f} MB")
+
+        started = time.perf_counter()
+        video = convert_animation(str(source), tmp, str(ffmpeg), width, height, codec=args.codec)
+        print(f"{Path(video).name}: {Path(video).stat().st_size / 1048576:.1f} MB, "
+              f"converted in {time.perf_counter() - started:.1f} s")
+
+        results = {}
+        for label, path in (("original", str(source)), ("video", video)):
+            cpu, wall = play(mpv, path, args.seconds)
+            results[label] = cpu / wall
+            print(f"  {label:8s} mpv CPU {cpu:6.2f} s over {wall:5.1f} s = {cpu / wall * 100:5.1f}% of one core")
+        if results["video"]:
+            print(f"  decode cost ratio: {results['original'] / results['video']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Drive the wallpaper apply pipeline with a fake controller: check that
+# submitting never waits for the backend, that a burst of applies sets the
+# desktop once, and that failures come back as failed.
+#
+# Run from code/scripts:  python bin/tools/apply_pipeline_sim.py [-v]
+#
+# The fake controller sleeps like a slow desktop backend (--backend-ms) and
+# records its calls; prepare_image sleeps like a rendition (--prepare-ms).
+# Exits with status 1 on a failed check or when a submit() call takes longer
+# than --submit-budget-ms.
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from PySide6.QtCore import Qt
+
+from core.apply_pipeline import ApplyPipeline
+
+
+class FakeController:
+    def __init__(self, backend_seconds: float):
+        self.backend_seconds = backend_seconds
+        self.current_is_video = False
+        self.alive = True
+        self.calls = []
+
+    def stop(self):
+        self.calls.append(("stop", None))
+        self.current_is_video = False
+
+    def start_video(self, path: str):
+        time.sleep(self.backend_seconds)
+        self.calls.append(("video", Path(path).name))
+        self.current_is_video = True
+
+    def start_image(self, path: str) -> bool:
+        time.sleep(self.backend_seconds)
+        self.calls.append(("image", Path(path).name))
+        if self.current_is_video:
+            self.stop()
+        self.current_is_video = False
+        return not Path(path).name.startswith("rejected")
+
+    def player_alive(self) -> bool:
+        return self.alive
+
+
+class Recorder:
+    """
+    Collects the pipeline's signals; wait() returns once a job has ended.
+
+    There is no event loop here, so signals sent from the worker would be
+    queued and never arrive; the connections are direct and _record runs on
+    whichever thread emitted.
+    """
+
+    def __init__(self, pipeline: ApplyPipeline):
+        self.events = []
+        self._ended = threading.Condition()
+        for name in ("finished", "failed", "cancelled"):
+            getattr(pipeline, name).connect(lambda job, name=name: self._record(name, job),
+                                            Qt.ConnectionType.DirectConnection)
+
+    def _record(self, name: str, job: dict):
+        with self._ended:
+            self.events.append((name, job))
+            self._ended.notify_all()
+
+    def wait(self, count: int, timeout: float = 10.0) -> bool:
+        with self._ended:
+            return self._ended.wait_for(lambda: len(self.events) >= count, timeout)
+
+    def outcome(self, job_id: int):
+        return next(((name, job) for name, job in self.events if job["id"] == job_id), (None, None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the wallpaper apply pipeline with a fake controller.")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("--backend-ms", type=float, default=300.0)
+    parser.add_argument("--prepare-ms", type=float, default=150.0)
+    parser.add_argument("--submit-budget-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    failures = 0
+
+    def check(ok: bool, description: str):
+        nonlocal failures
+        failures += not ok
+        if args.verbose or not ok:
+            print(f"{'ok  ' if ok else 'FAIL'} {description}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {}
+        for name in [f"photo{index}.jpg" for index in range(10)] + ["clip.mp4", "broken.webm", "rejected.png"]:
+            files[name] = Path(tmp) / name
+            files[name].write_bytes(b"\0")
+
+        controller = FakeController(args.backend_ms / 1000)
+
+        def prepare(path: str) -> str:
+            time.sleep(args.prepare_ms / 1000)
+            return path
+
+        pipeline = ApplyPipeline(controller, prepare_image=prepare, verify_seconds=0.2)
+        recorder = Recorder(pipeline)
+        pipeline.start()
+        try:
+            # 1. A burst of ten images, as fast as a user can click
+            submit_ms = []
+            ids = []
+            for index in range(10):
+                started = time.perf_counter()
+                ids.append(pipeline.submit(str(files[f"photo{index}.jpg"])))
+                submit_ms.append((time.perf_counter() - started) * 1000)
+                time.sleep(0.02)
+            recorder.wait(10)
+            applied = [name for kind, name in controller.calls if kind == "image"]
+            check(applied == ["photo9.jpg"], f"burst of 10 applied {applied}")
+            cancelled = sum(name == "cancelled" for name, _ in recorder.events)
+            check(cancelled == 9, f"burst: {cancelled} superseded applies cancelled")
+            finished = recorder.outcome(ids[-1])[1]
+            print(f"burst: last wallpaper set {(time.perf_counter() - started) * 1000:.0f} ms after its click;"
+                  f" stages {finished['timings'] if finished else None}")
+
+            # 2. Image -> video -> image: the player is stopped only when leaving the video
+            controller.calls.clear()
+            recorder.events.clear()
+            for name in ("clip.mp4", "photo1.jpg"):
+                started = time.perf_counter()
+                pipeline.submit(str(files[name]))
+                submit_ms.append((time.perf_counter() - started) * 1000)
+                recorder.wait(len(recorder.events) + 1)
+            check(controller.calls == [("video", "clip.mp4"), ("image", "photo1.jpg"), ("stop", None)],
+                  f"image -> video -> image ran {controller.calls}")
+
+            # 3. Failures come back as failed, with the stage they happened in
+            recorder.events.clear()
+            missing = pipeline.submit(str(Path(tmp) / "gone.jpg"))
+            recorder.wait(1)
+            rejected = pipeline.submit(str(files["rejected.png"]))
+            recorder.wait(2)
+            controller.alive = False
+            broken = pipeline.submit(str(files["broken.webm"]))
+            recorder.wait(3)
+            controller.alive = True
+            for job_id, stage in ((missing, "resolve"), (rejected, "backend"), (broken, "verify")):
+                name, job = recorder.outcome(job_id)
+                check(name == "failed" and job["stage"] == stage,
+                      f"job {job_id}: {name} at {job['stage'] if job else None} ({job['error'] if job else ''})")
+
+            # 4. A stop queued behind an apply replaces it; the apply already at the desktop finishes
+            controller.calls.clear()
+            recorder.events.clear()
+            pipeline.submit(str(files["photo2.jpg"]))
+            time.sleep((args.prepare_ms + args.backend_ms / 2) / 1000)
+            pipeline.submit(str(files["clip.mp4"]))
+            pipeline.submit_stop()
+            recorder.wait(3)
+            # (start_image may stop the player the failed video left behind first)
+            check(controller.calls[0] == ("image", "photo2.jpg") and controller.calls[-1] == ("stop", None)
+                  and ("video", "clip.mp4") not in controller.calls, f"apply, apply, stop ran {controller.calls}")
+        finally:
+            pipeline.stop()
+
+    worst = max(submit_ms)
+    print(f"submit(): worst {worst:.2f} ms with a {args.backend_ms:.0f} ms backend")
+    check(worst <= args.submit_budget_ms, f"submit() within {args.submit_budget_ms:.0f} ms")
+    print(f"{failures} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
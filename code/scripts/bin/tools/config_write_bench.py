@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Run from code/scripts:  python bin/tools/config_write_bench.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import models.config as config_module
+from models.config import Config
+
+
+def eprint(*args, **kwargs):
+    """Prints status messages to standard error (stderr)."""
+    print(*args, file=sys.stderr, **kwargs)
+
+
+def simulate_tick(config: Config, tick: int):
+    """What one scheduler change does to the config"""
+    # _apply_video / _apply_image_with_fade
+    config.set_last_video(f"/wallpapers/wallpaper_{tick}.mp4")
+    # The settings dialog re-applies unchanged scheduler settings on every change
+    config.set_scheduler_settings("/wallpapers", 30, True)
+    config.set_range_preference("all")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count config.json writes per scheduler tick.")
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.05,
+                        help="Seconds between ticks (the real scheduler uses minutes).")
+    parser.add_argument("--debounce", type=float, default=0.02)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_module.CONFIG_PATH = Path(tmp) / "config.json"
+        config = Config(debounce_seconds=args.debounce)
+        start_writes = config.write_count
+
+        # Every set() used to rewrite the file; count them for comparison
+        set_calls = 0
+        original_set = config.set
+
+        def counting_set(key, value):
+            nonlocal set_calls
+            set_calls += 1
+            original_set(key, value)
+
+        config.set = counting_set
+
+        started = time.perf_counter()
+        for tick in range(args.ticks):
+            simulate_tick(config, tick)
+            time.sleep(args.interval)
+        config.flush()
+        elapsed = time.perf_counter() - started
+
+        writes = config.write_count - start_writes
+        print(f"ticks:                 {args.ticks}")
+        print(f"writes before (1/set): {set_calls} ({set_calls / args.ticks:.2f} per tick)")
+        print(f"writes now:            {writes} ({writes / args.ticks:.2f} per tick)")
+        print(f"elapsed:               {elapsed:.2f}s")
+        print(f"file size:             {os.path.getsize(config_module.CONFIG_PATH)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import sys
+import time
+import random
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for the tapeciarnia.pl shuffle endpoint.
+#
+# Start it and point the app at it:
+#   python bin/tools/fake_shuffle_api.py --port 8765
+#   TAPECIARNIA_SHUFFLE_API=http://127.0.0.1:8765/shuffle python main.py
+#
+# POST /shuffle?pokaz=all|all_mp4&x=W&y=H answers like the real API with
+# {"url": ..., "type": "img"|"mp4"}; the URL points back at this server,
+# which serves a small generated file under /files/<name>.
+#
+# Faults can be injected to exercise the client's retries and circuit breaker:
+#   --slow-rate 0.3 --slow-seconds 12   answer 30% of API calls after 12 s
+#   --wrong-type-rate 0.5               return "mp4" for static requests and vice versa
+#   --error-rate 0.2                    answer with HTTP 503
+
+# --- CONFIGURATION ---
+DEFAULT_PORT = 8765
+DEFAULT_FILE_SIZE = 256 * 1024
+
+# Minimal valid headers so the app's extension/type checks are happy
+FILE_HEADERS = {
+    ".jpg": b"\xff\xd8\xff\xe0\x00\x10JFIF\x00",
+    ".mp4": b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom",
+}
+
+
+def eprint(*args, **kwargs):
+    """Prints status messages to standard error (stderr)."""
+    print(*args, file=sys.stderr, **kwargs)
+
+
+class ShuffleHandler(BaseHTTPRequestHandler):
+    file_size = DEFAULT_FILE_SIZE
+    slow_rate = 0.0
+    slow_seconds = 12.0
+    wrong_type_rate = 0.0
+    error_rate = 0.0
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        if parsed.path != "/shuffle":
+            self.send_error(404)
+            return
+
+        # Drain the form body, the query string carries the same values
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        if length:
+            self.rfile.read(length)
+
+        if random.random() < self.slow_rate:
+            time.sleep(self.slow_seconds)
+        if random.random() < self.error_rate:
+            self.send_error(503, "Injected failure")
+            return
+
+        params = parse_qs(parsed.query)
+        pokaz = params.get("pokaz", ["all"])[0]
+        width = params.get("x", ["1920"])[0]
+        height = params.get("y", ["1080"])[0]
+
+        is_animated = pokaz == "all_mp4"
+        if random.random() < self.wrong_type_rate:
+            is_animated = not is_animated
+        ext = ".mp4" if is_animated else ".jpg"
+        name = f"fake_{width}x{height}_{uuid.uuid4().hex[:8]}{ext}"
+        host, port = self.server.server_address[:2]
+
+        self._send_json({
+            "url": f"http://{host}:{port}/files/{name}",
+            "type": "mp4" if is_animated else "img",
+        })
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if not parsed.path.startswith("/files/"):
+            self.send_error(404)
+            return
+
+        ext = os.path.splitext(parsed.path)[1].lower()
+        header = FILE_HEADERS.get(ext, b"")
+        body = header + b"\x00" * max(0, self.file_size - len(header))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4" if ext == ".mp4" else "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", f'"{os.path.basename(parsed.path)}"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        eprint(f"[fake-shuffle] {self.address_string()} - {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the shuffle wallpaper API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--file-size", type=int, default=DEFAULT_FILE_SIZE,
+                        help="Size in bytes of each served wallpaper file.")
+    parser.add_argument("--slow-rate", type=float, default=0.0,
+                        help="Fraction of API calls answered after --slow-seconds.")
+    parser.add_argument("--slow-seconds", type=float, default=12.0)
+    parser.add_argument("--wrong-type-rate", type=float, default=0.0,
+                        help="Fraction of API calls answered with the other wallpaper type.")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of API calls answered with HTTP 503.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for repeatable fault injection.")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    ShuffleHandler.file_size = args.file_size
+    ShuffleHandler.slow_rate = args.slow_rate
+    ShuffleHandler.slow_seconds = args.slow_seconds
+    ShuffleHandler.wrong_type_rate = args.wrong_type_rate
+    ShuffleHandler.error_rate = args.error_rate
+    server = ThreadingHTTPServer((args.host, args.port), ShuffleHandler)
+    eprint(f"Fake shuffle API on http://{args.host}:{args.port}/shuffle")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
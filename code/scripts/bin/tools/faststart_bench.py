@@ -0,0 +1,101 @@
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Time-to-first-frame of an MP4 before and after the faststart remux.
+#
+# Run from code/scripts:  python bin/tools/faststart_bench.py [VIDEO]
+#
+# Without VIDEO, ffmpeg generates a 60 s 1080p test clip (ffmpeg writes moov
+# at the end by default). The clip is copied, remuxed with FaststartRemuxer,
+# and both copies are opened with mpv until the first decoded frame
+# (--vo=null --frames=1). On Linux the file's page cache is dropped before
+# every run (posix_fadvise), so the numbers include the seek to moov on disk.
+# Needs ffmpeg and mpv on PATH or in bin/.
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from core.faststart_remuxer import FaststartRemuxer
+from utils.mp4_atoms import needs_faststart, top_level_boxes
+from utils.path_utils import get_ffmpeg_path
+
+
+def make_test_clip(path: Path, seconds: int):
+    subprocess.run([str(get_ffmpeg_path()), "-hide_banner", "-loglevel", "error", "-y",
+                    "-f", "lavfi", "-i", f"testsrc2=size=1920x1080:rate=30:duration={seconds}",
+                    "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", str(path)], check=True)
+
+
+def drop_cache(path: Path):
+    if hasattr(os, "posix_fadvise"):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def first_frame_ms(mpv: str, path: Path, runs: int, cold: bool) -> float:
+    samples = []
+    for _ in range(runs):
+        if cold:
+            drop_cache(path)
+        started = time.perf_counter()
+        subprocess.run([mpv, "--no-config", "--really-quiet", "--vo=null", "--no-audio", "--frames=1",
+                        "--hwdec=no", str(path)], check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def describe(path: Path) -> str:
+    return " ".join(f"{box_type}@{offset}" for box_type, offset, _ in top_level_boxes(str(path)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-to-first-frame before and after the faststart remux.")
+    parser.add_argument("video", nargs="?")
+    parser.add_argument("--seconds", type=int, default=60, help="Length of the generated clip")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm", action="store_true", help="Keep the page cache between runs")
+    args = parser.parse_args()
+
+    mpv = shutil.which("mpv")
+    remuxer = FaststartRemuxer()
+    if not mpv or not remuxer.is_available():
+        sys.exit("mpv and ffmpeg are required")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = Path(tmp) / "before.mp4"
+        if args.video:
+            shutil.copy2(args.video, before)
+        else:
+            print(f"Generating a {args.seconds} s 1080p test clip...")
+            make_test_clip(before, args.seconds)
+        if not needs_faststart(str(before)):
+            sys.exit(f"moov is already at the front: {describe(before)}")
+        after = Path(tmp) / "after.mp4"
+        shutil.copy2(before, after)
+
+        started = time.perf_counter()
+        remuxer.remux(after)
+        remux_ms = (time.perf_counter() - started) * 1000
+
+        cold = not args.warm
+        before_ms = first_frame_ms(mpv, before, args.runs, cold)
+        after_ms = first_frame_ms(mpv, after, args.runs, cold)
+        print(f"{before.stat().st_size / 1048576:.1f} MB, remuxed in {remux_ms:.0f} ms")
+        print(f"  before: {describe(before)}")
+        print(f"  after:  {describe(after)}")
+        print(f"  first frame ({'cold' if cold else 'warm'} cache, median of {args.runs}): "
+              f"before {before_ms:.0f} ms, after {after_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Compare the old and new fade-preview decoding for a large JPEG.
+#
+# Run from code/scripts:  python bin/tools/image_decode_bench.py [--image photo.jpg]
+#
+# Old: QPixmap(path) decodes the full image on the GUI thread, then scales it.
+# New: decode_scaled() asks the JPEG reader for a window-sized image (DCT scaling).
+# Without --image a 7952x5304 (~42 MP) test JPEG is generated.
+#
+# Reports, for each: decode time, the longest GUI event-loop stall while a
+# fade preview is loaded (a 5 ms heartbeat timer; the new way goes through
+# ImageLoader), and the peak RSS growth of one decode in a fresh process
+# (POSIX only).
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEventLoop, QSize, Qt, QTimer
+from PySide6.QtGui import QColor, QGuiApplication, QImage, QLinearGradient, QPainter, QPixmap
+
+from core.image_loader import ImageLoader, decode_scaled
+
+
+def make_test_jpeg(path: str, width: int = 7952, height: int = 5304):
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    painter = QPainter(image)
+    gradient = QLinearGradient(0, 0, width, height)
+    gradient.setColorAt(0.0, QColor("#1e3c72"))
+    gradient.setColorAt(1.0, QColor("#f7b733"))
+    painter.fillRect(image.rect(), gradient)
+    painter.end()
+    image.save(path, "JPG", 90)
+
+
+def timed(fn, runs: int):
+    best = None
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def old_way(path: str, target: QSize):
+    full = QPixmap(path)
+    return full, full.scaled(target, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                             Qt.TransformationMode.SmoothTransformation)
+
+
+def longest_stall(start_load) -> float:
+    """Longest gap (ms) between 5 ms heartbeats while start_load(done) runs until done() is called"""
+    loop = QEventLoop()
+    beats = [time.perf_counter()]
+    gaps = []
+
+    def beat():
+        now = time.perf_counter()
+        gaps.append(now - beats[-1])
+        beats.append(now)
+
+    heartbeat = QTimer()
+    heartbeat.timeout.connect(beat)
+    heartbeat.start(5)
+    QTimer.singleShot(20, lambda: start_load(lambda *args: QTimer.singleShot(20, loop.quit)))
+    loop.exec()
+    heartbeat.stop()
+    return max(gaps) * 1000
+
+
+def peak_rss_growth(path: str, target: QSize, way: str) -> float:
+    """Peak RSS growth (MB) of one decode, measured in a fresh process"""
+    result = subprocess.run(
+        [sys.executable, __file__, "--measure", way, "--image", path,
+         "--width", str(target.width()), "--height", str(target.height())],
+        capture_output=True, text=True, check=True)
+    return float(result.stdout.split()[-1])
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss survives exec on Linux (the parent's peak would leak in); VmHWM does not
+    try:
+        with open("/proc/self/status") as status:
+            return next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == "darwin" else 1)
+
+
+def measure(way: str, path: str, target: QSize):
+    """Child process: print the peak RSS growth of one decode in MB"""
+    baseline = peak_rss_kb()
+    kept = old_way(path, target) if way == "old" else decode_scaled(path, target)
+    print(f"{(peak_rss_kb() - baseline) / 1024:.1f}")
+    del kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure fade-preview decode time, GUI stalls and memory.")
+    parser.add_argument("--image", help="JPEG to decode (default: generate one)")
+    parser.add_argument("--width", type=int, default=1280, help="Window width")
+    parser.add_argument("--height", type=int, default=800, help="Window height")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--measure", choices=("old", "new"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    target = QSize(args.width, args.height)
+    if args.measure:
+        measure(args.measure, args.image, target)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.image
+        if not path:
+            path = os.path.join(tmp, "large.jpg")
+            make_test_jpeg(path)
+
+        old_ms, (full, old_scaled) = timed(lambda: old_way(path, target), args.runs)
+        full_bytes = full.toImage().sizeInBytes()
+        del full, old_scaled
+
+        new_ms, image = timed(lambda: decode_scaled(path, target), args.runs)
+
+        old_stall = longest_stall(lambda done: done(old_way(path, target)))
+        loader = ImageLoader()
+
+        def request(done):
+            loader.loaded.connect(done)
+            loader.request(path, target)
+
+        new_stall = longest_stall(request)
+        loader.shutdown()
+
+        if sys.platform == "win32":
+            old_peak = new_peak = float("nan")
+        else:
+            old_peak = peak_rss_growth(path, target, "old")
+            new_peak = peak_rss_growth(path, target, "new")
+
+        print(f"window {target.width()}x{target.height()}, image {path}")
+        print(f"  old: {old_ms:7.1f} ms on the GUI thread, full decode {full_bytes / 1048576:7.1f} MB,"
+              f" longest GUI stall {old_stall:6.1f} ms, peak RSS +{old_peak:.1f} MB")
+        print(f"  new: {new_ms:7.1f} ms on a worker, decoded {image.width()}x{image.height()} "
+              f"{image.sizeInBytes() / 1048576:7.1f} MB, longest GUI stall {new_stall:6.1f} ms,"
+              f" peak RSS +{new_peak:.1f} MB")
+    del app
+
+
+if __name__ == "__main__":
+    main()
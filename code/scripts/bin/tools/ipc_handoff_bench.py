@@ -0,0 +1,106 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# URI handoff latency check (Linux/macOS).
+#
+# Run from code/scripts:  python bin/tools/ipc_handoff_bench.py
+#
+# Stands in for a running primary instance by listening on the same Unix socket
+# QLocalServer would use, then launches `python main.py tapeciarnia:...` the way
+# a browser does and times how long the message takes to arrive and how long
+# the secondary process lives. Exits with status 1 over budget.
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from utils.ipc import FrameDecoder, ipc_address
+
+DEFAULT_BUDGET_MS = 100
+TEST_URI = "tapeciarnia:apply?url=https%3A%2F%2Fexample.com%2Fwallpaper.jpg"
+
+
+class FakePrimary:
+    """Accepts connections and records when each framed message was fully received"""
+
+    def __init__(self, address: str):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(address)
+        self.sock.listen(8)
+        self.received = []
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            decoder = FrameDecoder()
+            with conn:
+                while True:
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        break
+                    for message in decoder.feed(chunk):
+                        self.received.append((time.perf_counter(), message))
+
+    def close(self):
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure secondary-instance URI handoff latency.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    if sys.platform.startswith("win"):
+        sys.exit("The fake primary uses a Unix socket; run this on Linux or macOS.")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, TMPDIR=tmp, PYTHONDONTWRITEBYTECODE="1")
+        os.environ["TMPDIR"] = tmp
+        primary = FakePrimary(ipc_address())
+
+        handoff_timings = []
+        exit_timings = []
+        try:
+            for _ in range(args.runs):
+                expected = len(primary.received) + 1
+                started = time.perf_counter()
+                result = subprocess.run([sys.executable, "main.py", TEST_URI], cwd=SCRIPTS_DIR, env=env,
+                                        capture_output=True, text=True, timeout=30)
+                exited = time.perf_counter()
+                while len(primary.received) < expected and time.perf_counter() - exited < 2:
+                    time.sleep(0.001)
+                if result.returncode != 0 or len(primary.received) < expected:
+                    print(result.stderr[-2000:], file=sys.stderr)
+                    sys.exit("The secondary instance did not hand the URI over")
+                received_at, message = primary.received[-1]
+                if message != {"command": "open", "args": {"argv": [TEST_URI]}}:
+                    sys.exit(f"Unexpected message: {message!r}")
+                handoff_timings.append((received_at - started) * 1000)
+                exit_timings.append((exited - started) * 1000)
+                print(f"  handoff {handoff_timings[-1]:6.1f} ms, process exit {exit_timings[-1]:6.1f} ms")
+        finally:
+            primary.close()
+
+    handoff_ms = sorted(handoff_timings)[len(handoff_timings) // 2]
+    exit_ms = sorted(exit_timings)[len(exit_timings) // 2]
+    print(f"\nmedian handoff {handoff_ms:.1f} ms, median process exit {exit_ms:.1f} ms")
+    if exit_ms > args.budget_ms:
+        print(f"HANDOFF BUDGET EXCEEDED: {exit_ms:.1f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print("Handoff within budget.")
+
+
+if __name__ == "__main__":
+    main()
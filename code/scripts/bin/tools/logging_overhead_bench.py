@@ -0,0 +1,83 @@
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Run from code/scripts:  python bin/tools/logging_overhead_bench.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import setLogging
+from setLogging import InitLogging, shutdown_logging
+
+CHUNK_SIZE = 65536
+
+
+def old_style_chunk(percent_int: int, status_msg: str):
+    """What DownloadProgressDialog.update_progress logged per chunk before"""
+    logging.debug(f"Updating progress: {percent_int}% - {status_msg}")
+    details = status_msg.replace("Downloading... ", "")
+    logging.debug(f"Download progress details: {details}")
+    if percent_int in [0, 25, 50, 75, 90, 100]:
+        logging.info(f"Download progress milestone: {percent_int}% - {status_msg}")
+
+
+def new_style_chunk(logger: logging.Logger, percent_int: int, status_msg: str):
+    """What it logs now"""
+    logger.debug("Updating progress: %d%% - %s", percent_int, status_msg)
+
+
+def reset_root():
+    shutdown_logging()
+    root = logging.getLogger()
+    root.handlers.clear()
+    return root
+
+
+def run(label: str, chunks: int, per_chunk) -> float:
+    started = time.perf_counter()
+    for i in range(chunks):
+        percent = i * 100 // chunks
+        per_chunk(percent, f"Downloading... {percent:.1f}% ({i * CHUNK_SIZE / 1048576:.1f}/... MB)")
+    elapsed = time.perf_counter() - started
+    print(f"{label:<46} {elapsed / chunks * 1e6:8.2f} us/chunk")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure logging overhead per download chunk.")
+    parser.add_argument("--chunks", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Before: synchronous FileHandler on the root logger at DEBUG, eager f-strings
+        root = reset_root()
+        root.setLevel(logging.DEBUG)
+        file_handler = logging.FileHandler(Path(tmp) / "old.log")
+        file_handler.setFormatter(logging.Formatter('[%(asctime)s][%(levelname)s]->%(message)s'))
+        root.addHandler(file_handler)
+        run("before: sync file handler, f-strings", args.chunks, old_style_chunk)
+        root.removeHandler(file_handler)
+        file_handler.close()
+
+        # After: queue pipeline, hot-path logger at its default INFO level
+        reset_root()
+        InitLogging(log_dir=tmp, console=False)
+        dialogs_logger = logging.getLogger("ui.dialogs")
+        run("after: queue handler, module level INFO", args.chunks,
+            lambda p, s: new_style_chunk(dialogs_logger, p, s))
+
+        # After, with the hot path explicitly switched to DEBUG
+        dialogs_logger.setLevel(logging.DEBUG)
+        run("after: queue handler, module level DEBUG", args.chunks,
+            lambda p, s: new_style_chunk(dialogs_logger, p, s))
+
+        # Stopping the listener drains the queue into the ring buffer
+        shutdown_logging()
+        recent = setLogging.get_recent_logs(1)
+        print(f"ring buffer tail: {recent[-1] if recent else '(empty)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Compare mpv's CPU cost playing a video wallpaper before and after proxying.
+#
+# Run from code/scripts:  python bin/tools/proxy_cpu_bench.py VIDEO [--screen 1920x1080]
+#
+# Transcodes VIDEO with the same settings ProxyTranscoder uses, then plays the
+# original and the proxy for --seconds each with mpv (decoding only, no
+# window: --vo=null) and reports the CPU time mpv used. POSIX only; needs
+# ffmpeg, ffprobe and mpv on PATH or in bin/.
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from core.proxy_transcoder import ProxyTranscoder
+
+
+def child_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def play(mpv: str, video: str, seconds: float) -> tuple:
+    """CPU seconds and wall seconds mpv needs to play video for the given time"""
+    before = child_cpu_seconds()
+    started = time.perf_counter()
+    subprocess.run([mpv, "--no-config", "--really-quiet", "--vo=null", "--no-audio", "--loop-file=inf",
+                    f"--length={seconds}", "--hwdec=no", video], check=True)
+    return child_cpu_seconds() - before, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure mpv CPU use on an original video and its proxy.")
+    parser.add_argument("video")
+    parser.add_argument("--screen", default="1920x1080")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--codec", choices=("h264", "vp9"), default="h264")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.screen.split("x"))
+
+    mpv = shutil.which("mpv")
+    if not mpv:
+        sys.exit("mpv not found on PATH")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        transcoder = ProxyTranscoder(width, height, max_fps=args.fps, codec=args.codec, directory=Path(tmp))
+        if not transcoder.is_available():
+            sys.exit("ffmpeg not found")
+        source = str(Path(args.video).resolve())
+        info = transcoder._probe(source)
+        print(f"original: {info.get('codec')} {info.get('width')}x{info.get('height')} @ {info.get('fps', 0):.2f} fps")
+
+        started = time.perf_counter()
+        transcoder._transcode(source)
+        proxy = transcoder.proxy_for(source)
+        if not proxy:
+            sys.exit("No proxy made: the video is already within the target size, frame rate and codec")
+        print(f"proxy:    {args.codec} at {width}x{height} (cover) @ <= {args.fps} fps, "
+              f"made in {time.perf_counter() - started:.1f} s (nice 19)")
+
+        for label, video in (("original", source), ("proxy", proxy)):
+            cpu, wall = play(mpv, video, args.seconds)
+            print(f"  {label:8s} mpv CPU {cpu:6.2f} s over {wall:5.1f} s = {cpu / wall * 100:5.1f}% of one core")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Benchmark wallpaper rendition generation over a batch of large images.
+#
+# Run from code/scripts:  python bin/tools/rendition_bench.py [--images DIR]
+#
+# Without --images, generates large JPEGs and PNGs (12000x8000 by default).
+# Reports the serial in-process time, the process-pool time, and how much
+# smaller the renditions are than the originals.
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from core.rendition_cache import RenditionCache, render_rendition
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def make_test_images(directory: Path, count: int, width: int, height: int) -> list:
+    from PIL import Image
+
+    paths = []
+    for i in range(count):
+        # A smooth gradient with some noise, so the encoders have real work to do
+        gradient = Image.linear_gradient("L").resize((width, height))
+        noise = Image.effect_noise((width, height), 24)
+        image = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+        path = directory / (f"large_{i}.png" if i % 2 else f"large_{i}.jpg")
+        image.save(path, quality=92)
+        paths.append(str(path))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure rendition generation for large images.")
+    parser.add_argument("--images", help="Folder of images to use instead of generated ones")
+    parser.add_argument("--count", type=int, default=6)
+    parser.add_argument("--source-size", default="12000x8000")
+    parser.add_argument("--screen", default="1920x1080")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    screen_width, screen_height = (int(v) for v in args.screen.split("x"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if args.images:
+            sources = [str(p) for p in sorted(Path(args.images).iterdir()) if p.suffix.lower() in IMAGE_EXTENSIONS]
+        else:
+            width, height = (int(v) for v in args.source_size.split("x"))
+            print(f"Generating {args.count} test images of {width}x{height}...")
+            sources = make_test_images(tmp, args.count, width, height)
+
+        started = time.perf_counter()
+        serial = [render_rendition(src, str(tmp / "serial"), screen_width, screen_height) for src in sources]
+        serial_s = time.perf_counter() - started
+
+        cache = RenditionCache(screen_width, screen_height, directory=tmp / "pool", max_workers=args.workers)
+        started = time.perf_counter()
+        futures = [cache.submit(src) for src in sources]
+        pooled = [future.result() for future in futures]
+        pool_s = time.perf_counter() - started
+        cache.shutdown(wait=True)
+
+        source_bytes = sum(os.path.getsize(p) for p in sources)
+        rendition_bytes = sum(os.path.getsize(p) for p in pooled)
+        print(f"{len(sources)} images -> {screen_width}x{screen_height}")
+        print(f"  serial, one process:      {serial_s:7.2f} s ({serial_s / len(sources) * 1000:.0f} ms/image)")
+        print(f"  process pool ({args.workers} workers): {pool_s:7.2f} s (includes worker start-up)")
+        print(f"  originals {source_bytes / 1048576:.1f} MB, renditions {rendition_bytes / 1048576:.1f} MB")
+        print(f"  renditions made: {sum(1 for s, r in zip(sources, serial) if s != r)} of {len(sources)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Cold-start budget check.
+#
+# Run from code/scripts:  python bin/tools/startup_bench.py
+#
+# 1. Runs `python -X importtime -c "import ui.main_window"` and reports the
+#    slowest imports. Heavy optional dependencies (yt_dlp, requests, ...) must
+#    not show up at all: they are imported on first use.
+# 2. Starts the main window under QT_QPA_PLATFORM=offscreen and measures the time
+#    to the first shown window and to interactive (every startup probe done).
+#    --trace prints the per-stage startup trace of the last run.
+#
+# Exits with status 1 when a budget is exceeded or a deferred module is imported
+# eagerly, so it can gate a release build.
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+
+# Milliseconds, on a typical developer machine
+DEFAULT_IMPORT_BUDGET_MS = 800
+DEFAULT_WINDOW_BUDGET_MS = 2500
+DEFAULT_INTERACTIVE_BUDGET_MS = 4000
+
+# Must stay out of startup; each is imported where it is actually used
+DEFERRED_MODULES = ("yt_dlp", "requests", "PIL")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+FIRST_WINDOW_SNIPPET = """
+import sys, time
+from core.startup import get_startup_trace
+trace = get_startup_trace()
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QApplication, QMessageBox
+app = QApplication(sys.argv)
+# Offscreen has no system tray: dismiss the message box saying so instead of waiting on it
+dismiss = QTimer()
+dismiss.timeout.connect(lambda: isinstance(app.activeModalWidget(), QMessageBox) and app.activeModalWidget().close())
+dismiss.start(10)
+from ui.main_window import TapeciarniaApp
+window = TapeciarniaApp()
+dismiss.stop()
+window.show()
+app.processEvents()
+print(f"FIRST_WINDOW_MS {trace.elapsed_ms():.1f}", flush=True)
+# Interactive once every background startup task has reported back
+poll = QTimer()
+# exit(), not quit(): quit() closes the window first, and its close asks for confirmation
+poll.timeout.connect(lambda: "interactive" in trace.milestones and app.exit(0))
+poll.start(5)
+QTimer.singleShot(30000, lambda: app.exit(0))
+app.exec()
+if "interactive" in trace.milestones:
+    print(f"INTERACTIVE_MS {trace.milestones['interactive']:.1f}", flush=True)
+print(trace.summary(), flush=True)
+for name in ("controller", "prefetch_pool", "connectivity", "shuffle_client"):
+    part = getattr(window, name, None)
+    if part is not None and hasattr(part, "stop"):
+        part.stop()
+"""
+
+
+def eprint(*args, **kwargs):
+    """Prints status messages to standard error (stderr)."""
+    print(*args, file=sys.stderr, **kwargs)
+
+
+def isolated_env(home: str) -> dict:
+    """Environment that keeps the benchmark off the user's files and the network"""
+    env = dict(os.environ)
+    env["HOME"] = home
+    env["XDG_STATE_HOME"] = os.path.join(home, ".local", "state")
+    env["TAPECIARNIA_HOME"] = os.path.join(home, "Tapeciarnia")
+    env["QT_QPA_PLATFORM"] = "offscreen"
+    # Nothing listens on the discard port, so shuffle/prefetch fail fast
+    env["TAPECIARNIA_SHUFFLE_API"] = "http://127.0.0.1:9/shuffle"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def parse_importtime(stderr: str) -> list:
+    """Returns [(cumulative_us, self_us, depth, module)]"""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, module))
+    return rows
+
+
+def measure_imports(env: dict, top: int) -> tuple:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ui.main_window"],
+        cwd=SCRIPTS_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    rows = parse_importtime(result.stderr)
+    if result.returncode != 0 or not rows:
+        eprint(result.stderr[-2000:])
+        raise RuntimeError("Importing ui.main_window failed")
+
+    total_ms = max(row[0] for row in rows) / 1000
+    # Top-level entries of each import tree are what the app pays for directly
+    print(f"\nSlowest imports (cumulative), total {total_ms:.1f} ms:")
+    for cumulative_us, self_us, depth, module in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {self_us / 1000:7.1f} ms self  {module}")
+
+    imported = {row[3] for row in rows}
+    eager = [m for m in DEFERRED_MODULES if m in imported]
+    return total_ms, eager
+
+
+def measure_first_window(env: dict, runs: int, show_trace: bool = False) -> tuple:
+    """Median (first window ms, interactive ms) over the runs"""
+    window_timings = []
+    interactive_timings = []
+    trace = ""
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", FIRST_WINDOW_SNIPPET],
+            cwd=SCRIPTS_DIR, env=env, capture_output=True, text=True, timeout=120
+        )
+        wall_ms = (time.perf_counter() - started) * 1000
+        window_match = re.search(r"FIRST_WINDOW_MS ([\d.]+)", result.stdout)
+        interactive_match = re.search(r"INTERACTIVE_MS ([\d.]+)", result.stdout)
+        if not window_match or not interactive_match:
+            eprint(result.stderr[-2000:])
+            raise RuntimeError("Main window did not start or never became interactive")
+        window_timings.append(float(window_match.group(1)))
+        interactive_timings.append(float(interactive_match.group(1)))
+        trace = result.stdout[result.stdout.find("Startup trace"):]
+        print(f"  first window after {window_timings[-1]:.1f} ms, interactive after "
+              f"{interactive_timings[-1]:.1f} ms (process wall time {wall_ms:.1f} ms)")
+    if show_trace:
+        print(trace.rstrip())
+    return sorted(window_timings)[len(window_timings) // 2], sorted(interactive_timings)[len(interactive_timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start and enforce a budget.")
+    parser.add_argument("--import-budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS)
+    parser.add_argument("--window-budget-ms", type=float, default=DEFAULT_WINDOW_BUDGET_MS)
+    parser.add_argument("--interactive-budget-ms", type=float, default=DEFAULT_INTERACTIVE_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="First-window runs; the median is checked.")
+    parser.add_argument("--trace", action="store_true", help="Print the startup trace of the last run.")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--imports-only", action="store_true", help="Skip the first-window measurement.")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as home:
+        env = isolated_env(home)
+
+        import_ms, eager = measure_imports(env, args.top)
+        if eager:
+            failures.append(f"deferred modules imported at startup: {', '.join(eager)}")
+        if import_ms > args.import_budget_ms:
+            failures.append(f"import time {import_ms:.1f} ms > budget {args.import_budget_ms:.0f} ms")
+
+        if not args.imports_only:
+            print("\nTime to first window and to interactive (offscreen):")
+            window_ms, interactive_ms = measure_first_window(env, args.runs, args.trace)
+            print(f"  median {window_ms:.1f} ms to first window, {interactive_ms:.1f} ms to interactive")
+            if window_ms > args.window_budget_ms:
+                failures.append(f"first window {window_ms:.1f} ms > budget {args.window_budget_ms:.0f} ms")
+            if interactive_ms > args.interactive_budget_ms:
+                failures.append(f"interactive {interactive_ms:.1f} ms > budget {args.interactive_budget_ms:.0f} ms")
+
+    if failures:
+        print("\nSTARTUP BUDGET EXCEEDED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nStartup within budget.")
+
+
+if __name__ == "__main__":
+    main()
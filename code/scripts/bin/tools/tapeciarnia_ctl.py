@@ -0,0 +1,54 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Drive the running Tapeciarnia from a shell or script.
+#
+# Run from code/scripts:
+#   python bin/tools/tapeciarnia_ctl.py status
+#   python bin/tools/tapeciarnia_ctl.py apply ~/Pictures/mountains.jpg
+#   python bin/tools/tapeciarnia_ctl.py next --mode animation
+#   python bin/tools/tapeciarnia_ctl.py pause | resume | metrics
+#
+# Prints the command's result as JSON; exits with status 1 when the app is not
+# running or the command failed.
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from utils.ipc import IpcError, send_command
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a command to the running Tapeciarnia.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    apply_parser = sub.add_parser("apply", help="Set a file or URL as the wallpaper.")
+    apply_parser.add_argument("target")
+    next_parser = sub.add_parser("next", help="Switch to another wallpaper from the collection.")
+    next_parser.add_argument("--mode", choices=("all", "wallpaper", "animation"), default="all")
+    for name, text in (("pause", "Pause the video wallpaper."), ("resume", "Resume the video wallpaper."),
+                       ("status", "Show the current state."), ("metrics", "Show performance counters.")):
+        sub.add_parser(name, help=text)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    command_args = {}
+    if args.command == "apply":
+        target = args.target
+        # Resolve relative paths here; the app has a different working directory
+        if not target.lower().startswith(("http://", "https://")) and Path(target).expanduser().exists():
+            target = str(Path(target).expanduser().resolve())
+        command_args["target"] = target
+    elif args.command == "next":
+        command_args["mode"] = args.mode
+
+    try:
+        result = send_command(args.command, command_args, timeout=args.timeout)
+    except IpcError as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,19 @@
-from .wallpaper_controller import WallpaperController
-from .download_manager import DownloaderThread
-from .scheduler import WallpaperScheduler
-
-__all__ = [
-    'WallpaperController',
-    'DownloaderThread',
-    'WallpaperScheduler'
-]
\ No newline at end of file
+import importlib
+
+# Resolved on first use; importing a single core module must not load the rest
+_EXPORTS = {
+    'WallpaperController': 'wallpaper_controller',
+    'DownloaderThread': 'download_manager',
+    'WallpaperScheduler': 'scheduler',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    submodule = _EXPORTS.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{submodule}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,277 @@
+import os
+import struct
+import logging
+import multiprocessing
+import subprocess
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+from core.proxy_transcoder import CODECS
+from utils.animation_links import get_animation_links
+from utils.path_utils import get_ffmpeg_path
+
+# No Qt in this module: it is imported again by the worker process.
+
+logger = logging.getLogger(__name__)
+
+ANIMATED_EXTENSIONS = ('.gif', '.webp')
+
+# Browsers show GIF frames with a 0 or 10 ms delay for 100 ms; so do we
+MIN_FRAME_MS = 20
+DEFAULT_FRAME_MS = 100
+
+
+def _normalize_delay(ms: int) -> int:
+    return DEFAULT_FRAME_MS if ms < MIN_FRAME_MS else ms
+
+
+def _skip_gif_sub_blocks(f):
+    while True:
+        size = f.read(1)
+        if not size or size[0] == 0:
+            return
+        f.seek(size[0], os.SEEK_CUR)
+
+
+def _gif_frame_delays(f) -> list:
+    header = f.read(13)
+    if len(header) < 13 or header[:6] not in (b"GIF87a", b"GIF89a"):
+        raise ValueError("Not a GIF")
+    packed = header[10]
+    if packed & 0x80:
+        f.seek(3 * (2 << (packed & 0x07)), os.SEEK_CUR)
+
+    delays = []
+    pending_delay = 0
+    while True:
+        block = f.read(1)
+        if not block or block == b"\x3b":
+            break
+        if block == b"\x21":
+            label = f.read(1)
+            if label == b"\xf9":
+                control = f.read(6)
+                if len(control) == 6:
+                    pending_delay = struct.unpack("<H", control[2:4])[0] * 10
+                    if control[5] != 0:
+                        _skip_gif_sub_blocks(f)
+                continue
+            _skip_gif_sub_blocks(f)
+        elif block == b"\x2c":
+            descriptor = f.read(9)
+            if len(descriptor) < 9:
+                break
+            if descriptor[8] & 0x80:
+                f.seek(3 * (2 << (descriptor[8] & 0x07)), os.SEEK_CUR)
+            f.seek(1, os.SEEK_CUR)  # LZW minimum code size
+            _skip_gif_sub_blocks(f)
+            delays.append(_normalize_delay(pending_delay))
+            pending_delay = 0
+        else:
+            # Garbage after the last frame
+            break
+    return delays
+
+
+def _webp_frame_delays(f) -> list:
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WEBP":
+        raise ValueError("Not a WebP")
+    delays = []
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            break
+        fourcc, size = struct.unpack("<4sI", chunk)
+        if fourcc == b"ANMF":
+            frame = f.read(16)
+            if len(frame) < 16:
+                break
+            delays.append(_normalize_delay(int.from_bytes(frame[12:15], "little")))
+            f.seek(size - 16 + (size & 1), os.SEEK_CUR)
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+    return delays
+
+
+def frame_delays(path: str) -> list:
+    """
+    Display time in ms of every frame of a GIF or WebP, read from the
+    container only (no pixel data is decoded). A still image gives one frame
+    for GIF and none for WebP. Raises ValueError for other files.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(4)
+        f.seek(0)
+        if magic == b"GIF8":
+            return _gif_frame_delays(f)
+        if magic == b"RIFF":
+            return _webp_frame_delays(f)
+    raise ValueError(f"Not a GIF or WebP: {path}")
+
+
+def is_animated_image(path) -> bool:
+    if Path(path).suffix.lower() not in ANIMATED_EXTENSIONS:
+        return False
+    try:
+        return len(frame_delays(str(path))) > 1
+    except (OSError, ValueError) as e:
+        logger.debug("Frame scan failed for %s: %s", path, e)
+        return False
+
+
+def _lower_priority():
+    """Worker initializer: conversions must not compete with the UI or the wallpaper"""
+    if hasattr(os, "nice"):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+
+def _unique_path(folder: Path, stem: str, suffix: str) -> Path:
+    path = folder / f"{stem}{suffix}"
+    counter = 1
+    while path.exists():
+        path = folder / f"{stem}_{counter}{suffix}"
+        counter += 1
+    return path
+
+
+def convert_animation(source: str, folder: str, ffmpeg: str, width: int, height: int,
+                      max_fps: int = 30, codec: str = "h264") -> str:
+    """
+    Transcode an animated GIF/WebP into a looping video in folder; returns its path.
+
+    Pillow decodes and composites the frames (ffmpeg cannot read animated
+    WebP), and they are piped to ffmpeg as raw RGB at a constant frame rate
+    taken from the shortest frame delay, capped at max_fps. Variable delays
+    are kept by repeating frames. Frames are scaled down to cover
+    width x height, never up. Runs in a worker process.
+    """
+    from PIL import Image, ImageSequence
+
+    delays = frame_delays(source)
+    fps = max(1, min(max_fps, round(1000 / min(delays)))) if delays else max_fps
+    spec = CODECS[codec]
+    destination = _unique_path(Path(folder), Path(source).stem, spec["extension"])
+    part = destination.with_name(f".{destination.name}.part")
+
+    with Image.open(source) as image:
+        scale = min(1.0, max(width / image.width, height / image.height))
+        size = (max(2, round(image.width * scale)), max(2, round(image.height * scale)))
+        command = [
+            ffmpeg, "-hide_banner", "-nostdin", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{size[0]}x{size[1]}", "-r", str(fps), "-i", "pipe:0",
+            # yuv420p needs even dimensions
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-g", str(fps * 2), *spec["args"],
+            "-f", spec["format"], str(part)]
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.PIPE)
+        try:
+            elapsed_ms = 0
+            frames_written = 0
+            for index, frame in enumerate(ImageSequence.Iterator(image)):
+                # The container's delays; Pillow only fills in WebP durations once a frame is loaded
+                if index < len(delays):
+                    elapsed_ms += delays[index]
+                else:
+                    frame.load()
+                    elapsed_ms += _normalize_delay(frame.info.get("duration") or 0)
+                repeat = round(elapsed_ms * fps / 1000) - frames_written
+                if repeat <= 0:
+                    continue
+                rgba = frame.convert("RGBA")
+                if rgba.size != size:
+                    rgba = rgba.resize(size, Image.Resampling.LANCZOS)
+                rgb = Image.new("RGB", size, (0, 0, 0))
+                rgb.paste(rgba, mask=rgba.getchannel("A"))
+                data = rgb.tobytes()
+                for _ in range(repeat):
+                    process.stdin.write(data)
+                frames_written += repeat
+            process.stdin.close()
+            stderr = process.stderr.read()
+            process.wait()
+        except BaseException:
+            process.kill()
+            process.wait()
+            part.unlink(missing_ok=True)
+            raise
+
+    if process.returncode != 0 or not part.exists():
+        part.unlink(missing_ok=True)
+        raise RuntimeError(f"ffmpeg exit {process.returncode}: {stderr.decode('utf-8', 'replace').strip()[-500:]}")
+    os.replace(part, destination)
+    return str(destination)
+
+
+class AnimationConverter:
+    """
+    Turns animated GIF/WebP wallpapers into compact looping videos at import.
+
+    Desktops only show the first frame of a GIF, and playing it in mpv means
+    decoding palette images with per-frame compositing; an H.264 (or VP9)
+    loop at screen size or smaller decodes far more cheaply. submit() returns
+    a Future with the video path (None when the file is not animated or the
+    conversion failed); the original is linked to the video in the
+    AnimationLinks registry so applying it plays the video.
+    """
+
+    def __init__(self, width: int, height: int, max_fps: int = 30, codec: str = "h264", ffmpeg: Path = None):
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported animation codec: {codec}")
+        self.width = width
+        self.height = height
+        self.max_fps = max_fps
+        self.codec = codec
+        self.ffmpeg = ffmpeg or get_ffmpeg_path()
+        self._executor = None
+
+    def is_available(self) -> bool:
+        return self.ffmpeg is not None
+
+    def submit(self, source, folder) -> Future:
+        """Convert source into folder in the worker process, unless it is still or already linked"""
+        result = Future()
+        source = str(source)
+        linked = get_animation_links().video_for(source)
+        if linked or not self.is_available() or not is_animated_image(source):
+            result.set_result(linked)
+            return result
+        try:
+            work = self._get_executor().submit(convert_animation, source, str(folder), str(self.ffmpeg),
+                                               self.width, self.height, self.max_fps, self.codec)
+        except RuntimeError as e:
+            # Pool already shut down (app exiting)
+            logger.debug("Animation converter unavailable: %s", e)
+            result.set_result(None)
+            return result
+        logger.info("Converting animated wallpaper %s to video", Path(source).name)
+        work.add_done_callback(lambda done: self._finish(source, done, result))
+        return result
+
+    def shutdown(self, wait: bool = False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs Qt and worker threads is unsafe
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_lower_priority)
+        return self._executor
+
+    def _finish(self, source: str, done: Future, result: Future):
+        if done.cancelled():
+            result.set_result(None)
+            return
+        try:
+            video = done.result()
+        except Exception as e:
+            logger.warning("Could not convert animated wallpaper %s: %s", source, e)
+            result.set_result(None)
+            return
+        get_animation_links().link(source, video)
+        result.set_result(video)
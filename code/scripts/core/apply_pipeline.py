@@ -0,0 +1,231 @@
+import sys
+import time
+import logging
+import itertools
+from pathlib import Path
+from threading import Thread, Condition
+from typing import Callable
+
+from PySide6.QtCore import QObject, Signal
+
+from core.animation_converter import ANIMATED_EXTENSIONS
+from utils.animation_links import get_animation_links
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".webm", ".avi", ".mov")
+
+# Stages of one apply, in order
+STAGES = ("resolve", "prepare", "backend", "verify")
+
+
+class ApplySuperseded(Exception):
+    """A newer apply was submitted while this one was between stages"""
+
+
+class ApplyPipeline(QObject):
+    """
+    Applies wallpapers on one worker thread so the GUI never waits for a
+    desktop backend, a rendition or a player start.
+
+    Every submit() is a job that runs through four stages:
+      resolve  - animated GIF/WebP to its looping video, image or video, file exists
+      prepare  - images: the screen-sized rendition (prepare_image)
+      backend  - stop a running player when needed, start the video or set the image
+      verify   - the desktop backend reported success / the player is still running
+    and ends in exactly one of finished, failed or cancelled (job dicts, see
+    _summary). started is sent once a job is resolved, so the GUI can begin
+    its fade while the desktop is still being set.
+
+    There is one pending slot: a job submitted while another one waits
+    replaces it (the waiting one is cancelled), and the job in flight is
+    abandoned at its next stage boundary. Clicking through ten wallpapers
+    therefore sets the desktop once or twice, not ten times. Once the backend
+    call has started the job runs to the end; players are never half-started.
+    submit() and submit_stop() are safe from any thread, also before start():
+    the job then waits in the pending slot until the worker runs.
+    """
+
+    started = Signal(dict)
+    finished = Signal(dict)
+    failed = Signal(dict)
+    cancelled = Signal(dict)
+
+    def __init__(self, controller, prepare_image: Callable[[str], str] = None, verify_seconds: float = 0.5,
+                 parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.prepare_image = prepare_image
+        self.verify_seconds = verify_seconds
+
+        self._ids = itertools.count(1)
+        self._pending = None
+        self._current = None
+        self._running = False
+        self._condition = Condition()
+        self.thread = None
+
+    # ---------------------------------------------------------
+    #  Public API
+    # ---------------------------------------------------------
+    def start(self):
+        with self._condition:
+            if self.thread and self.thread.is_alive():
+                return
+            self._running = True
+        self.thread = Thread(target=self._apply_loop, name="ApplyPipeline", daemon=True)
+        self.thread.start()
+        logger.info("Wallpaper apply pipeline started")
+
+    def stop(self, timeout: float = 5.0):
+        """Cancel the waiting job and wait (up to timeout) for the one in flight"""
+        with self._condition:
+            self._running = False
+            pending, self._pending = self._pending, None
+            self._condition.notify_all()
+        if pending:
+            self._cancel(pending, "shutting down")
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=timeout)
+        logger.info("Wallpaper apply pipeline stopped")
+
+    def submit(self, target: str, remember: bool = True) -> int:
+        """
+        Queue target (a file path) as the next wallpaper; returns the job id.
+        Whether it is an image or a video is worked out on the worker.
+        remember=False is for temporary wallpapers (power-saving stills,
+        restoring the original desktop): the GUI does not record them as the
+        current wallpaper.
+        """
+        return self._submit({"target": str(target), "kind": None, "remember": remember})
+
+    def submit_stop(self) -> int:
+        """Queue stopping the video wallpaper; supersedes any waiting apply"""
+        return self._submit({"target": None, "kind": "stop", "remember": False})
+
+    def busy(self) -> bool:
+        with self._condition:
+            return self._current is not None or self._pending is not None
+
+    # ---------------------------------------------------------
+    #  Internals
+    # ---------------------------------------------------------
+    def _submit(self, job: dict) -> int:
+        job.update(id=next(self._ids), path=None, desktop_path=None, stage=None, error=None,
+                   timings={}, submitted=time.monotonic())
+        with self._condition:
+            replaced, self._pending = self._pending, job
+            self._condition.notify_all()
+        if replaced:
+            self._cancel(replaced, f"superseded by job {job['id']}")
+        logger.debug("Apply job %d queued: %s %s", job["id"], job["kind"] or "auto", job["target"])
+        return job["id"]
+
+    def _superseded(self) -> bool:
+        with self._condition:
+            return self._pending is not None or not self._running
+
+    def _cancel(self, job: dict, reason: str):
+        job["error"] = reason
+        logger.debug("Apply job %d cancelled at %s: %s", job["id"], job["stage"] or "queue", reason)
+        self.cancelled.emit(self._summary(job))
+
+    @staticmethod
+    def _summary(job: dict) -> dict:
+        summary = {key: value for key, value in job.items() if key != "submitted"}
+        summary["timings"] = dict(job["timings"])
+        return summary
+
+    def _apply_loop(self):
+        logger.debug("Apply loop started")
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                if not self._running:
+                    break
+                job, self._pending = self._pending, None
+                self._current = job
+            try:
+                self._run(job)
+            except Exception as e:
+                logger.error("Apply job %d crashed: %s", job["id"], e, exc_info=True)
+            finally:
+                with self._condition:
+                    self._current = None
+        logger.debug("Apply loop finished")
+
+    def _run(self, job: dict):
+        try:
+            for stage in STAGES:
+                # Nothing has touched the desktop before the backend stage
+                if stage in ("prepare", "backend") and self._superseded():
+                    raise ApplySuperseded()
+                job["stage"] = stage
+                started = time.perf_counter()
+                getattr(self, f"_{stage}")(job)
+                job["timings"][stage] = round((time.perf_counter() - started) * 1000, 1)
+                if stage == "resolve":
+                    self.started.emit(self._summary(job))
+        except ApplySuperseded:
+            self._cancel(job, "superseded")
+            return
+        except Exception as e:
+            job["error"] = str(e)
+            logger.error("Applying %s failed at %s: %s", job["target"] or "stop", job["stage"], e,
+                         exc_info=not isinstance(e, (FileNotFoundError, RuntimeError)))
+            self.failed.emit(self._summary(job))
+            return
+
+        total = (time.monotonic() - job["submitted"]) * 1000
+        logger.info("Applied %s (%s) in %.0f ms: %s", Path(job["path"]).name if job["path"] else "stop",
+                    job["kind"], total, ", ".join(f"{stage} {ms:.0f}" for stage, ms in job["timings"].items()))
+        self.finished.emit(self._summary(job))
+
+    # Stages; each runs on the worker thread
+
+    def _resolve(self, job: dict):
+        if job["kind"] == "stop":
+            return
+        path = Path(job["target"])
+        if path.suffix.lower() in ANIMATED_EXTENSIONS:
+            # Animated GIF/WebP converted at import play as their looping video
+            linked_video = get_animation_links().video_for(path)
+            if linked_video:
+                logger.debug("Using linked video %s for %s", linked_video, path.name)
+                path = Path(linked_video)
+        if not path.exists():
+            raise FileNotFoundError(f"Wallpaper file not found: {path}")
+        job["kind"] = "video" if path.suffix.lower() in VIDEO_EXTENSIONS else "image"
+        job["path"] = str(path)
+
+    def _prepare(self, job: dict):
+        if job["kind"] == "image":
+            # A screen-sized copy, made in a worker process; the original if that fails
+            job["desktop_path"] = self.prepare_image(job["path"]) if self.prepare_image else job["path"]
+
+    def _backend(self, job: dict):
+        controller = self.controller
+        if job["kind"] == "stop":
+            controller.stop()
+        elif job["kind"] == "video":
+            # Windows switches videos through the running player's playlist
+            if controller.current_is_video and not sys.platform.startswith("win"):
+                controller.stop()
+            controller.start_video(job["path"])
+        else:
+            if not controller.start_image(job["desktop_path"]):
+                raise RuntimeError(f"The desktop did not accept {Path(job['desktop_path']).name}")
+
+    def _verify(self, job: dict):
+        if job["kind"] != "video" or not self.verify_seconds:
+            return
+        # A player that cannot open the file exits straight away
+        deadline = time.monotonic() + self.verify_seconds
+        while time.monotonic() < deadline:
+            if self._superseded():
+                return
+            with self._condition:
+                self._condition.wait(0.05)
+        if not self.controller.player_alive():
+            raise RuntimeError(f"The video player exited right after starting {Path(job['path']).name}")
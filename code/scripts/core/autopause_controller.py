@@ -1,37 +1,415 @@
-# import subprocess
-# from pathlib import Path
-# from typing import Optional
-
-# from utils.path_utils import BASE_DIR
-
-# class AutoPauseController:
-#     def __init__(self):
-#         self.proc = None
-
-#     def autopause_path(self) -> Optional[Path]:
-#         candidates = [
-#             BASE_DIR / "bin" / "tools" / "autopause.exe",
-#             BASE_DIR / "bin" / "tools" / "autopause",
-#         ]
-#         for c in candidates:
-#             if c.exists():
-#                 return c
-#         return None
-
-#     def start(self) -> bool:
-#         path = self.autopause_path()
-#         if path:
-#             try:
-#                 self.proc = subprocess.Popen([str(path)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-#                 return True
-#             except Exception:
-#                 self.proc = None
-#         return False
-
-#     def stop(self):
-#         if self.proc:
-#             try:
-#                 self.proc.terminate()
-#             except Exception:
-#                 pass
-#             self.proc = None
\ No newline at end of file
+import os
+import time
+import select
+import ctypes
+import ctypes.util
+import logging
+from threading import Thread, Event, Lock
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+logger = logging.getLogger(__name__)
+
+# _NET_WM_DESKTOP of windows shown on every desktop
+ALL_DESKTOPS = 0xFFFFFFFF
+
+
+def _overlap(a: tuple, b: tuple) -> int:
+    """Area shared by two (x, y, width, height) rectangles"""
+    width = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    height = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    return width * height if width > 0 and height > 0 else 0
+
+
+def _monitor_of(rect: tuple, monitors: list) -> Optional[int]:
+    """Index of the monitor holding most of rect"""
+    best, best_area = None, 0
+    for index, monitor in enumerate(monitors):
+        area = _overlap(rect, monitor)
+        if area > best_area:
+            best, best_area = index, area
+    return best
+
+
+def occluded_monitors(snapshot: dict, ignore_pids=(), coverage: float = 0.95) -> list:
+    """
+    For each monitor of snapshot, whether no part of the wallpaper on it can be seen.
+
+    snapshot is what a window-state provider returns: {"monitors": [(x, y,
+    width, height), ...], "desktop": current desktop, "windows": [window,
+    ...]} with every window a dict of "rect", "fullscreen", "maximized",
+    "hidden", "desktop" and "pid". A monitor counts as covered by a visible
+    window on the current desktop that is maximised (the panels may still
+    show, the wallpaper does not) or that is fullscreen or simply large
+    enough to cover at least coverage of the monitor. Minimised windows,
+    windows of other desktops and those of ignore_pids (the wallpaper player
+    itself) never cover anything.
+    """
+    monitors = snapshot.get("monitors") or []
+    covered = [False] * len(monitors)
+    current_desktop = snapshot.get("desktop")
+    for window in snapshot.get("windows", ()):
+        if window.get("hidden") or window.get("pid") in ignore_pids:
+            continue
+        desktop = window.get("desktop")
+        if desktop not in (None, ALL_DESKTOPS) and current_desktop is not None and desktop != current_desktop:
+            continue
+        rect = window["rect"]
+        if window.get("maximized") and not window.get("fullscreen"):
+            index = _monitor_of(rect, monitors)
+            if index is not None:
+                covered[index] = True
+            continue
+        for index, monitor in enumerate(monitors):
+            if not covered[index] and _overlap(rect, monitor) >= coverage * monitor[2] * monitor[3]:
+                covered[index] = True
+    return covered
+
+
+# ---------------------------------------------------------
+#  X11 window state (libX11 through ctypes)
+# ---------------------------------------------------------
+_STRUCTURE_NOTIFY_MASK = 1 << 17
+_PROPERTY_CHANGE_MASK = 1 << 22
+
+_ATOMS = (
+    "_NET_ACTIVE_WINDOW", "_NET_CLIENT_LIST_STACKING", "_NET_CURRENT_DESKTOP",
+    "_NET_WM_STATE", "_NET_WM_STATE_FULLSCREEN", "_NET_WM_STATE_MAXIMIZED_VERT",
+    "_NET_WM_STATE_MAXIMIZED_HORZ", "_NET_WM_STATE_HIDDEN", "_NET_WM_DESKTOP", "_NET_WM_PID",
+    "_NET_WM_WINDOW_TYPE", "_NET_WM_WINDOW_TYPE_DESKTOP", "_NET_WM_WINDOW_TYPE_DOCK",
+)
+
+
+class _XRRMonitorInfo(ctypes.Structure):
+    _fields_ = [("name", ctypes.c_ulong), ("primary", ctypes.c_int), ("automatic", ctypes.c_int),
+                ("noutput", ctypes.c_int), ("x", ctypes.c_int), ("y", ctypes.c_int),
+                ("width", ctypes.c_int), ("height", ctypes.c_int),
+                ("mwidth", ctypes.c_int), ("mheight", ctypes.c_int), ("outputs", ctypes.c_void_p)]
+
+
+# Windows vanish between listing and querying them; Xlib's default handler
+# would exit the process on the resulting BadWindow
+_X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)(lambda display, error: 0)
+
+
+def _load_xlib():
+    path = ctypes.util.find_library("X11")
+    if not path:
+        return None, None
+    xlib = ctypes.cdll.LoadLibrary(path)
+    xlib.XOpenDisplay.restype = ctypes.c_void_p
+    xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+    xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    xlib.XInternAtom.restype = ctypes.c_ulong
+    xlib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+    xlib.XSelectInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_long]
+    xlib.XConnectionNumber.argtypes = [ctypes.c_void_p]
+    xlib.XPending.argtypes = [ctypes.c_void_p]
+    xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    xlib.XFlush.argtypes = [ctypes.c_void_p]
+    xlib.XFree.argtypes = [ctypes.c_void_p]
+    xlib.XGetWindowProperty.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_long, ctypes.c_long, ctypes.c_int,
+        ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_void_p)]
+    xlib.XGetGeometry.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_uint), ctypes.POINTER(ctypes.c_uint),
+        ctypes.POINTER(ctypes.c_uint), ctypes.POINTER(ctypes.c_uint)]
+    xlib.XTranslateCoordinates.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+        ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_ulong)]
+    xlib.XSetErrorHandler.argtypes = [ctypes.c_void_p]
+    xlib.XSetErrorHandler.restype = ctypes.c_void_p
+
+    xrandr = None
+    path = ctypes.util.find_library("Xrandr")
+    if path:
+        xrandr = ctypes.cdll.LoadLibrary(path)
+        xrandr.XRRGetMonitors.restype = ctypes.POINTER(_XRRMonitorInfo)
+        xrandr.XRRGetMonitors.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int,
+                                          ctypes.POINTER(ctypes.c_int)]
+        xrandr.XRRFreeMonitors.argtypes = [ctypes.c_void_p]
+    return xlib, xrandr
+
+
+class X11WindowProvider:
+    """
+    Window state of an EWMH desktop, read over a private X connection.
+
+    Listens for PropertyNotify on the root window (_NET_ACTIVE_WINDOW,
+    _NET_CLIENT_LIST_STACKING, _NET_CURRENT_DESKTOP) and on every client
+    (_NET_WM_STATE, _NET_WM_DESKTOP), plus ConfigureNotify for moves and
+    resizes, so wait() wakes up as soon as something changes. Monitors come
+    from RandR when libXrandr is there, else the root window is one monitor.
+    Uses libX11 through ctypes: no Python X bindings are needed. Must be
+    used from one thread only, the one that called open().
+    """
+
+    def __init__(self, display_name: str = None):
+        self.display_name = display_name or os.environ.get("DISPLAY")
+        self._xlib = None
+        self._xrandr = None
+        self._display = None
+        self._root = 0
+        self._atoms = {}
+        self._watched = set()
+        self._event = (ctypes.c_long * 24)()
+
+    @staticmethod
+    def is_supported() -> bool:
+        return bool(os.environ.get("DISPLAY")) and ctypes.util.find_library("X11") is not None
+
+    def open(self):
+        self._xlib, self._xrandr = _load_xlib()
+        if self._xlib is None:
+            raise OSError("libX11 not found")
+        self._display = self._xlib.XOpenDisplay(self.display_name.encode() if self.display_name else None)
+        if not self._display:
+            raise OSError(f"Cannot open X display {self.display_name!r}")
+        self._xlib.XSetErrorHandler(ctypes.cast(_X_ERROR_HANDLER, ctypes.c_void_p))
+        self._root = self._xlib.XDefaultRootWindow(self._display)
+        self._atoms = {name: self._xlib.XInternAtom(self._display, name.encode(), 0) for name in _ATOMS}
+        self._xlib.XSelectInput(self._display, self._root, _PROPERTY_CHANGE_MASK | _STRUCTURE_NOTIFY_MASK)
+        self._xlib.XFlush(self._display)
+
+    def close(self):
+        if self._display:
+            self._xlib.XCloseDisplay(self._display)
+            self._display = None
+            self._watched.clear()
+
+    def wait(self, timeout: float) -> bool:
+        """Block until the window state may have changed or timeout passes; True on change"""
+        if self._drain():
+            return True
+        try:
+            readable, _, _ = select.select([self._xlib.XConnectionNumber(self._display)], [], [], timeout)
+        except (OSError, ValueError):
+            time.sleep(timeout)
+            return False
+        return bool(readable) and self._drain()
+
+    def snapshot(self) -> dict:
+        desktop = self._cardinals(self._root, "_NET_CURRENT_DESKTOP")
+        clients = self._cardinals(self._root, "_NET_CLIENT_LIST_STACKING")
+        windows = []
+        for window in clients:
+            if window not in self._watched:
+                self._xlib.XSelectInput(self._display, window, _PROPERTY_CHANGE_MASK | _STRUCTURE_NOTIFY_MASK)
+            state = self._describe(window)
+            if state is not None:
+                windows.append(state)
+        # Closed windows are dropped by the server along with their event masks
+        self._watched = set(clients)
+        return {"monitors": self._monitors(), "desktop": desktop[0] if desktop else None, "windows": windows}
+
+    def _drain(self) -> bool:
+        changed = False
+        while self._xlib.XPending(self._display):
+            self._xlib.XNextEvent(self._display, self._event)
+            changed = True
+        return changed
+
+    def _cardinals(self, window: int, name: str) -> list:
+        """A 32-bit (CARDINAL, WINDOW or ATOM) property as a list of ints"""
+        actual_type = ctypes.c_ulong()
+        actual_format = ctypes.c_int()
+        count = ctypes.c_ulong()
+        remaining = ctypes.c_ulong()
+        data = ctypes.c_void_p()
+        status = self._xlib.XGetWindowProperty(
+            self._display, window, self._atoms[name], 0, 4096, 0, 0,
+            ctypes.byref(actual_type), ctypes.byref(actual_format), ctypes.byref(count),
+            ctypes.byref(remaining), ctypes.byref(data))
+        if status != 0 or not data.value:
+            return []
+        try:
+            if actual_format.value != 32:
+                return []
+            # Format 32 data is returned as an array of C longs
+            values = ctypes.cast(data, ctypes.POINTER(ctypes.c_ulong))
+            return [values[i] & 0xFFFFFFFF for i in range(count.value)]
+        finally:
+            self._xlib.XFree(data)
+
+    def _describe(self, window: int) -> Optional[dict]:
+        types = self._cardinals(window, "_NET_WM_WINDOW_TYPE")
+        if self._atoms["_NET_WM_WINDOW_TYPE_DESKTOP"] in types or self._atoms["_NET_WM_WINDOW_TYPE_DOCK"] in types:
+            return None
+        root = ctypes.c_ulong()
+        x, y = ctypes.c_int(), ctypes.c_int()
+        width, height, border, depth = ctypes.c_uint(), ctypes.c_uint(), ctypes.c_uint(), ctypes.c_uint()
+        if not self._xlib.XGetGeometry(self._display, window, ctypes.byref(root), ctypes.byref(x), ctypes.byref(y),
+                                       ctypes.byref(width), ctypes.byref(height),
+                                       ctypes.byref(border), ctypes.byref(depth)):
+            return None
+        child = ctypes.c_ulong()
+        if not self._xlib.XTranslateCoordinates(self._display, window, self._root, 0, 0,
+                                                ctypes.byref(x), ctypes.byref(y), ctypes.byref(child)):
+            return None
+        state = set(self._cardinals(window, "_NET_WM_STATE"))
+        desktop = self._cardinals(window, "_NET_WM_DESKTOP")
+        pid = self._cardinals(window, "_NET_WM_PID")
+        return {
+            "id": window,
+            "rect": (x.value, y.value, width.value, height.value),
+            "fullscreen": self._atoms["_NET_WM_STATE_FULLSCREEN"] in state,
+            "maximized": {self._atoms["_NET_WM_STATE_MAXIMIZED_VERT"],
+                          self._atoms["_NET_WM_STATE_MAXIMIZED_HORZ"]} <= state,
+            "hidden": self._atoms["_NET_WM_STATE_HIDDEN"] in state,
+            "desktop": desktop[0] if desktop else None,
+            "pid": pid[0] if pid else None,
+        }
+
+    def _monitors(self) -> list:
+        if self._xrandr is not None:
+            count = ctypes.c_int()
+            info = self._xrandr.XRRGetMonitors(self._display, self._root, 1, ctypes.byref(count))
+            if info:
+                try:
+                    monitors = [(info[i].x, info[i].y, info[i].width, info[i].height) for i in range(count.value)]
+                finally:
+                    self._xrandr.XRRFreeMonitors(info)
+                if monitors:
+                    return monitors
+        root = ctypes.c_ulong()
+        x, y = ctypes.c_int(), ctypes.c_int()
+        width, height, border, depth = ctypes.c_uint(), ctypes.c_uint(), ctypes.c_uint(), ctypes.c_uint()
+        self._xlib.XGetGeometry(self._display, self._root, ctypes.byref(root), ctypes.byref(x), ctypes.byref(y),
+                                ctypes.byref(width), ctypes.byref(height), ctypes.byref(border), ctypes.byref(depth))
+        return [(0, 0, width.value, height.value)]
+
+
+class AutoPauseController(QObject):
+    """
+    Pauses the video wallpaper while windows cover the whole desktop (Linux/X11).
+
+    The worker waits on the provider (see X11WindowProvider), which returns as
+    soon as the window state changes; after settle_seconds to let a burst of
+    events finish it takes a snapshot, works out the covered monitors (see
+    occluded_monitors) and calls set_paused(True) once every monitor is
+    covered, set_paused(False) once one is visible again. Without events it
+    still re-checks every poll_interval seconds, which is all the detection
+    there is if the event stream breaks. A pause it did not make is never
+    undone by it, and set_active(False) (no video playing) resumes only what
+    it paused. ignore_pids returns the wallpaper player's processes, whose
+    fullscreen window must not count. evaluate() runs one pass and can be
+    driven directly with a fake provider.
+    """
+
+    # True when the desktop became fully covered, False when it is visible again
+    occlusion_changed = Signal(bool)
+
+    def __init__(self, provider, set_paused: Callable[[bool], bool], ignore_pids: Callable[[], set] = None,
+                 poll_interval: float = 2.0, settle_seconds: float = 0.05, retry_seconds: float = 0.25,
+                 coverage: float = 0.95, parent=None):
+        super().__init__(parent)
+        self.provider = provider
+        self.set_paused = set_paused
+        self.ignore_pids = ignore_pids or (lambda: set())
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.retry_seconds = retry_seconds
+        self.coverage = coverage
+
+        self.occluded = False
+        self.covered = []
+        self._active = False
+        self._paused_by_us = False
+        self._pending = False
+
+        self._lock = Lock()
+        self._stop_event = Event()
+        self.thread = None
+
+    # ---------------------------------------------------------
+    #  Public API
+    # ---------------------------------------------------------
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = Thread(target=self._watch_loop, name="AutoPause", daemon=True)
+        self.thread.start()
+        logger.info("Auto-pause started")
+
+    def stop(self):
+        self._stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5)
+        logger.info("Auto-pause stopped")
+
+    def set_active(self, active: bool):
+        """A video wallpaper started (True) or was replaced by a still (False)"""
+        with self._lock:
+            self._active = active
+            # A new player starts playing; a stopped one needs no resume
+            self._paused_by_us = False
+            self._pending = active and self.occluded
+
+    def evaluate(self) -> bool:
+        """Take a snapshot, update the occlusion state and sync the player; returns occluded"""
+        covered = occluded_monitors(self.provider.snapshot(), self.ignore_pids(), self.coverage)
+        occluded = bool(covered) and all(covered)
+        if covered != self.covered:
+            logger.debug("Covered monitors: %s", covered)
+            self.covered = covered
+        if occluded != self.occluded:
+            self.occluded = occluded
+            logger.info("Desktop %s", "covered, pausing the video wallpaper" if occluded else "visible again")
+            self.occlusion_changed.emit(occluded)
+            with self._lock:
+                self._pending = True
+        self._sync_player()
+        return occluded
+
+    # ---------------------------------------------------------
+    #  Internals
+    # ---------------------------------------------------------
+    def _sync_player(self):
+        with self._lock:
+            if not self._pending:
+                return
+            if not self._active:
+                self._pending = False
+                return
+            pause = self.occluded
+            if not pause and not self._paused_by_us:
+                self._pending = False
+                return
+        if self.set_paused(pause):
+            with self._lock:
+                self._paused_by_us = pause
+                self._pending = False
+
+    def _watch_loop(self):
+        logger.debug("Auto-pause loop started")
+        try:
+            self.provider.open()
+        except OSError as e:
+            logger.warning("Auto-pause unavailable: %s", e)
+            return
+        try:
+            changed = True
+            last_check = 0.0
+            while not self._stop_event.is_set():
+                try:
+                    if changed or time.monotonic() - last_check >= self.poll_interval:
+                        last_check = time.monotonic()
+                        self.evaluate()
+                    else:
+                        # set_active() or a failed pause/resume (mpv still starting)
+                        self._sync_player()
+                except Exception as e:
+                    logger.error("Auto-pause check failed: %s", e, exc_info=True)
+                changed = self.provider.wait(self.retry_seconds)
+                if changed and self.settle_seconds:
+                    time.sleep(self.settle_seconds)
+        finally:
+            self.provider.close()
+            logger.debug("Auto-pause loop finished")
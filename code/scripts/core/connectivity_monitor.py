@@ -0,0 +1,121 @@
+import time
+import logging
+from threading import Thread, Event, Lock
+from typing import Callable
+
+from PySide6.QtCore import QObject, Signal
+
+from utils.system_utils import is_connected_to_internet
+
+
+class ConnectivityMonitor(QObject):
+    """
+    Tracks whether the internet is reachable, in the background.
+
+    The state is cached: is_online() only reads a flag, so GUI handlers can call
+    it freely. A worker thread re-probes once the cached state is older than its
+    TTL. Real network traffic keeps the cache warm through report_success() /
+    report_failure(), so the probe rarely has to run while the app is busy.
+    online_changed fires on every transition.
+    """
+
+    online_changed = Signal(bool)
+
+    # Probe endpoints, tried in order; any one answering means online
+    PROBE_HOSTS = (("8.8.8.8", 53), ("1.1.1.1", 53))
+
+    def __init__(self, online_ttl: float = 120.0, offline_ttl: float = 15.0, probe_timeout: float = 3.0,
+                 probe: Callable[[], bool] = None, parent=None):
+        super().__init__(parent)
+        logging.debug("Initializing ConnectivityMonitor")
+        self.online_ttl = online_ttl
+        self.offline_ttl = offline_ttl
+        self.probe_timeout = probe_timeout
+        self.probe = probe or self._default_probe
+
+        # Optimistic until the first probe says otherwise
+        self._online = True
+        self._checked_at = 0.0
+        self._lock = Lock()
+        self._wake_event = Event()
+        self._stop_event = Event()
+        self.thread = None
+
+    # ---------------------------------------------------------
+    #  Public API
+    # ---------------------------------------------------------
+    def start(self):
+        """Start background probing"""
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = Thread(target=self._monitor_loop, name="ConnectivityMonitor", daemon=True)
+        self.thread.start()
+        logging.info("Connectivity monitor started")
+
+    def stop(self):
+        """Stop background probing"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=self.probe_timeout * len(self.PROBE_HOSTS) + 1)
+        logging.info("Connectivity monitor stopped")
+
+    def is_online(self) -> bool:
+        """Last known state, never blocks"""
+        return self._online
+
+    def report_success(self):
+        """A real request reached the internet"""
+        self._update(True, source="traffic")
+
+    def report_failure(self):
+        """
+        A real request failed at the network level. The server may simply be
+        down, so this only triggers an early probe instead of going offline.
+        """
+        logging.debug("Network failure reported, re-probing connectivity")
+        self._wake_event.set()
+
+    def check_now(self):
+        """Ask the worker to probe as soon as possible"""
+        self._wake_event.set()
+
+    # ---------------------------------------------------------
+    #  Internals
+    # ---------------------------------------------------------
+    def _default_probe(self) -> bool:
+        return any(is_connected_to_internet(host, port, self.probe_timeout) for host, port in self.PROBE_HOSTS)
+
+    def _update(self, online: bool, source: str):
+        with self._lock:
+            changed = online != self._online
+            self._online = online
+            self._checked_at = time.monotonic()
+        if changed:
+            if online:
+                logging.info(f"Connectivity restored ({source})")
+            else:
+                logging.warning(f"Connectivity lost ({source})")
+            self.online_changed.emit(online)
+
+    def _seconds_until_stale(self) -> float:
+        ttl = self.online_ttl if self._online else self.offline_ttl
+        return max(0.0, self._checked_at + ttl - time.monotonic())
+
+    def _monitor_loop(self):
+        logging.debug("Connectivity monitor loop started")
+        while not self._stop_event.is_set():
+            # Traffic reports push the deadline back; a wake-up forces a probe
+            woken = self._wake_event.wait(self._seconds_until_stale())
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+            if not woken and self._seconds_until_stale() > 0:
+                continue
+            try:
+                self._update(self.probe(), source="probe")
+            except Exception as e:
+                logging.error(f"Connectivity probe failed: {e}")
+                self._update(False, source="probe error")
+        logging.debug("Connectivity monitor loop finished")
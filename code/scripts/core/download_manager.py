@@ -1,16 +1,18 @@
 import time
 import os
 import platform
-import yt_dlp
 from pathlib import Path
 from typing import Optional
 import logging
 
 from PySide6.QtCore import QThread, Signal
 
-from utils.path_utils import VIDEOS_DIR,IMAGES_DIR
+from utils.path_utils import STAGING_DIR
+from utils.file_utils import get_staging_path
+from utils.download_cache import get_download_cache
+from utils.system_utils import get_primary_screen_dimensions
 
-logger = logging.getLogger()
+logger = logging.getLogger(__name__)
 
 
 class DownloaderThread(QThread):
@@ -22,19 +24,21 @@ class DownloaderThread(QThread):
         logger.info(f"Initializing DownloaderThread for URL: {url}")
         super().__init__(parent)
         self.url = url
+        # Read on the GUI thread; QScreen must not be touched from run()
+        self.max_width, self.max_height = get_primary_screen_dimensions()
         self._ensure_directories()
 
     def _ensure_directories(self):
         """Ensure directories exist and are writable on both platforms"""
-        logger.debug("Ensuring video directory exists and is writable")
+        logger.debug("Ensuring staging directory exists and is writable")
         try:
-            VIDEOS_DIR.mkdir(parents=True, exist_ok=True)
-            logger.debug(f"Video directory ensured: {VIDEOS_DIR}")
+            STAGING_DIR.mkdir(parents=True, exist_ok=True)
+            logger.debug(f"Staging directory ensured: {STAGING_DIR}")
             
             # On Linux, ensure proper permissions
             if platform.system() != "Windows":
                 try:
-                    os.chmod(VIDEOS_DIR, 0o755)
+                    os.chmod(STAGING_DIR, 0o755)
                     logger.debug("Set directory permissions on Linux")
                 except Exception as e:
                     logger.warning(f"Could not set directory permissions: {e}")
@@ -44,15 +48,36 @@ class DownloaderThread(QThread):
             logger.error(f"Directory setup failed: {e}", exc_info=True)
             self.error.emit(f"Directory setup failed: {e}")
 
+    def _build_format_selector(self) -> str:
+        """
+        Video-only format capped at the screen resolution.
+
+        mpv plays wallpapers with --no-audio, so audio streams and the merge step
+        are wasted bandwidth. The '?' keeps formats with unknown dimensions eligible
+        and the trailing fallbacks keep single-file sources downloadable.
+        """
+        cap = f"[height<=?{self.max_height}][width<=?{self.max_width}]"
+        return f"bestvideo{cap}/best{cap}/bestvideo/best"
+
     def run(self):
         """Main download thread with improved error handling"""
-        logging.info(f"Starting download thread for URL: {self.url}")
+        logger.info(f"Starting download thread for URL: {self.url}")
+
+        # yt-dlp loads hundreds of extractors; only pay for it when a video is downloaded
+        try:
+            import yt_dlp
+        except ImportError as e:
+            logger.error(f"yt-dlp is not available: {e}")
+            self.error.emit(f"yt-dlp is not available: {e}")
+            return
         
         try:
             # Configure yt-dlp with better error handling
             ydl_opts = {
-                'outtmpl': str(VIDEOS_DIR / '%(title)s.%(ext)s'),
-                'merge_output_format': 'mp4',
+                # Download into staging; the UI renames it into the chosen folder
+                'outtmpl': str(STAGING_DIR / '%(title)s.%(ext)s'),
+                'format': self._build_format_selector(),
+                'concurrent_fragment_downloads': 4,  # parallel DASH/HLS fragments
                 'noplaylist': True,
                 'continuedl': True,
                 'noprogress': True,  # We handle progress ourselves
@@ -63,6 +88,7 @@ class DownloaderThread(QThread):
                 'retries': 3,
                 'restrictfilenames': True,  # Restrict to safe filenames
             }
+            logger.info(f"yt-dlp format selector: {ydl_opts['format']}")
             
             # Custom progress hook
             def progress_hook(d):
@@ -79,82 +105,58 @@ class DownloaderThread(QThread):
                 
                 elif d['status'] == 'finished':
                     self.progress.emit(100, "Download completed! Processing...")
-                    logging.info(f"Download finished: {d.get('filename', 'Unknown')}")
+                    logger.info("Download finished: %s", d.get('filename', 'Unknown'))
                 
                 elif d['status'] == 'error':
-                    logging.error(f"Download error in progress hook: {d}")
+                    logger.error("Download error in progress hook: %r", d)
                     self.progress.emit(0, f"Error: {d.get('error', 'Unknown error')}")
             
             ydl_opts['progress_hooks'] = [progress_hook]
             
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                logging.info("Starting yt-dlp download")
+                logger.info("Starting yt-dlp download")
                 self.progress.emit(0, "Starting download...")
                 
-                # Extract info first to validate
-                info = ydl.extract_info(self.url, download=False)
+                # Single pass: extract and download together
+                info = ydl.extract_info(self.url, download=True)
                 if not info:
                     raise Exception("Could not extract video information")
                 
-                logging.info(f"Video info extracted: {info.get('title', 'Unknown')}")
-                self.progress.emit(5, f"Preparing: {info.get('title', 'Video')}")
+                logger.info(f"Video downloaded: {info.get('title', 'Unknown')}")
                 
-                # Start download
-                result = ydl.download([self.url])
-                logging.info(f"Download process completed with result: {result}")
-                
-                # Find the actual downloaded file
-                downloaded_file = self._find_downloaded_file(info.get('title'))
+                downloaded_file = self._get_downloaded_file(info)
                 if downloaded_file and downloaded_file.exists():
                     self.progress.emit(100, "Download completed successfully!")
-                    logging.info(f"Download successful: {downloaded_file}")
+                    logger.info(f"Download successful: {downloaded_file}")
                     self.done.emit(str(downloaded_file))
                 else:
                     raise Exception("Downloaded file not found after completion")
                     
         except yt_dlp.utils.DownloadError as e:
             error_msg = f"Download failed: {str(e)}"
-            logging.error(error_msg)
+            logger.error(error_msg)
             self.error.emit(error_msg)
         except yt_dlp.utils.ExtractorError as e:
             error_msg = f"Extraction failed: {str(e)}"
-            logging.error(error_msg)
+            logger.error(error_msg)
             self.error.emit(error_msg)
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
-            logging.error(error_msg, exc_info=True)
+            logger.error(error_msg, exc_info=True)
             self.error.emit(error_msg)
         finally:
-            logging.info("Download thread finished")
+            logger.info("Download thread finished")
 
-    def _find_downloaded_file(self, title):
-        """Find the actual downloaded file after completion"""
-        if not title:
-            return None
-        
-        # Look for files that match the title pattern
-        possible_patterns = [
-            f"{title}.mp4",
-            f"{title}.mkv", 
-            f"{title}.webm",
-            f"{title}.*"
-        ]
-        
-        for pattern in possible_patterns:
-            for file_path in VIDEOS_DIR.glob(pattern):
-                if file_path.exists() and file_path.stat().st_size > 0:
-                    logging.info(f"Found downloaded file: {file_path}")
-                    return file_path
-        
-        # If no exact match, look for recent files in download directory
-        recent_files = sorted(VIDEOS_DIR.glob("*"), key=os.path.getmtime, reverse=True)
-        for file_path in recent_files[:5]:  # Check 5 most recent files
-            if file_path.exists() and file_path.stat().st_size > 0:
-                logging.info(f"Found recent file as download: {file_path}")
-                return file_path
-        
-        logging.warning("No downloaded file found")
-        return 
+    def _get_downloaded_file(self, info: dict) -> Optional[Path]:
+        """Read the final output path yt-dlp reported for this download"""
+        for download in info.get('requested_downloads') or []:
+            filepath = download.get('filepath') or download.get('_filename')
+            if filepath:
+                logger.debug(f"yt-dlp reported output file: {filepath}")
+                return Path(filepath)
+
+        logger.warning("yt-dlp did not report an output file")
+        return None
     
 
 class DirectDownloadThread(QThread):
@@ -163,7 +165,7 @@ class DirectDownloadThread(QThread):
     error = Signal(str)
 
     def __init__(self, url: str, file_path: str, parent=None):
-        logging.info(f"Initializing DirectDownloadThread for URL: {url}")
+        logger.info(f"Initializing DirectDownloadThread for URL: {url}")
         super().__init__(parent)
         self.url = url
         self.file_path = file_path
@@ -172,12 +174,29 @@ class DirectDownloadThread(QThread):
     def run(self):
         try:
             import requests
-            logging.info(f"Starting direct download: {self.url} -> {self.file_path}")
+            logger.info(f"Starting direct download: {self.url} -> {self.file_path}")
+            
+            # Reuse a previous download of the same URL when possible
+            cache = get_download_cache()
+            cached = cache.lookup(self.url)
+            if cached and cache.is_fresh(cached):
+                logger.info(f"Using cached download: {cached['path']}")
+                self.progress.emit(100, "Using cached file")
+                self.done.emit(cached['path'])
+                return
             
             self.progress.emit(0, "Connecting...")
             
-            # Stream download with progress
-            response = requests.get(self.url, stream=True, timeout=30)
+            # Stream download with progress (conditional if we have a cached copy)
+            response = requests.get(self.url, stream=True, timeout=30,
+                                    headers=cache.conditional_headers(cached))
+            if cached and response.status_code == 304:
+                response.close()
+                cache.touch(self.url)
+                logger.info(f"Server reports cached download unchanged: {cached['path']}")
+                self.progress.emit(100, "Using cached file")
+                self.done.emit(cached['path'])
+                return
             response.raise_for_status()
             
             total_size = int(response.headers.get('content-length', 0))
@@ -185,10 +204,13 @@ class DirectDownloadThread(QThread):
             
             self.progress.emit(0, f"Downloading... (0%)")
             
+            # Progress is reported per 0.1%, not per chunk, to keep the GUI thread quiet
+            last_step = None
+            
             with open(self.file_path, 'wb') as file:
-                for chunk in response.iter_content(chunk_size=8192):
+                for chunk in response.iter_content(chunk_size=65536):
                     if self._cancelled:
-                        logging.info("Download cancelled by user")
+                        logger.info("Download cancelled by user")
                         if os.path.exists(self.file_path):
                             os.remove(self.file_path)
                         return
@@ -199,28 +221,38 @@ class DirectDownloadThread(QThread):
                         
                         if total_size > 0:
                             percent = (downloaded_size / total_size) * 100
+                            step = int(percent * 10)
+                            if step == last_step:
+                                continue
+                            last_step = step
                             mb_downloaded = downloaded_size / (1024 * 1024)
                             mb_total = total_size / (1024 * 1024)
                             
                             status = f"Downloading... {percent:.1f}% ({mb_downloaded:.1f}/{mb_total:.1f} MB)"
                             self.progress.emit(percent, status)
                         else:
+                            step = downloaded_size // (100 * 1024)
+                            if step == last_step:
+                                continue
+                            last_step = step
                             status = f"Downloading... {downloaded_size / (1024 * 1024):.1f} MB"
                             self.progress.emit(0, status)
             
             # Verify download
             if os.path.exists(self.file_path) and os.path.getsize(self.file_path) > 0:
                 self.progress.emit(100, "Download completed!")
-                logging.info(f"Direct download completed successfully: {self.file_path}")
+                logger.info(f"Direct download completed successfully: {self.file_path}")
+                cache.store(self.url, self.file_path,
+                            response.headers.get('ETag'), response.headers.get('Last-Modified'))
                 self.done.emit(self.file_path)
             else:
                 error_msg = "Downloaded file is empty or missing"
-                logging.error(error_msg)
+                logger.error(error_msg)
                 self.error.emit(error_msg)
                 
         except Exception as e:
             error_msg = f"Direct download failed: {str(e)}"
-            logging.error(error_msg, exc_info=True)
+            logger.error(error_msg, exc_info=True)
             
             # Clean up partial download
             if os.path.exists(self.file_path):
@@ -234,7 +266,7 @@ class DirectDownloadThread(QThread):
     def cancel(self):
         """Cancel the download"""
         self._cancelled = True
-        logging.info("Download cancellation requested")
+        logger.info("Download cancellation requested")
 
 
 class ImageDownloadThread(QThread):
@@ -243,7 +275,7 @@ class ImageDownloadThread(QThread):
     error = Signal(str)
 
     def __init__(self, url: str, download_path: str = None, parent=None):
-        logging.info(f"Initializing ImageDownloadThread for URL: {url}")
+        logger.info(f"Initializing ImageDownloadThread for URL: {url}")
         super().__init__(parent)
         self.url = url
         self.download_path = download_path
@@ -253,7 +285,7 @@ class ImageDownloadThread(QThread):
         try:
             import requests
             from urllib.parse import urlparse
-            logging.info(f"Starting image download: {self.url}")
+            logger.info(f"Starting image download: {self.url}")
             
             self.progress.emit(0, "Connecting to image source...")
             
@@ -269,13 +301,30 @@ class ImageDownloadThread(QThread):
                 
                 # Sanitize filename
                 filename = self._get_safe_filename(filename)
-                download_path = IMAGES_DIR / filename
+                download_path = get_staging_path(filename)
             
             # Ensure destination directory exists
             download_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Stream download with progress
-            response = requests.get(self.url, stream=True, timeout=30)
+            # Reuse a previous download of the same URL when possible
+            cache = get_download_cache()
+            cached = cache.lookup(self.url)
+            if cached and cache.is_fresh(cached):
+                logger.info(f"Using cached image: {cached['path']}")
+                self.progress.emit(100, "Using cached image")
+                self.done.emit(cached['path'])
+                return
+            
+            # Stream download with progress (conditional if we have a cached copy)
+            response = requests.get(self.url, stream=True, timeout=30,
+                                    headers=cache.conditional_headers(cached))
+            if cached and response.status_code == 304:
+                response.close()
+                cache.touch(self.url)
+                logger.info(f"Server reports cached image unchanged: {cached['path']}")
+                self.progress.emit(100, "Using cached image")
+                self.done.emit(cached['path'])
+                return
             response.raise_for_status()
             
             total_size = int(response.headers.get('content-length', 0))
@@ -283,10 +332,13 @@ class ImageDownloadThread(QThread):
             
             self.progress.emit(0, f"Downloading image... (0%)")
             
+            # Progress is reported per 0.1%, not per chunk, to keep the GUI thread quiet
+            last_step = None
+            
             with open(download_path, 'wb') as file:
-                for chunk in response.iter_content(chunk_size=8192):
+                for chunk in response.iter_content(chunk_size=65536):
                     if self._cancelled:
-                        logging.info("Image download cancelled by user")
+                        logger.info("Image download cancelled by user")
                         if os.path.exists(download_path):
                             os.remove(download_path)
                         return
@@ -297,25 +349,35 @@ class ImageDownloadThread(QThread):
                         
                         if total_size > 0:
                             percent = (downloaded_size / total_size) * 100
+                            step = int(percent * 10)
+                            if step == last_step:
+                                continue
+                            last_step = step
                             status = f"Downloading image... {percent:.1f}%"
                             self.progress.emit(percent, status)
                         else:
+                            step = downloaded_size // (100 * 1024)
+                            if step == last_step:
+                                continue
+                            last_step = step
                             status = f"Downloading image... {downloaded_size / 1024:.1f} KB"
                             self.progress.emit(0, status)
             
             # Verify download
             if os.path.exists(download_path) and os.path.getsize(download_path) > 0:
                 self.progress.emit(100, "Image download completed!")
-                logging.info(f"Image download completed successfully: {download_path}")
+                logger.info(f"Image download completed successfully: {download_path}")
+                cache.store(self.url, str(download_path),
+                            response.headers.get('ETag'), response.headers.get('Last-Modified'))
                 self.done.emit(str(download_path))
             else:
                 error_msg = "Downloaded image file is empty or missing"
-                logging.error(error_msg)
+                logger.error(error_msg)
                 self.error.emit(error_msg)
                 
         except Exception as e:
             error_msg = f"Image download failed: {str(e)}"
-            logging.error(error_msg, exc_info=True)
+            logger.error(error_msg, exc_info=True)
             
             # Clean up partial download
             if 'download_path' in locals() and os.path.exists(download_path):
@@ -336,4 +398,4 @@ class ImageDownloadThread(QThread):
     def cancel(self):
         """Cancel the download"""
         self._cancelled = True
-        logging.info("Image download cancellation requested")
+        logger.info("Image download cancellation requested")
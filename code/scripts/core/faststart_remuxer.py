@@ -0,0 +1,94 @@
+import os
+import shutil
+import logging
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from core.proxy_transcoder import idle_io_prefix, low_priority_options
+from utils.mp4_atoms import FASTSTART_EXTENSIONS, needs_faststart
+from utils.path_utils import get_ffmpeg_path
+
+logger = logging.getLogger(__name__)
+
+REMUX_TIMEOUT = 600
+
+
+class FaststartRemuxer:
+    """
+    Moves the moov atom of imported MP4/MOV files to the front.
+
+    With moov at the end (common for downloads and screen recordings), mpv has
+    to read the end of the file before the first frame, which is slow on HDDs
+    and network shares and is paid on every wallpaper switch. remux() checks
+    the layout with a header-only atom scan and, when needed, rewrites the
+    file with ffmpeg -c copy -movflags +faststart (no re-encoding) into a
+    temporary file next to it, then swaps it in with os.replace. submit()
+    does the same on a background thread.
+    """
+
+    def __init__(self, ffmpeg: Path = None):
+        self.ffmpeg = ffmpeg or get_ffmpeg_path()
+        self._executor = None
+
+    def is_available(self) -> bool:
+        return self.ffmpeg is not None
+
+    def submit(self, path) -> Future:
+        """remux() on the background thread; the Future holds its result"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Faststart")
+        try:
+            return self._executor.submit(self.remux, str(path))
+        except RuntimeError:
+            # Shut down (app exiting)
+            future = Future()
+            future.set_result(False)
+            return future
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def remux(self, path) -> bool:
+        """Rewrite path with moov first if it is not already; True when the file was rewritten"""
+        path = Path(path)
+        # A download still named name.mp4.part counts as an .mp4
+        suffix = Path(path.name.removesuffix(".part")).suffix.lower()
+        if suffix not in FASTSTART_EXTENSIONS or not self.is_available():
+            return False
+        if not needs_faststart(str(path)):
+            return False
+
+        # .part: skipped by the collection and the prefetch pool while it is written
+        tmp_path = path.with_name(f".{path.name}.faststart.part")
+        container = "mov" if suffix == ".mov" else "mp4"
+        command = idle_io_prefix() + [
+            str(self.ffmpeg), "-hide_banner", "-nostdin", "-loglevel", "error", "-y", "-i", str(path),
+            "-map", "0", "-c", "copy", "-map_metadata", "0", "-movflags", "+faststart",
+            "-f", container, str(tmp_path)]
+        try:
+            result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                    timeout=REMUX_TIMEOUT, **low_priority_options())
+            if result.returncode != 0:
+                logger.warning("Faststart remux of %s failed: %s", path.name,
+                               result.stderr.decode("utf-8", "replace").strip()[-500:])
+                return False
+            if needs_faststart(str(tmp_path)) is not False:
+                logger.warning("Faststart remux of %s produced an unexpected layout, keeping the original", path.name)
+                return False
+            # Keep the original timestamps; only the box order changes
+            shutil.copystat(path, tmp_path)
+            os.replace(tmp_path, path)
+        except (OSError, subprocess.SubprocessError) as e:
+            # e.g. the file is open in the player on Windows; it stays as it was
+            logger.warning("Faststart remux of %s failed: %s", path.name, e)
+            return False
+        finally:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+        logger.info("Moved the MP4 index to the front of %s", path.name)
+        return True
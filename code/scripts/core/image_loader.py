@@ -0,0 +1,105 @@
+import os
+import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from PySide6.QtCore import QObject, QSize, Qt, QTimer, Signal
+from PySide6.QtGui import QImage, QImageIOHandler, QImageReader, QPixmap, QPixmapCache
+
+logger = logging.getLogger(__name__)
+
+# Shared by every QPixmapCache user in the process (Qt's default is 10 MB)
+PIXMAP_CACHE_LIMIT_KB = 48 * 1024
+
+
+def decode_scaled(path: str, target: QSize) -> QImage:
+    """
+    Decode an image at (about) the size it will be shown at, never larger than
+    the file. QImageReader.setScaledSize lets the JPEG plugin use libjpeg's DCT
+    scaling, so a 40 MP photo is decoded straight into a window-sized buffer
+    instead of being fully decoded and scaled afterwards. Safe on any thread.
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and target.isValid():
+        # EXIF rotation is applied after decoding; scale in the file's orientation
+        if reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+            target = target.transposed()
+        scaled = size.scaled(target, Qt.AspectRatioMode.KeepAspectRatioByExpanding)
+        if scaled.width() < size.width():
+            reader.setScaledSize(scaled)
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Cannot decode {path}: {reader.errorString()}")
+    return image
+
+
+class ImageLoader(QObject):
+    """
+    Loads display-sized pixmaps without blocking the GUI thread.
+
+    request() returns an id at once; loaded(id, path, pixmap) or
+    failed(id, path, error) follows on the GUI thread. Decoding happens on one
+    worker thread, and a request that has been superseded before its turn is
+    skipped. Decoded results are kept in QPixmapCache (byte budgeted), keyed by
+    path, modification time and size, so re-applying a wallpaper is instant.
+    """
+
+    loaded = Signal(int, str, object)
+    failed = Signal(int, str, str)
+    _decoded = Signal(int, str, str, object)
+
+    def __init__(self, cache_limit_kb: int = PIXMAP_CACHE_LIMIT_KB, parent=None):
+        super().__init__(parent)
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), cache_limit_kb))
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ImageLoader")
+        self._ids = itertools.count(1)
+        self._latest = 0
+        self._lock = Lock()
+        # QImage -> QPixmap has to happen on the GUI thread
+        self._decoded.connect(self._on_decoded)
+
+    def request(self, path: str, target: QSize) -> int:
+        request_id = next(self._ids)
+        with self._lock:
+            self._latest = request_id
+        key = self._cache_key(path, target)
+        pixmap = QPixmapCache.find(key) if key else None
+        if pixmap is not None and not pixmap.isNull():
+            logger.debug("Pixmap cache hit for %s", path)
+            QTimer.singleShot(0, lambda: self.loaded.emit(request_id, path, pixmap))
+            return request_id
+        self._executor.submit(self._decode, request_id, path, QSize(target), key)
+        return request_id
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _cache_key(path: str, target: QSize):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        return f"image:{path}:{mtime}:{target.width()}x{target.height()}"
+
+    def _decode(self, request_id: int, path: str, target: QSize, key):
+        with self._lock:
+            if request_id != self._latest:
+                logger.debug("Skipping superseded image request %d", request_id)
+                return
+        try:
+            image = decode_scaled(path, target)
+        except Exception as e:
+            logger.warning("Image decode failed: %s", e)
+            self.failed.emit(request_id, path, str(e))
+            return
+        self._decoded.emit(request_id, path, key or "", image)
+
+    def _on_decoded(self, request_id: int, path: str, key: str, image: QImage):
+        pixmap = QPixmap.fromImage(image)
+        if key:
+            QPixmapCache.insert(key, pixmap)
+        self.loaded.emit(request_id, path, pixmap)
@@ -0,0 +1,165 @@
+import json
+import time
+import logging
+from typing import Callable
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+from utils.ipc import SERVER_NAME, FrameDecoder, encode_frame
+
+logger = logging.getLogger(__name__)
+
+
+class IpcServer(QObject):
+    """
+    Command server for other instances, scripts and bin/tools/tapeciarnia_ctl.py.
+
+    Everything runs on the GUI thread without blocking: sockets are read from
+    readyRead as bytes arrive, and any number of framed requests (see
+    utils.ipc) can share one connection. Requests are collected for
+    batch_interval_ms and handled as a batch:
+
+    - commands registered with the same coalesce group (e.g. apply/next) only
+      run for the last request of the batch; earlier ones are answered with
+      {"coalesced": true}
+    - read-only commands (status, metrics) run once per batch and every
+      identical request gets the same result
+    """
+
+    def __init__(self, name: str = SERVER_NAME, batch_interval_ms: int = 20, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._decoders = {}
+        self._handlers = {}
+        self._pending = []
+        self._batch_timer = QTimer(self)
+        self._batch_timer.setSingleShot(True)
+        self._batch_timer.setInterval(batch_interval_ms)
+        self._batch_timer.timeout.connect(self._process_batch)
+        self.stats = {'requests': 0, 'coalesced': 0, 'errors': 0, 'batches': 0, 'max_batch': 0}
+
+    # ---------------------------------------------------------
+    #  Public API
+    # ---------------------------------------------------------
+    def register(self, command: str, handler: Callable[[dict], object], coalesce: str = None,
+                 read_only: bool = False):
+        """handler(args) runs on the GUI thread; its return value must be JSON serialisable"""
+        self._handlers[command] = (handler, coalesce, read_only)
+
+    def listen(self) -> bool:
+        # In case of stale pipe (after crash)
+        QLocalServer.removeServer(self.name)
+        if not self._server.listen(self.name):
+            logger.error("IPC server failed to listen on %s: %s", self.name, self._server.errorString())
+            return False
+        logger.info("IPC server listening on %s", self._server.fullServerName())
+        return True
+
+    def error_string(self) -> str:
+        return self._server.errorString()
+
+    def close(self):
+        self._batch_timer.stop()
+        self._server.close()
+        for sock in list(self._decoders):
+            sock.abort()
+
+    # ---------------------------------------------------------
+    #  Connections
+    # ---------------------------------------------------------
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            sock = self._server.nextPendingConnection()
+            self._decoders[sock] = FrameDecoder()
+            sock.readyRead.connect(lambda s=sock: self._on_ready_read(s))
+            sock.disconnected.connect(lambda s=sock: self._on_disconnected(s))
+            # Data may already be buffered (short-lived senders write and close at once)
+            if sock.bytesAvailable():
+                self._on_ready_read(sock)
+
+    def _on_ready_read(self, sock: QLocalSocket):
+        decoder = self._decoders.get(sock)
+        if decoder is None:
+            return
+        try:
+            messages = decoder.feed(bytes(sock.readAll()))
+        except (ValueError, UnicodeDecodeError) as e:
+            logger.warning("Dropping IPC connection with malformed data: %s", e)
+            self.stats['errors'] += 1
+            sock.abort()
+            return
+        for message in messages:
+            self._pending.append((sock, message))
+        if self._pending and not self._batch_timer.isActive():
+            self._batch_timer.start()
+
+    def _on_disconnected(self, sock: QLocalSocket):
+        if sock.bytesAvailable():
+            self._on_ready_read(sock)
+        self._decoders.pop(sock, None)
+        sock.deleteLater()
+
+    def _reply(self, sock: QLocalSocket, message: dict, reply: dict):
+        if "id" not in message or sock not in self._decoders:
+            return
+        reply["id"] = message["id"]
+        try:
+            sock.write(encode_frame(reply))
+        except (TypeError, ValueError) as e:
+            sock.write(encode_frame({"id": message["id"], "ok": False, "error": f"Unserialisable result: {e}"}))
+        sock.flush()
+
+    # ---------------------------------------------------------
+    #  Dispatch
+    # ---------------------------------------------------------
+    def _process_batch(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.stats['batches'] += 1
+        self.stats['requests'] += len(batch)
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
+        started = time.perf_counter()
+
+        # Index of the request that survives in each coalesce group
+        last_in_group = {}
+        for index, (_, message) in enumerate(batch):
+            entry = self._handlers.get(message.get("command"))
+            if entry and entry[1]:
+                last_in_group[entry[1]] = index
+
+        shared_results = {}
+        for index, (sock, message) in enumerate(batch):
+            command = message.get("command")
+            args = message.get("args") or {}
+            entry = self._handlers.get(command)
+            if entry is None:
+                self.stats['errors'] += 1
+                self._reply(sock, message, {"ok": False, "error": f"Unknown command: {command!r}"})
+                continue
+
+            handler, coalesce, read_only = entry
+            if coalesce and last_in_group[coalesce] != index:
+                self.stats['coalesced'] += 1
+                self._reply(sock, message, {"ok": True, "result": {"coalesced": True}})
+                continue
+
+            cache_key = (command, json.dumps(args, sort_keys=True)) if read_only else None
+            if cache_key in shared_results:
+                self._reply(sock, message, dict(shared_results[cache_key]))
+                continue
+
+            try:
+                reply = {"ok": True, "result": handler(args)}
+            except Exception as e:
+                logger.error("IPC command %s failed: %s", command, e, exc_info=True)
+                self.stats['errors'] += 1
+                reply = {"ok": False, "error": str(e)}
+            if cache_key is not None:
+                shared_results[cache_key] = reply
+            self._reply(sock, message, dict(reply))
+
+        logger.debug("Handled IPC batch of %d in %.1f ms", len(batch), (time.perf_counter() - started) * 1000)
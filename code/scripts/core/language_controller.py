@@ -1,10 +1,10 @@
-import json
-from utils.path_utils import BASE_DIR
+from utils.path_utils import BASE_DIR, CACHE_DIR
 from PySide6.QtCore import QObject
 from PySide6.QtCore import Signal,qIsNull
 import logging
 # import config
-from models.config import Config
+from models.config import get_config
+from core.translation_catalog import TranslationCatalog, CACHE_FILE_NAME
 from PySide6.QtWidgets import QMessageBox
 class LanguageController(QObject):
     # emit a signal when language is changed
@@ -15,43 +15,35 @@ class LanguageController(QObject):
         self.TRANSLATIONS_FILE = BASE_DIR / "translations" / "languages.json"
         if not self.TRANSLATIONS_FILE.exists():
             logging.warning("Translations file does not exist at initialization.")
-        self.config = Config()
+        self.config = get_config()
+        # Parsed once; every language switch after that is served from memory
+        self.catalog = TranslationCatalog(self.TRANSLATIONS_FILE, CACHE_DIR / CACHE_FILE_NAME)
 
     # check for translations file
     def check_translations_file(self) -> bool:
         """Check if translations file exists"""
         return self.TRANSLATIONS_FILE.exists()
 
+    def load_translations(self) -> TranslationCatalog:
+        """Load the catalog and the active language; safe to call from a startup worker"""
+        self.catalog.load()
+        self.catalog.get(self.get_current_language())
+        return self.catalog
 
     def get_available_languages(self):
         """Retrieve available languages from translations directory"""
-        translations_file = BASE_DIR / "translations" / "languages.json"
-        # check if translations file exists
-        if translations_file.exists():
-            with translations_file.open("r", encoding="utf-8") as f:
-                try:
-                    languages = json.load(f)
-                    return languages.keys().__iter__()
-                except json.JSONDecodeError:
-                    return {}
-        else:
-            print("Translations file not found.")
+        codes = self.catalog.codes()
+        if not codes:
             return {"en": "English"}
+        return iter(codes)
     
     # get a language by key
     def get_language_by_name(self, lang_code: str):
         """Get the display name of a language given its code"""
-        translations_file = BASE_DIR / "translations" / "languages.json"
-        if translations_file.exists():
-            with translations_file.open("r", encoding="utf-8") as f:
-                try:
-                    languages = json.load(f)
-                    return languages.get(lang_code, "en")
-                except json.JSONDecodeError:
-                    return "Unknown"
-        else:
-            print("Translations file not found.")
+        lang = self.catalog.get(lang_code) or self.catalog.get("en")
+        if lang is None:
             return "Unknown"
+        return lang
     
     def enumerate_languages(self,combo_box):
         """Enumerate available languages to the combo box"""
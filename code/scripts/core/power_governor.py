@@ -0,0 +1,391 @@
+import os
+import time
+import hashlib
+import logging
+import subprocess
+from pathlib import Path
+from threading import Thread, Event, Lock
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from utils.mpv_ipc import MpvIpcError, mpv_command
+from utils.path_utils import get_ffmpeg_path
+
+logger = logging.getLogger(__name__)
+
+SYSFS_POWER_SUPPLY = "/sys/class/power_supply"
+
+FULL = "full"
+REDUCED = "reduced"
+PAUSED = "paused"
+PROFILES = (FULL, REDUCED, PAUSED)
+
+
+def _read_sysfs(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="ascii", errors="replace").strip()
+    except OSError:
+        return None
+
+
+class SysfsPowerSupply:
+    """
+    AC/battery state from /sys/class/power_supply (Linux).
+
+    read() returns (on_battery, capacity percent or None). Device batteries
+    (mice, headsets: scope "Device") are ignored. Without a system battery,
+    e.g. on a desktop, the machine counts as on AC.
+    """
+
+    def __init__(self, root=SYSFS_POWER_SUPPLY):
+        self.root = Path(root)
+
+    def read(self) -> tuple:
+        try:
+            supplies = [entry for entry in self.root.iterdir() if entry.is_dir()]
+        except OSError:
+            return False, None
+
+        mains_online = False
+        discharging = False
+        capacities = []
+        for supply in supplies:
+            supply_type = _read_sysfs(supply / "type")
+            if supply_type in ("Mains", "USB", "UPS"):
+                mains_online = mains_online or _read_sysfs(supply / "online") == "1"
+            elif supply_type == "Battery" and _read_sysfs(supply / "scope") != "Device":
+                if _read_sysfs(supply / "present") == "0":
+                    continue
+                discharging = discharging or _read_sysfs(supply / "status") == "Discharging"
+                capacity = _read_sysfs(supply / "capacity")
+                if capacity and capacity.isdigit():
+                    capacities.append(int(capacity))
+
+        on_battery = discharging and not mains_online
+        return on_battery, (min(capacities) if capacities else None)
+
+
+class LoginctlSession:
+    """
+    Idle time and lock state of the login session, from systemd-logind.
+
+    read() returns (idle seconds, locked). Desktops report idleness through
+    logind's IdleHint and screen lockers set LockedHint. Without loginctl (or a
+    session) this reads as active and unlocked and stops asking.
+    """
+
+    def __init__(self, session_id: str = None, run: Callable = subprocess.run, clock: Callable = time.time):
+        self.session_id = session_id or os.environ.get("XDG_SESSION_ID") or "auto"
+        self.run = run
+        self.clock = clock
+        self._available = True
+
+    def read(self) -> tuple:
+        if not self._available:
+            return 0.0, False
+        try:
+            result = self.run(["loginctl", "show-session", self.session_id,
+                               "-p", "IdleHint", "-p", "IdleSinceHint", "-p", "LockedHint"],
+                              capture_output=True, text=True, timeout=2)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.info("loginctl unavailable, idle and lock state not tracked: %s", e)
+            self._available = False
+            return 0.0, False
+        if result.returncode != 0:
+            logger.info("loginctl has no session %s, idle and lock state not tracked: %s",
+                        self.session_id, result.stderr.strip())
+            self._available = False
+            return 0.0, False
+
+        values = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+        idle_seconds = 0.0
+        if values.get("IdleHint") == "yes":
+            since_us = values.get("IdleSinceHint", "0")
+            if since_us.isdigit() and int(since_us):
+                idle_seconds = max(0.0, self.clock() - int(since_us) / 1_000_000)
+        return idle_seconds, values.get("LockedHint") == "yes"
+
+
+class MpvPlayer:
+    """
+    Applies governor profiles to the mpv wallpaper over its IPC socket.
+
+    full plays normally; reduced presents at most reduced_fps frames at half
+    resolution (fewer frames scaled and rendered; decoding continues);
+    paused stops decoding altogether. apply_profile() returns False when mpv
+    cannot be reached. While keep_paused() is true (something else, e.g.
+    auto-pause, holds the player paused) profiles leave the pause alone.
+    """
+
+    def __init__(self, address: str = None, reduced_fps: int = 15, command: Callable = mpv_command,
+                 keep_paused: Callable[[], bool] = None):
+        self.address = address
+        self.command = command
+        self.keep_paused = keep_paused
+        self.profiles = {
+            FULL: (("vf", ""), ("pause", False)),
+            REDUCED: (("vf", f"lavfi=[fps={reduced_fps},scale=iw/2:-2]"), ("pause", False)),
+            PAUSED: (("pause", True),),
+        }
+
+    def apply_profile(self, profile: str) -> bool:
+        held = bool(self.keep_paused and self.keep_paused())
+        try:
+            for name, value in self.profiles[profile]:
+                if name == "pause" and not value and held:
+                    continue
+                self.command("set_property", name, value, address=self.address)
+        except MpvIpcError as e:
+            logger.debug("Could not apply %s profile: %s", profile, e)
+            return False
+        return True
+
+
+def extract_poster(video: str, directory: Path, ffmpeg: Path = None) -> Optional[str]:
+    """First frame of video as a JPEG in directory (cached by path and mtime); None without ffmpeg"""
+    ffmpeg = ffmpeg or get_ffmpeg_path()
+    if not ffmpeg:
+        return None
+    try:
+        stat = os.stat(video)
+    except OSError:
+        return None
+    key = hashlib.blake2b(f"{video}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"), digest_size=10).hexdigest()
+    poster = Path(directory) / f"poster_{key}.jpg"
+    if poster.exists():
+        return str(poster)
+    poster.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        subprocess.run([str(ffmpeg), "-hide_banner", "-nostdin", "-loglevel", "error", "-y", "-i", video,
+                        "-frames:v", "1", "-q:v", "3", str(poster)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30, check=True)
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning("Could not extract a poster frame from %s: %s", video, e)
+        return None
+    return str(poster) if poster.exists() else None
+
+
+class PowerGovernor(QObject):
+    """
+    Switches the video wallpaper between full, reduced and paused playback.
+
+    Every poll_interval seconds the worker reads the power supply and the
+    session (both injectable, see SysfsPowerSupply and LoginctlSession) and
+    picks a profile:
+
+      locked, idle >= idle_pause_seconds, or battery <= low_battery_percent -> paused
+      on battery, or idle >= idle_reduce_seconds                             -> reduced
+      otherwise                                                              -> full
+
+    Hysteresis: the low-battery state is left only at low_battery_percent +
+    battery_band, and a new profile has to be wanted for dwell_seconds before
+    it is applied, so a flapping charger or a short idle blip does not
+    restart filters. Locking pauses at once and unlocking restores at once.
+    set_cap() puts a floor under the profile (e.g. reduced while the player
+    is over its CPU budget, see ResourceMonitor); a new cap also acts at once.
+
+    The profile is pushed to the player (see MpvPlayer) while set_active()
+    says a video is playing. When the player cannot take it (no IPC, e.g.
+    the Windows player), fallback(True) is called on the worker to show a
+    poster still while paused and fallback(False) to bring the video back.
+    Time spent in each profile is logged on every change and kept in
+    time_in_state(). tick() runs one evaluation and can be driven directly
+    with a fake clock.
+    """
+
+    # (profile, reason)
+    state_changed = Signal(str, str)
+
+    def __init__(self, player, power=None, session=None, fallback: Callable[[bool], bool] = None,
+                 poll_interval: float = 5.0, dwell_seconds: float = 10.0,
+                 idle_reduce_seconds: float = 120.0, idle_pause_seconds: float = 600.0,
+                 low_battery_percent: int = 20, battery_band: int = 5,
+                 clock: Callable[[], float] = time.monotonic, parent=None):
+        super().__init__(parent)
+        self.player = player
+        self.power = power or SysfsPowerSupply()
+        self.session = session or LoginctlSession()
+        self.fallback = fallback
+        self.poll_interval = poll_interval
+        self.dwell_seconds = dwell_seconds
+        self.idle_reduce_seconds = idle_reduce_seconds
+        self.idle_pause_seconds = idle_pause_seconds
+        self.low_battery_percent = low_battery_percent
+        self.battery_band = battery_band
+        self.clock = clock
+
+        self.profile = FULL
+        self.reason = "start"
+        self._entered_at = clock()
+        self._totals = {profile: 0.0 for profile in PROFILES}
+        self._candidate = None
+        self._candidate_since = 0.0
+        self._low_battery = False
+        self._locked = False
+        self._cap = FULL
+        self._cap_reason = ""
+        self._cap_changed = False
+
+        self._active = False
+        self._applied = None
+        self._failures = 0
+        self._fallback_engaged = False
+
+        self._lock = Lock()
+        self._wake_event = Event()
+        self._stop_event = Event()
+        self.thread = None
+
+    # ---------------------------------------------------------
+    #  Public API
+    # ---------------------------------------------------------
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = Thread(target=self._governor_loop, name="PowerGovernor", daemon=True)
+        self.thread.start()
+        logger.info("Power governor started")
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5)
+        logger.info("Power governor stopped; time per profile: %s", self._format_totals())
+
+    def set_active(self, active: bool):
+        """A video wallpaper started (True) or was replaced by a still (False)"""
+        with self._lock:
+            self._active = active
+            # A new player starts at full speed and knows nothing of the profile
+            self._applied = FULL if active else None
+            self._failures = 0
+            self._fallback_engaged = False
+        self._wake_event.set()
+
+    def set_cap(self, profile: str, reason: str = ""):
+        """Never play better than profile (FULL lifts the cap); applied on the next tick"""
+        with self._lock:
+            if profile == self._cap:
+                return
+            self._cap = profile
+            self._cap_reason = reason
+            self._cap_changed = True
+        logger.info("Power profile capped at %s%s", profile, f" ({reason})" if reason else "")
+        self._wake_event.set()
+
+    def time_in_state(self) -> dict:
+        """Seconds spent in each profile so far, including the current one"""
+        with self._lock:
+            totals = dict(self._totals)
+            totals[self.profile] += self.clock() - self._entered_at
+        return {profile: round(seconds, 1) for profile, seconds in totals.items()}
+
+    def tick(self, now: float = None) -> str:
+        """Read the inputs once, apply any due transition and sync the player; returns the profile"""
+        now = self.clock() if now is None else now
+        on_battery, capacity = self.power.read()
+        idle_seconds, locked = self.session.read()
+        desired, reason = self._desired(on_battery, capacity, idle_seconds, locked)
+        with self._lock:
+            cap, cap_reason, cap_changed = self._cap, self._cap_reason, self._cap_changed
+            self._cap_changed = False
+        if PROFILES.index(cap) > PROFILES.index(desired):
+            desired, reason = cap, cap_reason or f"capped at {cap}"
+
+        # Lock, unlock and cap changes act at once; everything else has to settle first
+        lock_changed = locked != self._locked
+        self._locked = locked
+        if desired == self.profile:
+            self._candidate = None
+        elif lock_changed or cap_changed:
+            self._transition(desired, reason, now)
+        elif desired != self._candidate:
+            self._candidate = desired
+            self._candidate_since = now
+        elif now - self._candidate_since >= self.dwell_seconds:
+            self._transition(desired, reason, now)
+
+        self._sync_player()
+        return self.profile
+
+    # ---------------------------------------------------------
+    #  Internals
+    # ---------------------------------------------------------
+    def _desired(self, on_battery: bool, capacity: Optional[int], idle_seconds: float, locked: bool) -> tuple:
+        if on_battery and capacity is not None:
+            # Enter at low_battery_percent, leave only above the band
+            threshold = self.low_battery_percent + (self.battery_band if self._low_battery else 0)
+            self._low_battery = capacity <= threshold
+        else:
+            self._low_battery = False
+
+        if locked:
+            return PAUSED, "session locked"
+        if idle_seconds >= self.idle_pause_seconds:
+            return PAUSED, f"idle {idle_seconds:.0f} s"
+        if self._low_battery:
+            return PAUSED, f"battery {capacity}%"
+        if on_battery:
+            return REDUCED, "on battery" if capacity is None else f"on battery ({capacity}%)"
+        if idle_seconds >= self.idle_reduce_seconds:
+            return REDUCED, f"idle {idle_seconds:.0f} s"
+        return FULL, "on AC, active"
+
+    def _transition(self, profile: str, reason: str, now: float):
+        with self._lock:
+            spent = now - self._entered_at
+            self._totals[self.profile] += spent
+            previous = self.profile
+            self.profile = profile
+            self.reason = reason
+            self._entered_at = now
+            self._candidate = None
+        logger.info("Power profile %s -> %s (%s) after %.1f s; totals: %s",
+                    previous, profile, reason, spent, self._format_totals())
+        self.state_changed.emit(profile, reason)
+
+    def _sync_player(self):
+        with self._lock:
+            if not self._active or self._applied == self.profile:
+                return
+            profile = self.profile
+        if self.player.apply_profile(profile):
+            with self._lock:
+                self._applied = profile
+                self._failures = 0
+            return
+
+        # mpv may still be starting; only give up on IPC after two polls
+        with self._lock:
+            self._failures += 1
+            if self._failures < 2:
+                return
+            self._applied = profile
+            engaged = self._fallback_engaged
+        if not self.fallback:
+            logger.info("Video wallpaper player does not accept power profiles")
+            return
+        if profile == PAUSED and not engaged:
+            engaged = bool(self.fallback(True))
+        elif profile != PAUSED and engaged:
+            self.fallback(False)
+            engaged = False
+        with self._lock:
+            self._fallback_engaged = engaged
+
+    def _format_totals(self) -> str:
+        return ", ".join(f"{profile} {seconds:.0f} s" for profile, seconds in self.time_in_state().items())
+
+    def _governor_loop(self):
+        logger.debug("Power governor loop started")
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error("Power governor tick failed: %s", e, exc_info=True)
+            self._wake_event.wait(self.poll_interval)
+            self._wake_event.clear()
+        logger.debug("Power governor loop finished")
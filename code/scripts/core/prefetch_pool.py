@@ -0,0 +1,261 @@
+import os
+import time
+import logging
+from pathlib import Path
+from stat import S_ISREG
+from urllib.parse import urlparse
+from threading import Thread, Event, Lock
+from typing import Optional, Callable
+
+from PySide6.QtCore import QObject, Signal
+
+from utils.path_utils import PREFETCH_DIR
+from utils.file_utils import get_staging_path
+from utils.system_utils import fetch_shuffled_wallpaper
+
+
+class PrefetchPool(QObject):
+    """
+    Keeps a few online shuffle wallpapers downloaded ahead of time so a shuffle
+    click can be applied instantly instead of waiting on the API and a download.
+
+    Entries are plain files under PREFETCH_DIR/<kind>_<width>x<height>/, so the
+    pool survives restarts and a different screen size simply gets its own
+    directory. A single background worker tops every kind up to `target_per_kind`
+    while staying inside `disk_budget_bytes`.
+    """
+
+    entry_ready = Signal(str)  # kind
+
+    KINDS = ("static", "animated")
+
+    def __init__(self, width: int, height: int, language_getter: Callable[[], str] = None,
+                 target_per_kind: int = 3, disk_budget_bytes: int = 512 * 1024 * 1024,
+                 max_age_seconds: int = 3 * 24 * 60 * 60,
+                 fetch_url: Callable = fetch_shuffled_wallpaper, post_process: Callable[[Path], object] = None,
+                 parent=None):
+        super().__init__(parent)
+        logging.debug(f"Initializing PrefetchPool for {width}x{height}")
+        self.width = width
+        self.height = height
+        self.language_getter = language_getter or (lambda: "pl")
+        self.target_per_kind = target_per_kind
+        self.disk_budget_bytes = disk_budget_bytes
+        self.max_age_seconds = max_age_seconds
+        self.fetch_url = fetch_url
+        # Called with each finished download (still named .part) on the worker
+        self.post_process = post_process
+
+        self._lock = Lock()
+        self._refill_event = Event()
+        self._stop_event = Event()
+        self._paused = False
+        self.thread = None
+
+    # ---------------------------------------------------------
+    #  Public API
+    # ---------------------------------------------------------
+    def start(self):
+        """Start the background refill worker"""
+        if self.thread and self.thread.is_alive():
+            return
+        self._evict_stale()
+        self._stop_event.clear()
+        self.thread = Thread(target=self._worker_loop, name="PrefetchPool", daemon=True)
+        self.thread.start()
+        self.request_refill()
+        logging.info(f"Prefetch pool started: {self.target_per_kind} per kind, budget {self.disk_budget_bytes // (1024 * 1024)} MB")
+
+    def stop(self):
+        """Stop the refill worker"""
+        self._stop_event.set()
+        self._refill_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5)
+        logging.info("Prefetch pool stopped")
+
+    def set_paused(self, paused: bool):
+        """Pause or resume background fetching (e.g. while offline)"""
+        if self._paused != paused:
+            self._paused = paused
+            logging.info(f"Prefetch pool {'paused' if paused else 'resumed'}")
+            if not paused:
+                self.request_refill()
+
+    def request_refill(self):
+        """Wake the worker to top up every kind"""
+        self._refill_event.set()
+
+    def available(self, kind: str) -> int:
+        """Number of ready entries for a kind"""
+        return len(self._entries(kind))
+
+    def take(self, kind: str) -> Optional[Path]:
+        """
+        Remove one ready wallpaper from the pool and hand it over as a staged file.
+
+        The file is renamed into the staging directory so the caller can commit it
+        into the collection exactly like a finished download. Triggers a refill.
+
+        Returns:
+            Path: staged file, or None if nothing is ready
+        """
+        with self._lock:
+            entries = self._entries(kind)
+            if not entries:
+                logging.debug(f"Prefetch pool empty for {kind}")
+                self.request_refill()
+                return None
+
+            entry = entries[0]
+            staged = get_staging_path(entry.name)
+            try:
+                os.replace(entry, staged)
+            except OSError as e:
+                logging.error(f"Could not take prefetched wallpaper {entry}: {e}")
+                return None
+
+        logging.info(f"Took prefetched {kind} wallpaper: {staged.name} ({len(entries) - 1} left)")
+        self.request_refill()
+        return staged
+
+    # ---------------------------------------------------------
+    #  Storage
+    # ---------------------------------------------------------
+    def _kind_dir(self, kind: str) -> Path:
+        return PREFETCH_DIR / f"{kind}_{self.width}x{self.height}"
+
+    def _entries(self, kind: str) -> list:
+        """Ready entries for a kind, oldest first"""
+        entries = []
+        try:
+            for f in self._kind_dir(kind).iterdir():
+                if f.name.endswith(".part"):
+                    continue
+                # take() and the eviction may delete files while we look
+                try:
+                    stat = f.stat()
+                except OSError:
+                    continue
+                if S_ISREG(stat.st_mode):
+                    entries.append((stat.st_mtime, f))
+        except OSError:
+            return []
+        return [f for _, f in sorted(entries, key=lambda entry: entry[0])]
+
+    def _disk_usage(self) -> int:
+        total = 0
+        try:
+            for f in PREFETCH_DIR.rglob("*"):
+                try:
+                    stat = f.stat()
+                except OSError:
+                    continue
+                if S_ISREG(stat.st_mode):
+                    total += stat.st_size
+        except OSError:
+            pass
+        return total
+
+    def _evict_stale(self):
+        """Drop expired entries, leftover partial files and other screen sizes"""
+        if not PREFETCH_DIR.exists():
+            return
+        current_dirs = {self._kind_dir(kind) for kind in self.KINDS}
+        now = time.time()
+        evicted = 0
+        # take() renames entries out under the same lock
+        with self._lock:
+            for folder in PREFETCH_DIR.iterdir():
+                if not folder.is_dir():
+                    continue
+                for f in folder.iterdir():
+                    try:
+                        if (folder not in current_dirs or f.name.endswith(".part")
+                                or now - f.stat().st_mtime > self.max_age_seconds):
+                            f.unlink()
+                            evicted += 1
+                    except OSError as e:
+                        logging.warning(f"Could not evict prefetched file {f}: {e}")
+                if folder not in current_dirs:
+                    try:
+                        folder.rmdir()
+                    except OSError:
+                        pass
+        if evicted:
+            logging.info(f"Evicted {evicted} stale prefetched wallpapers")
+
+    # ---------------------------------------------------------
+    #  Worker
+    # ---------------------------------------------------------
+    def _worker_loop(self):
+        logging.debug("Prefetch worker started")
+        while not self._stop_event.is_set():
+            self._refill_event.wait()
+            self._refill_event.clear()
+            if self._stop_event.is_set():
+                break
+            if self._paused:
+                continue
+            self._refill()
+        logging.debug("Prefetch worker finished")
+
+    def _refill(self):
+        """Top every kind up to target_per_kind while staying inside the disk budget"""
+        self._evict_stale()
+        for kind in self.KINDS:
+            while (not self._stop_event.is_set() and not self._paused
+                   and self.available(kind) < self.target_per_kind):
+                if self._disk_usage() >= self.disk_budget_bytes:
+                    logging.info("Prefetch disk budget reached, not fetching more")
+                    return
+                if not self._fetch_one(kind):
+                    break
+
+    def _fetch_one(self, kind: str) -> bool:
+        """Fetch a single wallpaper into the pool. Returns False on failure."""
+        is_animated = kind == "animated"
+        try:
+            url = self.fetch_url(self.width, self.height, is_animated, self.language_getter())
+        except Exception as e:
+            logging.warning(f"Prefetch shuffle request failed: {e}")
+            return False
+        if not url:
+            logging.debug(f"Prefetch got no {kind} URL")
+            return False
+
+        folder = self._kind_dir(kind)
+        folder.mkdir(parents=True, exist_ok=True)
+        filename = os.path.basename(urlparse(url).path) or f"{kind}_{int(time.time())}"
+        target = folder / filename
+        part = target.with_name(target.name + ".part")
+
+        try:
+            import requests
+            with requests.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                with open(part, "wb") as fh:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        if self._stop_event.is_set():
+                            raise InterruptedError("Prefetch pool stopping")
+                        if chunk:
+                            fh.write(chunk)
+            if part.stat().st_size == 0:
+                raise IOError("Empty download")
+            if self.post_process:
+                try:
+                    self.post_process(part)
+                except Exception as e:
+                    logging.warning(f"Prefetch post-processing failed for {target.name}: {e}")
+            os.replace(part, target)
+        except Exception as e:
+            logging.warning(f"Prefetch download failed for {url}: {e}")
+            try:
+                part.unlink()
+            except OSError:
+                pass
+            return False
+
+        logging.info(f"Prefetched {kind} wallpaper: {target.name}")
+        self.entry_ready.emit(kind)
+        return True
@@ -0,0 +1,319 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import subprocess
+from fractions import Fraction
+from pathlib import Path
+from threading import Thread, Condition
+from typing import Optional
+
+from utils.path_utils import PROXIES_DIR, get_ffmpeg_path, get_ffprobe_path
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.avi', '.mov')
+QUEUE_FILE_NAME = "queue.json"
+
+# Windows process priority flags
+BELOW_NORMAL_PRIORITY_CLASS = 0x00004000
+CREATE_NO_WINDOW = 0x08000000
+
+# libx264 / libvpx-vp9 settings that decode cheaply and loop without a visible seam
+CODECS = {
+    "h264": {
+        "extension": ".mp4",
+        "format": "mp4",
+        "args": ["-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-profile:v", "high",
+                 "-pix_fmt", "yuv420p", "-movflags", "+faststart"],
+    },
+    "vp9": {
+        "extension": ".webm",
+        "format": "webm",
+        "args": ["-c:v", "libvpx-vp9", "-b:v", "0", "-crf", "34", "-deadline", "good", "-cpu-used", "4",
+                 "-row-mt", "1", "-pix_fmt", "yuv420p"],
+    },
+}
+
+
+def _low_priority_posix():
+    """preexec_fn for ffmpeg: lowest CPU priority"""
+    try:
+        os.nice(19)
+    except OSError:
+        pass
+
+
+def low_priority_options() -> dict:
+    """subprocess keyword arguments for a background ffmpeg/ffprobe run"""
+    if sys.platform.startswith("win"):
+        return {"creationflags": BELOW_NORMAL_PRIORITY_CLASS | CREATE_NO_WINDOW}
+    return {"preexec_fn": _low_priority_posix}
+
+
+def idle_io_prefix() -> list:
+    """Command prefix for idle I/O priority (Linux ionice), or []"""
+    if sys.platform.startswith("linux"):
+        ionice = shutil.which("ionice")
+        if ionice:
+            return [ionice, "-c3"]
+    return []
+
+
+class ProxyTranscoder:
+    """
+    Transcodes video wallpapers into screen-resolution proxies in the background.
+
+    A 4K/60 AV1 file costs mpv far more CPU to decode than the desktop can show,
+    so each video gets an H.264 (or VP9) copy scaled to cover the screen, capped
+    at max_fps, with regular keyframes so looping stays smooth. ffmpeg runs at
+    the lowest CPU (nice 19) and idle I/O (ionice -c3) priority, at most
+    max_jobs at a time.
+
+    The queue is persisted in the proxies folder, so work left when the app
+    closes resumes on the next start. Output is written to a .part file and
+    renamed when ffmpeg succeeds; an interrupted job simply starts over.
+    Videos that are already within the target size, frame rate and codec are
+    marked as not needing a proxy.
+    """
+
+    def __init__(self, width: int, height: int, max_fps: int = 30, codec: str = "h264", max_jobs: int = 1,
+                 directory: Path = None, ffmpeg: Path = None, ffprobe: Path = None):
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported proxy codec: {codec}")
+        # Even dimensions, as yuv420p requires
+        self.width = width - width % 2
+        self.height = height - height % 2
+        self.max_fps = max_fps
+        self.codec = codec
+        self.max_jobs = max(1, max_jobs)
+        self.directory = Path(directory or PROXIES_DIR)
+        self.ffmpeg = ffmpeg or get_ffmpeg_path()
+        self.ffprobe = ffprobe or get_ffprobe_path()
+        self.io_prefix = idle_io_prefix()
+
+        self._pending = []
+        self._active = {}
+        self._condition = Condition()
+        self._stopping = False
+        self._threads = []
+
+    def is_available(self) -> bool:
+        return self.ffmpeg is not None
+
+    # ---------------------------------------------------------
+    #  Public API
+    # ---------------------------------------------------------
+    def start(self):
+        """Start the workers and pick up work left from the previous run"""
+        if not self.is_available():
+            logger.info("ffmpeg not found, video proxies disabled")
+            return
+        if self._threads:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stopping = False
+        with self._condition:
+            for source in self._load_queue():
+                if source not in self._pending and os.path.exists(source):
+                    self._pending.append(source)
+            self._condition.notify_all()
+        for i in range(self.max_jobs):
+            thread = Thread(target=self._worker_loop, name=f"ProxyTranscoder-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Proxy transcoder started (%dx%d@%d %s, %d pending)",
+                    self.width, self.height, self.max_fps, self.codec, len(self._pending))
+
+    def stop(self):
+        """Stop ffmpeg; unfinished jobs stay queued for the next start"""
+        if not self._threads:
+            # Never started: leave the saved queue alone
+            return
+        with self._condition:
+            self._stopping = True
+            # None: still probing, ffmpeg not started (and it will not be now)
+            processes = [process for process in self._active.values() if process is not None]
+            self._condition.notify_all()
+        for process in processes:
+            process.terminate()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        self._save_queue()
+
+    def enqueue(self, source) -> bool:
+        """Queue a video unless its proxy (or a no-proxy marker) already exists"""
+        source = str(Path(source).resolve())
+        if not source.lower().endswith(VIDEO_EXTENSIONS) or self._is_done(source):
+            return False
+        with self._condition:
+            if source in self._pending or source in self._active:
+                return False
+            self._pending.append(source)
+            self._condition.notify()
+        self._save_queue()
+        return True
+
+    def enqueue_folder(self, folder: Path) -> int:
+        """Queue every video in a folder; returns how many were added"""
+        if not folder.exists():
+            return 0
+        return sum(1 for entry in sorted(folder.iterdir()) if entry.is_file() and self.enqueue(entry))
+
+    def proxy_for(self, source) -> Optional[str]:
+        """Path of the finished proxy for source, or None"""
+        proxy = self._proxy_path(str(Path(source).resolve()))
+        return str(proxy) if proxy and proxy.exists() else None
+
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._pending) + len(self._active)
+
+    # ---------------------------------------------------------
+    #  Paths and queue persistence
+    # ---------------------------------------------------------
+    def _key(self, source: str) -> Optional[str]:
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        identity = f"{source}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8")
+        return hashlib.blake2b(identity, digest_size=10).hexdigest()
+
+    def _proxy_path(self, source: str) -> Optional[Path]:
+        key = self._key(source)
+        if key is None:
+            return None
+        suffix = CODECS[self.codec]["extension"]
+        return self.directory / f"{key}_{self.width}x{self.height}_{self.max_fps}{suffix}"
+
+    def _is_done(self, source: str) -> bool:
+        proxy = self._proxy_path(source)
+        return proxy is None or proxy.exists() or proxy.with_suffix(".skip").exists()
+
+    def _load_queue(self) -> list:
+        try:
+            with open(self.directory / QUEUE_FILE_NAME, "r", encoding="utf-8") as f:
+                return [str(source) for source in json.load(f).get("pending", [])]
+        except (OSError, ValueError, AttributeError):
+            return []
+
+    def _save_queue(self):
+        with self._condition:
+            pending = list(self._active) + [s for s in self._pending if s not in self._active]
+        queue_path = self.directory / QUEUE_FILE_NAME
+        tmp_path = queue_path.with_suffix(".tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"pending": pending}, f, indent=2)
+            os.replace(tmp_path, queue_path)
+        except OSError as e:
+            logger.debug("Could not save proxy queue: %s", e)
+
+    # ---------------------------------------------------------
+    #  Worker
+    # ---------------------------------------------------------
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                source = self._pending.pop(0)
+                self._active[source] = None
+            try:
+                self._transcode(source)
+            except Exception as e:
+                logger.error("Proxy transcode of %s failed: %s", source, e, exc_info=True)
+            finally:
+                with self._condition:
+                    self._active.pop(source, None)
+                    stopping = self._stopping
+                    if stopping:
+                        # Interrupted, not failed: do it again next time
+                        self._pending.insert(0, source)
+                if not stopping:
+                    self._save_queue()
+
+    def _probe(self, source: str) -> dict:
+        """codec, width, height and fps of the first video stream ({} without ffprobe)"""
+        if not self.ffprobe:
+            return {}
+        result = subprocess.run(
+            [str(self.ffprobe), "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=codec_name,width,height,avg_frame_rate", "-of", "json", source],
+            capture_output=True, text=True, timeout=30, **low_priority_options())
+        streams = json.loads(result.stdout or "{}").get("streams") or [{}]
+        stream = streams[0]
+        try:
+            fps = float(Fraction(stream.get("avg_frame_rate", "0/1")))
+        except (ValueError, ZeroDivisionError):
+            fps = 0.0
+        return {"codec": stream.get("codec_name"), "width": stream.get("width") or 0,
+                "height": stream.get("height") or 0, "fps": fps}
+
+    def _needs_proxy(self, info: dict) -> bool:
+        if not info:
+            return True
+        too_big = info["width"] > self.width * 1.1 or info["height"] > self.height * 1.1
+        too_fast = info["fps"] > self.max_fps + 1
+        heavy_codec = info["codec"] not in ("h264", "vp8")
+        return too_big or too_fast or heavy_codec
+
+    def _build_command(self, source: str, output: Path, info: dict) -> list:
+        # Cover the screen like mpv's panscan does, but never upscale
+        filters = [f"scale=w='min(iw,{self.width})':h='min(ih,{self.height})'"
+                   f":force_original_aspect_ratio=increase:force_divisible_by=2"]
+        fps = info.get("fps") or self.max_fps
+        if fps > self.max_fps:
+            filters.append(f"fps={self.max_fps}")
+            fps = self.max_fps
+        keyframe_interval = max(1, round(fps * 2))
+        return [str(self.ffmpeg), "-hide_banner", "-nostdin", "-loglevel", "error", "-y", "-i", source,
+                "-map", "0:v:0", "-an", "-sn", "-vf", ",".join(filters),
+                "-g", str(keyframe_interval), *CODECS[self.codec]["args"],
+                # The .part name hides the container from ffmpeg
+                "-f", CODECS[self.codec]["format"], str(output)]
+
+    def _transcode(self, source: str):
+        proxy = self._proxy_path(source)
+        if proxy is None:
+            logger.info("Proxy source disappeared: %s", source)
+            return
+        if proxy.exists():
+            return
+
+        info = self._probe(source)
+        if not self._needs_proxy(info):
+            logger.info("No proxy needed for %s (%s %dx%d@%.0f)", Path(source).name,
+                        info["codec"], info["width"], info["height"], info["fps"])
+            proxy.with_suffix(".skip").touch()
+            return
+
+        part = proxy.with_suffix(".part")
+        command = self.io_prefix + self._build_command(source, part, info)
+        # Started under the lock: stop() either sees the process or ffmpeg never starts
+        with self._condition:
+            if self._stopping:
+                return
+            logger.info("Transcoding proxy for %s", Path(source).name)
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                       **low_priority_options())
+            self._active[source] = process
+        _, stderr = process.communicate()
+
+        if process.returncode == 0 and part.exists():
+            os.replace(part, proxy)
+            logger.info("Proxy ready: %s -> %s", Path(source).name, proxy.name)
+            return
+        part.unlink(missing_ok=True)
+        if not self._stopping:
+            logger.warning("ffmpeg failed for %s (exit %s): %s", Path(source).name, process.returncode,
+                           stderr.decode("utf-8", "replace").strip()[-500:])
+            # Do not retry a file ffmpeg cannot handle on every start
+            proxy.with_suffix(".skip").touch()
@@ -0,0 +1,203 @@
+import os
+import hashlib
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from threading import Lock
+
+from utils.path_utils import RENDITIONS_DIR
+
+# No Qt in this module: it is imported again by every worker process.
+
+logger = logging.getLogger(__name__)
+
+RENDITION_FORMATS = {"JPEG": ".jpg", "WEBP": ".webp"}
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# An image at most this much bigger than the screen is handed over as it is
+PASSTHROUGH_SCALE = 0.8
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+_EXIF_ORIENTATION = 0x0112
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _lower_priority():
+    """Worker initializer: renditions must not compete with the UI or the video wallpaper"""
+    if hasattr(os, "nice"):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+
+def render_rendition(source: str, directory: str, width: int, height: int,
+                     image_format: str = "JPEG", quality: int = 88) -> str:
+    """
+    Return the path the desktop should be given for source: a copy scaled to
+    cover width x height (aspect kept, never upscaled), EXIF orientation
+    applied, stored as <blake2b of the file>_<w>x<h>.<ext> in directory.
+    Images that are already about screen-sized are returned unchanged.
+    Runs in a worker process.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        orientation = image.getexif().get(_EXIF_ORIENTATION, 1)
+        src_width, src_height = image.size
+        if orientation in _TRANSPOSED_ORIENTATIONS:
+            src_width, src_height = src_height, src_width
+        scale = max(width / src_width, height / src_height)
+        if scale >= PASSTHROUGH_SCALE and orientation == 1:
+            return source
+
+        destination = Path(directory) / f"{_file_digest(source)}_{width}x{height}{RENDITION_FORMATS[image_format]}"
+        if destination.exists():
+            os.utime(destination)  # most recently used, for prune()
+            return str(destination)
+
+        target = (max(1, round(src_width * min(scale, 1.0))), max(1, round(src_height * min(scale, 1.0))))
+        # JPEG: let libjpeg decode at 1/2, 1/4 or 1/8 size when that still covers the target
+        draft_size = (target[1], target[0]) if orientation in _TRANSPOSED_ORIENTATIONS else target
+        image.draft("RGB", draft_size)
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (0, 0, 0))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        if image.size != target:
+            image = image.resize(target, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = destination.with_name(destination.name + f".{os.getpid()}.tmp")
+        image.save(tmp_path, format=image_format, quality=quality)
+        os.replace(tmp_path, destination)
+        return str(destination)
+
+
+class RenditionCache:
+    """
+    Screen-sized variants of wallpaper images, made in a process pool.
+
+    submit(path) returns a Future with the path to hand to the desktop (the
+    rendition, or the original when no rendition is needed or rendering
+    failed). Finished results are remembered per (path, size, mtime) for the
+    rest of the session; on disk, renditions are keyed by the file's hash and
+    the screen size, so they survive restarts and renames.
+    """
+
+    def __init__(self, width: int, height: int, directory: Path = None, image_format: str = "JPEG",
+                 quality: int = 88, max_workers: int = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        if image_format not in RENDITION_FORMATS:
+            raise ValueError(f"Unsupported rendition format: {image_format}")
+        self.width = width
+        self.height = height
+        self.directory = Path(directory or RENDITIONS_DIR)
+        self.image_format = image_format
+        self.quality = quality
+        self.max_workers = max_workers or max(1, min(2, (os.cpu_count() or 2) // 2))
+        self.max_bytes = max_bytes
+        self._executor = None
+        self._done = {}
+        self._lock = Lock()
+
+    def submit(self, source: str) -> Future:
+        key = self._source_key(source)
+        with self._lock:
+            cached = self._done.get(key) if key else None
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+
+        result = Future()
+        try:
+            work = self._get_executor().submit(render_rendition, source, str(self.directory), self.width,
+                                               self.height, self.image_format, self.quality)
+        except RuntimeError as e:
+            # Pool already shut down (app exiting)
+            logger.debug("Rendition pool unavailable: %s", e)
+            result.set_result(source)
+            return result
+        work.add_done_callback(lambda done: self._finish(source, key, done, result))
+        return result
+
+    def get(self, source: str, timeout: float = None) -> str:
+        """Blocking variant of submit()"""
+        return self.submit(source).result(timeout)
+
+    def prune(self) -> int:
+        """Delete least recently used renditions beyond max_bytes; returns the number removed"""
+        try:
+            entries = [(entry.stat().st_mtime, entry.stat().st_size, entry)
+                       for entry in self.directory.iterdir() if entry.is_file()]
+        except OSError:
+            return 0
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            logger.info("Pruned %d old wallpaper renditions", removed)
+        return removed
+
+    def shutdown(self, wait: bool = False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    # ---------------------------------------------------------
+    #  Internals
+    # ---------------------------------------------------------
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs Qt and worker threads is unsafe
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_lower_priority)
+        return self._executor
+
+    @staticmethod
+    def _source_key(source: str):
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        return (os.path.abspath(source), stat.st_size, stat.st_mtime_ns)
+
+    def _finish(self, source: str, key, done: Future, result: Future):
+        if done.cancelled():
+            result.set_result(source)
+            return
+        try:
+            path = done.result()
+        except Exception as e:
+            logger.warning("Could not make a rendition of %s, using the original: %s", source, e)
+            result.set_result(source)
+            return
+        if key:
+            with self._lock:
+                self._done[key] = path
+        if path != source:
+            logger.info("Using rendition %s for %s", Path(path).name, source)
+        result.set_result(path)
+
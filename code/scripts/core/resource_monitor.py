@@ -0,0 +1,336 @@
+import os
+import time
+import logging
+from pathlib import Path
+from threading import Thread, Event, Lock
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from core.power_governor import FULL, PROFILES, REDUCED
+
+logger = logging.getLogger(__name__)
+
+PROC_ROOT = "/proc"
+
+# Process groups, by /proc/<pid>/comm
+PLAYER_NAMES = ("mpv", "xwinwrap")
+HELPER_NAMES = ("ffmpeg", "ffprobe")
+
+try:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    CLOCK_TICKS = 100
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="ascii", errors="replace")
+    except OSError:
+        return None
+
+
+def read_process(pid: int, proc_root: str = PROC_ROOT) -> Optional[dict]:
+    """
+    One reading of /proc/<pid>/stat, status and io: name, parent, CPU ticks
+    used so far, resident memory and bytes read/written (None when io is not
+    readable). None when the process is gone.
+    """
+    folder = Path(proc_root) / str(pid)
+    stat = _read_text(folder / "stat")
+    if not stat or ")" not in stat:
+        return None
+    # The name is in parentheses and may itself contain spaces and ")"
+    name = stat[stat.find("(") + 1:stat.rfind(")")]
+    fields = stat[stat.rfind(")") + 2:].split()
+    if len(fields) < 13:
+        return None
+
+    rss_kb = 0
+    for line in (_read_text(folder / "status") or "").splitlines():
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+            break
+
+    read_bytes = write_bytes = None
+    io = _read_text(folder / "io")
+    if io:
+        values = dict(line.split(":", 1) for line in io.splitlines() if ":" in line)
+        read_bytes = int(values.get("read_bytes", 0))
+        write_bytes = int(values.get("write_bytes", 0))
+
+    return {
+        "pid": pid,
+        "name": name,
+        "ppid": int(fields[1]),
+        "cpu_ticks": int(fields[11]) + int(fields[12]),
+        "rss_kb": rss_kb,
+        "read_bytes": read_bytes,
+        "write_bytes": write_bytes,
+    }
+
+
+def _group_of(name: str, pid: int, root_pid: int) -> str:
+    if pid == root_pid:
+        return "app"
+    if name in PLAYER_NAMES:
+        return "player"
+    if name in HELPER_NAMES:
+        return "helper"
+    return "worker"
+
+
+class ResourceMonitor(QObject):
+    """
+    Samples what the app and every process it started cost (Linux /proc).
+
+    Every interval seconds the worker walks the process tree below root_pid
+    (the video players, ffmpeg helpers and worker processes) and reads
+    /proc/<pid>/stat, status and io for each: CPU percent of one core, RSS
+    and disk read/write rates, per process and summed per group (app,
+    player, helper, worker). The summary goes to sampled, snapshot() and,
+    every log_every samples, the log. The monitor's own CPU time is measured
+    too and reported as overhead_percent.
+
+    With budget_percent set, player CPU above the budget for over_samples
+    samples in a row steps the playback profile down one level (full ->
+    reduced, down to floor_profile) through throttle(profile, reason), e.g.
+    PowerGovernor.set_cap. A level is given back after relax_seconds below
+    half the budget; a step back up that has to be undone again doubles
+    that wait, so a player hovering around the budget does not flap.
+    tick() takes one sample and can be driven with a fake /proc and clock.
+    """
+
+    # Summary dict, see tick()
+    sampled = Signal(dict)
+
+    def __init__(self, root_pid: int = None, interval: float = 5.0, budget_percent: float = 0.0,
+                 throttle: Callable[[str, str], None] = None, floor_profile: str = REDUCED,
+                 over_samples: int = 3, relax_seconds: float = 60.0, log_every: int = 12,
+                 proc_root: str = PROC_ROOT, clock: Callable[[], float] = time.monotonic, parent=None):
+        super().__init__(parent)
+        self.root_pid = root_pid or os.getpid()
+        self.interval = interval
+        self.budget_percent = budget_percent
+        self.throttle = throttle
+        self.floor_profile = floor_profile
+        self.over_samples = over_samples
+        self.base_relax_seconds = relax_seconds
+        self.relax_seconds = relax_seconds
+        self.log_every = log_every
+        self.proc_root = proc_root
+        self.clock = clock
+
+        self.cap = FULL
+        self._previous = {}
+        self._previous_at = None
+        self._over_count = 0
+        self._under_since = None
+        self._stepped_up_at = None
+        self._samples = 0
+        self._overhead_seconds = 0.0
+        self._started_at = None
+        self._children_files = True
+        self._summary = {}
+
+        self._lock = Lock()
+        self._stop_event = Event()
+        self.thread = None
+
+    # ---------------------------------------------------------
+    #  Public API
+    # ---------------------------------------------------------
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = Thread(target=self._monitor_loop, name="ResourceMonitor", daemon=True)
+        self.thread.start()
+        logger.info("Resource monitor started (every %.0f s, CPU budget %s)", self.interval,
+                    f"{self.budget_percent:.0f}%" if self.budget_percent else "off")
+
+    def stop(self):
+        self._stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5)
+        logger.info("Resource monitor stopped; %s", self._format_summary(self.snapshot()))
+
+    def set_budget(self, percent: float):
+        """Player CPU budget in percent of one core; 0 turns throttling off and lifts any cap"""
+        with self._lock:
+            self.budget_percent = max(0.0, float(percent))
+            self._over_count = 0
+        if not self.budget_percent and self.cap != FULL:
+            self._set_cap(FULL, "CPU budget off")
+
+    def snapshot(self) -> dict:
+        """Latest summary (empty before the second sample)"""
+        with self._lock:
+            return dict(self._summary)
+
+    def tick(self, now: float = None) -> dict:
+        """Take one sample, enforce the budget and return the summary"""
+        started_cpu = time.thread_time()
+        now = self.clock() if now is None else now
+        if self._started_at is None:
+            self._started_at = now
+
+        readings = {}
+        for pid in self._process_tree():
+            reading = read_process(pid, self.proc_root)
+            if reading is not None:
+                readings[pid] = reading
+
+        elapsed = now - self._previous_at if self._previous_at is not None else 0.0
+        processes = []
+        groups = {}
+        for pid, reading in readings.items():
+            entry = {"pid": pid, "name": reading["name"],
+                     "group": _group_of(reading["name"], pid, self.root_pid),
+                     "rss_mb": round(reading["rss_kb"] / 1024, 1),
+                     "cpu_percent": None, "read_kbps": None, "write_kbps": None}
+            previous = self._previous.get(pid)
+            # A reused pid is a different process
+            if previous is not None and previous["name"] == reading["name"] and elapsed > 0:
+                entry["cpu_percent"] = round(
+                    (reading["cpu_ticks"] - previous["cpu_ticks"]) / CLOCK_TICKS / elapsed * 100, 1)
+                if reading["read_bytes"] is not None and previous["read_bytes"] is not None:
+                    entry["read_kbps"] = round((reading["read_bytes"] - previous["read_bytes"]) / 1024 / elapsed, 1)
+                    entry["write_kbps"] = round(
+                        (reading["write_bytes"] - previous["write_bytes"]) / 1024 / elapsed, 1)
+            processes.append(entry)
+
+            group = groups.setdefault(entry["group"], {"count": 0, "cpu_percent": 0.0, "rss_mb": 0.0,
+                                                       "read_kbps": 0.0, "write_kbps": 0.0})
+            group["count"] += 1
+            for key in ("cpu_percent", "rss_mb", "read_kbps", "write_kbps"):
+                group[key] = round(group[key] + (entry[key] or 0.0), 1)
+
+        self._previous = readings
+        self._previous_at = now
+        self._samples += 1
+
+        player_cpu = groups.get("player", {}).get("cpu_percent", 0.0)
+        if elapsed > 0:
+            self._enforce_budget(player_cpu, now)
+
+        self._overhead_seconds += time.thread_time() - started_cpu
+        running = now - self._started_at
+        summary = {
+            "processes": processes,
+            "groups": groups,
+            "budget_percent": self.budget_percent,
+            "cap": self.cap,
+            "samples": self._samples,
+            "overhead_percent": round(self._overhead_seconds / running * 100, 3) if running > 0 else None,
+        }
+        with self._lock:
+            self._summary = summary
+        if elapsed > 0:
+            logger.debug("Resources: %s", self._format_summary(summary))
+            if self.log_every and self._samples % self.log_every == 0:
+                logger.info("Resources: %s", self._format_summary(summary))
+            self.sampled.emit(summary)
+        return summary
+
+    # ---------------------------------------------------------
+    #  Internals
+    # ---------------------------------------------------------
+    def _children(self, pid: int) -> list:
+        if self._children_files:
+            children = []
+            try:
+                for task in (Path(self.proc_root) / str(pid) / "task").iterdir():
+                    children.extend(int(child) for child in (task / "children").read_text().split())
+                return children
+            except FileNotFoundError:
+                if (Path(self.proc_root) / str(pid)).exists():
+                    # Kernel without CONFIG_PROC_CHILDREN
+                    logger.debug("No /proc children lists, scanning parents instead")
+                    self._children_files = False
+                else:
+                    return []
+            except (OSError, ValueError):
+                return []
+        return self._scan_children(pid)
+
+    def _scan_children(self, pid: int) -> list:
+        children = []
+        for entry in Path(self.proc_root).iterdir():
+            if not entry.name.isdigit():
+                continue
+            stat = _read_text(entry / "stat")
+            if stat and ")" in stat:
+                fields = stat[stat.rfind(")") + 2:].split()
+                if len(fields) > 1 and fields[1] == str(pid):
+                    children.append(int(entry.name))
+        return children
+
+    def _process_tree(self) -> list:
+        pids = [self.root_pid]
+        index = 0
+        while index < len(pids):
+            pids.extend(child for child in self._children(pids[index]) if child not in pids)
+            index += 1
+        return pids
+
+    def _enforce_budget(self, player_cpu: float, now: float):
+        if not self.budget_percent or self.throttle is None:
+            return
+        if player_cpu > self.budget_percent:
+            self._under_since = None
+            self._over_count += 1
+            if self._over_count < self.over_samples:
+                return
+            self._over_count = 0
+            level = PROFILES.index(self.cap)
+            if level >= PROFILES.index(self.floor_profile):
+                return
+            if self._stepped_up_at is not None and now - self._stepped_up_at < self.relax_seconds * 2:
+                # The level given back did not fit either: wait longer next time
+                self.relax_seconds = min(self.relax_seconds * 2, 3600.0)
+            self._stepped_up_at = None
+            self._set_cap(PROFILES[level + 1], f"player CPU {player_cpu:.0f}% over budget {self.budget_percent:.0f}%")
+            return
+
+        self._over_count = 0
+        if self._stepped_up_at is not None and now - self._stepped_up_at >= self.relax_seconds * 2:
+            # The last level given back has held: recover quickly again
+            self._stepped_up_at = None
+            self.relax_seconds = self.base_relax_seconds
+        if self.cap == FULL or player_cpu > self.budget_percent / 2:
+            self._under_since = None
+            return
+        if self._under_since is None:
+            self._under_since = now
+        elif now - self._under_since >= self.relax_seconds:
+            self._under_since = None
+            self._stepped_up_at = now
+            self._set_cap(PROFILES[PROFILES.index(self.cap) - 1],
+                          f"player CPU {player_cpu:.0f}% within budget {self.budget_percent:.0f}%")
+
+    def _set_cap(self, profile: str, reason: str):
+        logger.info("CPU budget: playback %s -> %s (%s)", self.cap, profile, reason)
+        self.cap = profile
+        if self.throttle:
+            self.throttle(profile, reason)
+
+    @staticmethod
+    def _format_summary(summary: dict) -> str:
+        groups = summary.get("groups") or {}
+        if not groups:
+            return "no samples"
+        parts = [f"{name} x{group['count']}: {group['cpu_percent']:.1f}% CPU, {group['rss_mb']:.0f} MB,"
+                 f" {group['read_kbps']:.0f}/{group['write_kbps']:.0f} kB/s r/w"
+                 for name, group in sorted(groups.items())]
+        return "; ".join(parts) + f"; cap {summary.get('cap')}, overhead {summary.get('overhead_percent')}%"
+
+    def _monitor_loop(self):
+        logger.debug("Resource monitor loop started")
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error("Resource sample failed: %s", e, exc_info=True)
+            self._stop_event.wait(self.interval)
+        logger.debug("Resource monitor loop finished")
@@ -0,0 +1,317 @@
+import time
+import random
+import bisect
+import logging
+from threading import Thread, Event, Lock
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from utils.system_utils import request_shuffle_url
+
+# failed() reason when the breaker refused the call before anything was sent
+CIRCUIT_OPEN = "circuit open"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram for shuffle API calls"""
+
+    # Upper bounds in milliseconds, the last bucket catches everything slower
+    BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self._lock = Lock()
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.outcomes = {}
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def record(self, seconds: float, outcome: str):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            self.total += 1
+            self.sum_ms += ms
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bucket bound (ms) below which p percent of calls finished"""
+        with self._lock:
+            if not self.total:
+                return None
+            threshold = self.total * p / 100
+            seen = 0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= threshold:
+                    return float(self.BUCKETS_MS[i]) if i < len(self.BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<={b}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+            snap = {
+                'buckets': dict(zip(labels, self.counts)),
+                'outcomes': dict(self.outcomes),
+                'count': self.total,
+                'mean_ms': round(self.sum_ms / self.total, 1) if self.total else None,
+            }
+        snap['p50_ms'] = self.percentile(50)
+        snap['p95_ms'] = self.percentile(95)
+        return snap
+
+
+class RetryBudget:
+    """
+    Token bucket that caps retries to a fraction of first attempts, so a failing
+    server sees at most (1 + ratio) times the normal request rate.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 5.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures; while open every call is
+    refused until `cooldown_seconds` have passed, then a single trial call decides
+    whether to close again. is_open() and allow() agree: while the trial is in
+    flight both refuse, so a caller that checked is_open() first is not turned
+    away by allow() afterwards (unless another caller took the trial in between).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 4, cooldown_seconds: float = 120.0,
+                 clock: Callable[[], float] = time.monotonic, name: str = "Shuffle API"):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started_at = 0.0
+        self._lock = Lock()
+
+    def _refusing(self, now: float) -> bool:
+        if self.state == self.OPEN:
+            return now - self.opened_at < self.cooldown_seconds
+        if self.state == self.HALF_OPEN:
+            # One trial at a time; one that never reported back does not block forever
+            return now - self.trial_started_at < self.cooldown_seconds
+        return False
+
+    def is_open(self) -> bool:
+        """True while allow() would refuse a call (does not start a trial)"""
+        with self._lock:
+            return self._refusing(self.clock())
+
+    def allow(self) -> bool:
+        """Check whether a call may go out now; after the cooldown the first caller gets the trial"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = self.clock()
+            if self._refusing(now):
+                return False
+            logging.info(f"{self.name} circuit half-open, sending a trial request")
+            self.state = self.HALF_OPEN
+            self.trial_started_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logging.info(f"{self.name} circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logging.warning(f"{self.name} circuit opened after {self.failures} failures, "
+                                    f"using local wallpapers for {self.cooldown_seconds:.0f}s")
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+
+class ShuffleClient(QObject):
+    """
+    Shuffle API client that never blocks the Qt event loop.
+
+    request() runs the API call on a worker thread and reports back through
+    url_ready / failed. Failed attempts are retried with jittered exponential
+    backoff while the shared retry budget allows it, and repeated failures open a
+    circuit breaker so callers can go straight to the local collection.
+    fetch() is the blocking variant for background work (the prefetch pool). It
+    has a breaker of its own, so a flaky prefetch never keeps the user's clicks
+    off the API. Either breaker only counts the API being unreachable (timeouts,
+    connection errors, 5xx/429); a wrong or malformed answer means it is up.
+    """
+
+    url_ready = Signal(str, bool)  # url, is_animated
+    failed = Signal(str, bool)     # reason, is_animated
+
+    def __init__(self, width: int, height: int, language_getter: Callable[[], str] = None,
+                 max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 4.0,
+                 request_fn: Callable = request_shuffle_url, connectivity=None, parent=None):
+        super().__init__(parent)
+        logging.debug("Initializing ShuffleClient")
+        self.width = width
+        self.height = height
+        self.language_getter = language_getter or (lambda: "pl")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.request_fn = request_fn
+        # Optional ConnectivityMonitor fed with the outcome of real requests
+        self.connectivity = connectivity
+
+        self.breaker = CircuitBreaker()
+        self.prefetch_breaker = CircuitBreaker(name="Shuffle API (prefetch)")
+        self.retry_budget = RetryBudget()
+        self.latency = LatencyHistogram()
+
+        self._generation = 0
+        self._generation_lock = Lock()
+        self._stop_event = Event()
+
+    # ---------------------------------------------------------
+    #  Public API
+    # ---------------------------------------------------------
+    def is_available(self) -> bool:
+        """False while the circuit breaker keeps us on the local collection"""
+        return not self.breaker.is_open()
+
+    def request(self, is_animated: bool):
+        """Fetch a shuffle URL in the background; a newer request supersedes older ones"""
+        with self._generation_lock:
+            self._generation += 1
+            generation = self._generation
+        lang = self.language_getter()
+        Thread(target=self._request_worker, args=(generation, is_animated, lang),
+               name="ShuffleClient", daemon=True).start()
+
+    def cancel(self):
+        """Drop the result of any request still in flight"""
+        with self._generation_lock:
+            self._generation += 1
+
+    def stop(self):
+        """Abort pending backoff waits and log the latency summary"""
+        self.cancel()
+        self._stop_event.set()
+        logging.info(f"Shuffle API latency: {self.latency.snapshot()}")
+
+    def fetch(self, width: int, height: int, is_animated: bool = False, lang: str = "pl") -> Optional[str]:
+        """
+        Blocking fetch with retries and the prefetch circuit breaker.
+
+        Returns:
+            str | None: wallpaper URL, or None if the API is unavailable
+        """
+        url, reason = self._fetch(width, height, is_animated, lang, self.prefetch_breaker)
+        if not url:
+            logging.debug(f"Shuffle fetch gave up: {reason}")
+        return url
+
+    # ---------------------------------------------------------
+    #  Worker
+    # ---------------------------------------------------------
+    def _request_worker(self, generation: int, is_animated: bool, lang: str):
+        url, reason = self._fetch(self.width, self.height, is_animated, lang, self.breaker)
+        if generation != self._generation:
+            logging.debug("Discarding superseded shuffle response")
+            return
+        if url:
+            self.url_ready.emit(url, is_animated)
+        else:
+            self.failed.emit(reason, is_animated)
+
+    def _fetch(self, width: int, height: int, is_animated: bool, lang: str, breaker: CircuitBreaker) -> tuple:
+        """Returns (url, None) on success or (None, reason) on failure"""
+        import requests
+
+        expected_type = "mp4" if is_animated else "img"
+        self.retry_budget.deposit()
+        reason = "no attempt made"
+
+        for attempt in range(1, self.max_attempts + 1):
+            if self._stop_event.is_set():
+                return None, "client stopped"
+            if not breaker.allow():
+                # A failed attempt of this call may just have opened it; report that failure
+                return None, reason if attempt > 1 else CIRCUIT_OPEN
+
+            started = time.monotonic()
+            try:
+                url, wallpaper_type = self.request_fn(width, height, is_animated, lang)
+                if wallpaper_type == expected_type:
+                    outcome, retryable = "ok", False
+                else:
+                    outcome, retryable = "wrong_type", True
+                    reason = f"server returned type '{wallpaper_type}', expected '{expected_type}'"
+            except requests.exceptions.Timeout:
+                outcome, retryable, reason = "timeout", True, "request timed out"
+            except requests.exceptions.ConnectionError as e:
+                outcome, retryable, reason = "connection_error", True, f"connection error: {e}"
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code if e.response is not None else 0
+                outcome, reason = "http_error", f"HTTP error: {e}"
+                retryable = status >= 500 or status == 429
+            except ValueError as e:
+                outcome, retryable, reason = "bad_response", False, str(e)
+            except Exception as e:
+                outcome, retryable, reason = "error", False, f"unexpected error: {e}"
+            elapsed = time.monotonic() - started
+            self.latency.record(elapsed, outcome)
+
+            if self.connectivity is not None:
+                if outcome in ("timeout", "connection_error"):
+                    self.connectivity.report_failure()
+                else:
+                    self.connectivity.report_success()
+
+            if outcome in ("timeout", "connection_error") or (outcome == "http_error" and retryable):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            if outcome == "ok":
+                logging.info(f"Shuffle URL fetched in {elapsed * 1000:.0f} ms (attempt {attempt}): {url}")
+                return url, None
+
+            logging.warning(f"Shuffle API attempt {attempt}/{self.max_attempts} failed after "
+                            f"{elapsed * 1000:.0f} ms: {reason}")
+
+            if not retryable or attempt == self.max_attempts:
+                break
+            if not self.retry_budget.try_spend():
+                logging.warning("Shuffle API retry budget exhausted, not retrying")
+                break
+
+            # Full jitter keeps clients from retrying in lockstep
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+            if self._stop_event.wait(delay):
+                return None, "client stopped"
+
+        return None, reason
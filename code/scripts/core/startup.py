@@ -0,0 +1,124 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable
+
+from PySide6.QtCore import QObject, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTrace:
+    """
+    Records how long each startup stage takes, relative to the start of main().
+
+    Stages can overlap (the probes run on worker threads), so each one keeps its
+    own start offset and duration. Milestones such as "first_window" and
+    "interactive" are points in time without a duration.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+        self.milestones = {}
+        self._lock = Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as one stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started, time.perf_counter())
+
+    def record(self, name: str, started: float, finished: float):
+        entry = (name, (started - self.started) * 1000, (finished - started) * 1000,
+                 threading.current_thread().name)
+        with self._lock:
+            self.stages.append(entry)
+
+    def mark(self, name: str) -> float:
+        """Record a milestone (first time only) and return its offset in ms"""
+        with self._lock:
+            return self.milestones.setdefault(name, self.elapsed_ms())
+
+    def summary(self) -> str:
+        with self._lock:
+            stages = sorted(self.stages, key=lambda entry: entry[1])
+            milestones = sorted(self.milestones.items(), key=lambda item: item[1])
+        lines = ["Startup trace (ms):"]
+        for name, offset, duration, thread in stages:
+            lines.append(f"  {offset:8.1f} +{duration:8.1f}  {name} [{thread}]")
+        for name, offset in milestones:
+            lines.append(f"  {offset:8.1f}            * {name}")
+        return "\n".join(lines)
+
+
+_trace = None
+
+
+def get_startup_trace() -> StartupTrace:
+    """Process-wide trace; the first call sets time zero"""
+    global _trace
+    if _trace is None:
+        _trace = StartupTrace()
+    return _trace
+
+
+class StartupTasks(QObject):
+    """
+    Runs the blocking startup probes concurrently on a small thread pool.
+
+    Each task is timed on the trace. Results come back through task_done, which
+    is delivered on the GUI thread because the receivers live there, so handlers
+    can touch widgets. all_done fires once every submitted task has finished,
+    failed tasks included.
+    """
+
+    task_done = Signal(str, object)
+    task_failed = Signal(str, str)
+    all_done = Signal()
+
+    def __init__(self, trace: StartupTrace = None, max_workers: int = 4, parent=None):
+        super().__init__(parent)
+        self.trace = trace or get_startup_trace()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Startup")
+        self._pending = 0
+        self._lock = Lock()
+
+    def run(self, tasks: dict):
+        """Start {name: callable} tasks; all_done fires after the last of them"""
+        if not tasks:
+            self.all_done.emit()
+            return
+        with self._lock:
+            self._pending += len(tasks)
+        for name, fn in tasks.items():
+            self._executor.submit(self._run, name, fn)
+
+    def shutdown(self):
+        """Drop queued tasks; running ones finish on their own"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, name: str, fn: Callable):
+        try:
+            with self.trace.stage(name):
+                result = fn()
+        except Exception as e:
+            logger.error("Startup task %s failed: %s", name, e, exc_info=True)
+            self.task_failed.emit(name, str(e))
+        else:
+            self.task_done.emit(name, result)
+
+        with self._lock:
+            self._pending -= 1
+            finished = self._pending == 0
+        if finished:
+            self.all_done.emit()
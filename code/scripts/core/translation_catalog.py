@@ -0,0 +1,114 @@
+import os
+import sys
+import json
+import marshal
+import logging
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cache layout changes
+CACHE_FORMAT = 1
+CACHE_FILE_NAME = "translations.marshal"
+
+
+class TranslationCatalog:
+    """
+    All UI strings from languages.json, parsed once per process.
+
+    languages.json holds every language in one file. After the first parse
+    each language is kept as its own marshal blob, and a language's dict is only
+    built when it is asked for. The blobs are also written to a binary cache
+    keyed by the source file's path, mtime and size, so later starts skip the
+    JSON parse. Switching languages never touches the disk after load().
+    """
+
+    def __init__(self, source: Path, cache_path: Path = None):
+        self.source = Path(source)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._blobs = None
+        self._languages = {}
+        self._lock = Lock()
+
+    def load(self) -> bool:
+        """Read the cache or parse the source (once); False if there is nothing to load"""
+        with self._lock:
+            if self._blobs is None:
+                self._blobs = self._load_index()
+            return bool(self._blobs)
+
+    def codes(self) -> list:
+        """Language codes in file order"""
+        self.load()
+        return list(self._blobs)
+
+    def get(self, code: str) -> Optional[dict]:
+        """Strings for one language, built on first use"""
+        self.load()
+        language = self._languages.get(code)
+        if language is None:
+            blob = self._blobs.get(code)
+            if blob is None:
+                return None
+            language = self._languages.setdefault(code, marshal.loads(blob))
+        return language
+
+    def __contains__(self, code: str) -> bool:
+        self.load()
+        return code in self._blobs
+
+    # ---------------------------------------------------------
+    #  Loading
+    # ---------------------------------------------------------
+    def _cache_key(self, stat: os.stat_result) -> tuple:
+        return (CACHE_FORMAT, sys.version_info[:2], str(self.source), stat.st_mtime_ns, stat.st_size)
+
+    def _load_index(self) -> dict:
+        try:
+            stat = self.source.stat()
+        except OSError:
+            logger.warning("Translations file not found: %s", self.source)
+            return {}
+
+        key = self._cache_key(stat)
+        blobs = self._read_cache(key)
+        if blobs is not None:
+            logger.debug("Translations loaded from cache %s", self.cache_path)
+            return blobs
+
+        try:
+            with self.source.open("r", encoding="utf-8") as f:
+                languages = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error("Could not read translations %s: %s", self.source, e)
+            return {}
+
+        blobs = {code: marshal.dumps(strings) for code, strings in languages.items()}
+        self._write_cache(key, blobs)
+        logger.debug("Translations parsed from %s (%d languages)", self.source, len(blobs))
+        return blobs
+
+    def _read_cache(self, key: tuple) -> Optional[dict]:
+        if self.cache_path is None:
+            return None
+        try:
+            cached_key, blobs = marshal.loads(self.cache_path.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if tuple(cached_key) != key:
+            return None
+        return blobs
+
+    def _write_cache(self, key: tuple, blobs: dict):
+        """Best effort: a missing cache only costs the JSON parse next time"""
+        if self.cache_path is None:
+            return
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(marshal.dumps((key, blobs)))
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.debug("Could not write translations cache %s: %s", self.cache_path, e)
@@ -5,23 +5,39 @@ import platform
 import os
 import re
 import time
+import shlex
+from threading import RLock
 
 from PySide6.QtWidgets import QMessageBox
 
-from utils.system_utils import which, set_static_desktop_wallpaper
+from utils.system_utils import set_static_desktop_wallpaper
+from utils.desktop_backends import get_desktop_backends
 from utils.path_utils import get_weebp_path, get_mpv_path, get_tools_path
 from utils.command_handler import run_and_forget_silent
+from utils.mpv_ipc import mpv_ipc_address, set_paused, MpvIpcError
 
 
 class WallpaperController:
+    """
+    Starts and stops the wallpaper players and sets still wallpapers.
+
+    Called from the apply pipeline's worker, the GUI thread and the
+    auto-pause worker; the public methods hold one lock, so a stop never
+    runs in the middle of a start and player_procs is not read while it
+    changes.
+    """
+
     def __init__(self):
         self.player_procs = []
         self.current_is_video = False
+        self._lock = RLock()
 
         # Cached paths
         self.tools_path = get_tools_path()
         self.weebp_path = get_weebp_path()
         self.mpv_path = get_mpv_path()
+        # Optional callable: original video path -> screen-sized proxy path or None
+        self.proxy_lookup = None
 
         # Refresh limits
         self.refresh_limit = 6
@@ -41,6 +57,20 @@ class WallpaperController:
             self.mpv_path is not None and self.mpv_path.exists()
         )
 
+    def discover_tools(self) -> dict:
+        """
+        Probe the Linux desktop backends and video players once (in parallel).
+        Runs on a startup worker; the registry caches the result, so wallpaper
+        applies made before the probe has finished wait for it instead of
+        probing again.
+        """
+        tools = get_desktop_backends().probe()
+        logging.info(f"Discovered wallpaper tools: {tools}")
+        return tools
+
+    def _find_tool(self, name: str):
+        return get_desktop_backends().find_tool(name)
+
     # ---------------------------------------------------------
     #  Optional Tools
     # ---------------------------------------------------------
@@ -70,20 +100,21 @@ class WallpaperController:
     #  STOP
     # ---------------------------------------------------------
     def stop(self):
-        logging.info("Stopping wallpaper processes...")
+        with self._lock:
+            logging.info("Stopping wallpaper processes...")
 
-        if sys.platform.startswith("linux"):
-            for proc in ("xwinwrap", "mpv"):
-                subprocess.call(
-                    f"pkill -f {proc}", shell=True,
-                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-                )
+            if sys.platform.startswith("linux"):
+                for proc in ("xwinwrap", "mpv"):
+                    subprocess.call(
+                        f"pkill -f {proc}", shell=True,
+                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                    )
 
-        elif sys.platform.startswith("win") and self.current_is_video:
-            self._stop_windows()
+            elif sys.platform.startswith("win") and self.current_is_video:
+                self._stop_windows()
 
-        self.current_is_video = False
-        logging.info("All wallpaper processes stopped")
+            self.current_is_video = False
+            logging.info("All wallpaper processes stopped")
 
     def _stop_windows(self):
         self._clear_playlist()
@@ -104,19 +135,26 @@ class WallpaperController:
     #  VIDEO STARTERS
     # ---------------------------------------------------------
     def start_video(self, video_path: str):
-        logging.debug(f"Current is video: {self.current_is_video}")
+        with self._lock:
+            logging.debug(f"Current is video: {self.current_is_video}")
 
-        if platform.system() == "Windows":
-            if self.current_is_video:
-                return self._play_next_video(video_path)
+            if self.proxy_lookup:
+                proxy = self.proxy_lookup(video_path)
+                if proxy:
+                    logging.info(f"Playing proxy {proxy} for {video_path}")
+                    video_path = proxy
 
-            self.current_is_video = True
-            return self._start_video_windows(video_path)
+            if platform.system() == "Windows":
+                if self.current_is_video:
+                    return self._play_next_video(video_path)
+
+                self.current_is_video = True
+                return self._start_video_windows(video_path)
 
-        if sys.platform.startswith("linux"):
-            return self._start_video_linux(video_path)
+            if sys.platform.startswith("linux"):
+                return self._start_video_linux(video_path)
 
-        return self._start_video_fallback(video_path)
+            return self._start_video_fallback(video_path)
 
     # ---------------------------------------------------------
     #  Playlist Control (Windows)
@@ -152,7 +190,7 @@ class WallpaperController:
 
             mpv_cmd = [
                 weebp, "run", "mpv", video_path,
-                "--input-ipc-server=\\\\.\\pipe\\mpvsocket",
+                f"--input-ipc-server={mpv_ipc_address()}",
                 "--fullscreen",
                 "--panscan=1.0",
                 "--no-border",
@@ -182,28 +220,32 @@ class WallpaperController:
     #  LINUX VIDEO START
     # ---------------------------------------------------------
     def _start_video_linux(self, video_path):
-        xwinwrap = which("xwinwrap")
-        mpv = which("mpv")
+        xwinwrap = self._find_tool("xwinwrap")
+        mpv = self._find_tool("mpv")
 
         if xwinwrap and mpv:
             try:
                 cmd = (
                     f"{xwinwrap} -ov -fs -- "
-                    f"{mpv} --loop --no-audio --no-osd-bar --wid=WID '{video_path}'"
+                    f"{mpv} --loop --no-audio --no-osd-bar --wid=WID "
+                    f"--input-ipc-server={shlex.quote(mpv_ipc_address())} {shlex.quote(video_path)}"
                 )
                 p = subprocess.Popen(cmd, shell=True, executable="/bin/bash",
                                      stdout=subprocess.DEVNULL,
                                      stderr=subprocess.DEVNULL)
                 self.player_procs.append(p)
+                self.current_is_video = True
                 return
             except Exception as e:
                 logging.error(f"xwinwrap failed: {e}")
 
         if mpv:
             p = subprocess.Popen(
-                [mpv, "--loop", "--no-audio", "--no-osd-bar", "--fullscreen", "--no-border", video_path],
+                [mpv, "--loop", "--no-audio", "--no-osd-bar", "--fullscreen", "--no-border",
+                 f"--input-ipc-server={mpv_ipc_address()}", video_path],
                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             self.player_procs.append(p)
+            self.current_is_video = True
             return
 
         raise RuntimeError("No suitable video wallpaper backend (xwinwrap/mpv).")
@@ -212,28 +254,58 @@ class WallpaperController:
     #  FALLBACK VIDEO START
     # ---------------------------------------------------------
     def _start_video_fallback(self, video_path):
-        mpv = which("mpv")
+        mpv = self._find_tool("mpv")
         if not mpv:
             raise RuntimeError(f"Unsupported platform: {sys.platform}")
 
         subprocess.Popen(
-            [mpv, "--loop", "--no-audio", "--fullscreen", "--no-border", video_path],
+            [mpv, "--loop", "--no-audio", "--fullscreen", "--no-border",
+             f"--input-ipc-server={mpv_ipc_address()}", video_path],
             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
+    def player_alive(self) -> bool:
+        """False when the last player started here has already exited (Linux)"""
+        with self._lock:
+            if not sys.platform.startswith("linux") or not self.player_procs:
+                return True
+            return self.player_procs[-1].poll() is None
+
+    def player_pids(self) -> set:
+        """Processes of the players started here"""
+        with self._lock:
+            return {proc.pid for proc in self.player_procs}
+
+    # ---------------------------------------------------------
+    #  PAUSE / RESUME (mpv IPC)
+    # ---------------------------------------------------------
+    def set_video_paused(self, paused: bool) -> bool:
+        """Pause or resume the video wallpaper; False when no mpv is reachable"""
+        with self._lock:
+            try:
+                set_paused(paused)
+            except MpvIpcError as e:
+                logging.warning(f"Could not {'pause' if paused else 'resume'} video wallpaper: {e}")
+                return False
+            logging.info(f"Video wallpaper {'paused' if paused else 'resumed'}")
+            return True
+
     # ---------------------------------------------------------
     #  STATIC IMAGE
     # ---------------------------------------------------------
-    def start_image(self, image_path):
-        try:
-            set_static_desktop_wallpaper(image_path)
-        except Exception as e:
-            logging.error(f"Failed to set wallpaper: {e}")
-            raise
+    def start_image(self, image_path) -> bool:
+        """Set a still wallpaper; returns what the desktop backend reported"""
+        with self._lock:
+            try:
+                applied = set_static_desktop_wallpaper(image_path)
+            except Exception as e:
+                logging.error(f"Failed to set wallpaper: {e}")
+                raise
 
-        if self.current_is_video:
-            self.stop()
+            if self.current_is_video:
+                self.stop()
 
-        self.current_is_video = False
+            self.current_is_video = False
+            return applied
 
     # ---------------------------------------------------------
     #  VIEW ID PARSING (Windows)
@@ -1,156 +1,376 @@
+import os
 import json
+import atexit
 from pathlib import Path
+from contextlib import contextmanager
+from threading import Thread, Event, Lock, RLock
 from typing import Dict, Any, Optional
 import logging
 
+from PySide6.QtCore import QObject, Signal, QTimer, QFileSystemWatcher
+
 from utils.path_utils import CONFIG_PATH
 from utils.system_utils import current_system_locale
 
+logger = logging.getLogger(__name__)
+
+
+class Config(QObject):
+    """
+    JSON-backed settings with write-behind persistence.
 
+    Use get_config() for the process-wide instance, so every component reads the
+    same in-memory data and sees each other's changes through `changed`.
 
-class Config:
-    def __init__(self):
-        logging.debug("Initializing Config class")
+    set() only updates memory and schedules a save; a writer thread waits until
+    changes have been quiet for `debounce_seconds` and writes them in one go.
+    Writes are atomic (temp file, fsync, rename), so a crash leaves either the
+    old or the new file. Call flush() before exiting; it also runs at interpreter
+    exit as a safety net.
+    """
+
+    # key, new value - emitted for local set() calls and for external file edits
+    changed = Signal(str, object)
+    # config.json was edited outside the app and re-read
+    reloaded = Signal()
+
+    def __init__(self, debounce_seconds: float = 1.0, parent=None):
+        super().__init__(parent)
+        logger.debug("Initializing Config class")
         self.data: Dict[str, Any] = {}
+        self.debounce_seconds = debounce_seconds
+        # Number of times the file was actually written
+        self.write_count = 0
+
+        self._lock = RLock()
+        # Held from snapshot to rename, so the writer thread and flush() never
+        # share the tmp file or land an older snapshot last; taken before _lock
+        self._write_lock = Lock()
+        self._dirty = False
+        self._batch_depth = 0
+        self._save_requested = Event()
+        self._writer = None
+        # Keys changed since the last save, they win over external edits
+        self._dirty_keys = set()
+        # Last text written or read, used to tell our own writes from external edits
+        self._file_text = None
+        self._system_language = None
+        self._watcher = None
+        self._reload_pending = False
+
         self.load()
-        logging.info("Config initialization completed")
+        atexit.register(self.flush)
+        logger.info("Config initialization completed")
 
     def load(self):
         """Load configuration from file"""
-        logging.debug(f"Loading configuration from: {CONFIG_PATH}")
+        logger.debug(f"Loading configuration from: {CONFIG_PATH}")
         try:
             if CONFIG_PATH.exists():
-                logging.debug("Config file exists, reading contents")
+                logger.debug("Config file exists, reading contents")
                 with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
-                logging.info(f"Configuration loaded successfully - {len(self.data)} keys loaded")
-                logging.debug(f"Config keys: {list(self.data.keys())}")
+                    self._file_text = f.read()
+                self.data = json.loads(self._file_text)
+                logger.info(f"Configuration loaded successfully - {len(self.data)} keys loaded")
+                logger.debug(f"Config keys: {list(self.data.keys())}")
             else:
-                logging.warning("Config file does not exist, creating empty configuration")
+                logger.warning("Config file does not exist, creating empty configuration")
                 self.data = {}
                 self.save()
-                logging.info("Empty configuration created and saved")
+                logger.info("Empty configuration created and saved")
         except json.JSONDecodeError as e:
-            logging.error(f"Failed to parse config file (invalid JSON): {e}")
-            logging.warning("Creating empty configuration due to parse error")
+            logger.error(f"Failed to parse config file (invalid JSON): {e}")
+            logger.warning("Creating empty configuration due to parse error")
             self.data = {}
         except Exception as e:
-            logging.error(f"Failed to load configuration: {e}", exc_info=True)
-            logging.warning("Creating empty configuration due to load error")
+            logger.error(f"Failed to load configuration: {e}", exc_info=True)
+            logger.warning("Creating empty configuration due to load error")
             self.data = {}
 
     def save(self):
-        """Save configuration to file"""
-        logging.debug(f"Saving configuration to: {CONFIG_PATH}")
+        """Save configuration to file right away (atomic replace)"""
+        logger.debug(f"Saving configuration to: {CONFIG_PATH}")
+        with self._write_lock:
+            with self._lock:
+                snapshot = json.dumps(self.data, indent=2)
+                keys = len(self.data)
+                self._dirty = False
+                self._dirty_keys.clear()
+                self._file_text = snapshot
+
+            tmp_path = CONFIG_PATH.with_name(CONFIG_PATH.name + ".tmp")
+            try:
+                # Ensure directory exists
+                CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(snapshot)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, CONFIG_PATH)
+                self.write_count += 1
+                logger.info(f"Configuration saved successfully - {keys} keys saved")
+            except PermissionError as e:
+                logger.error(f"Permission denied saving config file: {e}")
+                logger.warning("Configuration changes not persisted due to permission error")
+            except Exception as e:
+                logger.error(f"Failed to save configuration: {e}", exc_info=True)
+                logger.warning("Configuration changes not persisted due to save error")
+            finally:
+                if tmp_path.exists():
+                    try:
+                        tmp_path.unlink()
+                    except OSError:
+                        pass
+
+    def flush(self):
+        """Write pending changes now, if there are any"""
+        with self._lock:
+            dirty = self._dirty
+        if dirty:
+            logger.debug("Flushing pending configuration changes")
+            self.save()
+
+    @contextmanager
+    def batch(self):
+        """
+        Group several set() calls into a single save.
+
+        Example:
+            with config.batch():
+                config.set("a", 1)
+                config.set("b", 2)
+        """
+        with self._lock:
+            self._batch_depth += 1
         try:
-            # Ensure directory exists
-            CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-            logging.debug(f"Config directory ensured: {CONFIG_PATH.parent}")
-            
-            with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2)
-            logging.info(f"Configuration saved successfully - {len(self.data)} keys saved")
-            logging.debug(f"Saved config keys: {list(self.data.keys())}")
-        except PermissionError as e:
-            logging.error(f"Permission denied saving config file: {e}")
-            logging.warning("Configuration changes not persisted due to permission error")
-        except Exception as e:
-            logging.error(f"Failed to save configuration: {e}", exc_info=True)
-            logging.warning("Configuration changes not persisted due to save error")
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                schedule = self._batch_depth == 0 and self._dirty
+            if schedule:
+                self._schedule_save()
+
+    def _schedule_save(self):
+        """Ask the writer thread to save once changes settle"""
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = Thread(target=self._writer_loop, name="ConfigWriter", daemon=True)
+            self._writer.start()
+        self._save_requested.set()
+
+    def _writer_loop(self):
+        while True:
+            self._save_requested.wait()
+            self._save_requested.clear()
+            # Debounce: keep waiting while new changes keep arriving
+            while self._save_requested.wait(self.debounce_seconds):
+                self._save_requested.clear()
+            with self._lock:
+                ready = self._dirty and self._batch_depth == 0
+            if ready:
+                self.save()
+
+    def watch_file(self):
+        """Reload config.json when it is edited outside the app"""
+        if self._watcher is not None:
+            return
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        if CONFIG_PATH.exists():
+            self._watcher.addPath(str(CONFIG_PATH))
+        logger.debug(f"Watching config file: {CONFIG_PATH}")
+
+    def _on_file_changed(self, path: str):
+        # Atomic replaces drop the path from the watcher, so add it back
+        if path not in self._watcher.files() and CONFIG_PATH.exists():
+            self._watcher.addPath(path)
+        # Editors often write in several steps, react once they settle
+        if not self._reload_pending:
+            self._reload_pending = True
+            QTimer.singleShot(250, self._reload_from_disk)
+
+    def _reload_from_disk(self):
+        """Merge an external edit of config.json into memory"""
+        self._reload_pending = False
+        try:
+            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except OSError as e:
+            logger.debug(f"Config file not readable for reload: {e}")
+            return
+
+        if text == self._file_text:
+            # Our own write
+            return
+
+        try:
+            external = json.loads(text)
+            if not isinstance(external, dict):
+                raise ValueError("top level is not an object")
+        except ValueError as e:
+            logger.warning(f"Ignoring external config edit, invalid JSON: {e}")
+            return
+
+        with self._lock:
+            self._file_text = text
+            # The file replaces the store, so keys deleted on disk go too;
+            # unsaved local changes win over the file
+            merged = dict(external)
+            for key in self._dirty_keys:
+                if key in self.data:
+                    merged[key] = self.data[key]
+            changes = {k: v for k, v in merged.items() if k not in self.data or self.data[k] != v}
+            # Removed keys are reported with None, what get() now returns
+            changes.update((k, None) for k in self.data if k not in merged)
+            self.data = merged
+            if "language" in changes:
+                self._system_language = None
+
+        logger.info(f"Configuration reloaded from disk - {len(changes)} keys changed")
+        for key, value in changes.items():
+            self.changed.emit(key, value)
+        self.reloaded.emit()
 
     def get(self, key: str, default=None):
         """Get configuration value with logging"""
         value = self.data.get(key, default)
-        logging.debug(f"Config get - key: '{key}', value: {value}, default: {default}")
+        logger.debug("Config get - key: '%s', value: %r, default: %r", key, value, default)
         return value
 
     def set(self, key: str, value):
         """Set configuration value with logging"""
         old_value = self.data.get(key)
-        logging.debug(f"Config set - key: '{key}', old_value: {old_value}, new_value: {value}")
-        
-        self.data[key] = value
-        logging.debug(f"Config value updated in memory, saving to file")
+        logger.debug("Config set - key: '%s', old_value: %r, new_value: %r", key, old_value, value)
         
+        with self._lock:
+            if key in self.data and old_value == value:
+                logger.debug(f"Config key '{key}' unchanged, nothing to save")
+                return
+            self.data[key] = value
+            self._dirty = True
+            self._dirty_keys.add(key)
+            in_batch = self._batch_depth > 0
+
+        self.changed.emit(key, value)
+        if not in_batch:
+            logger.debug(f"Config value updated in memory, save scheduled")
+            self._schedule_save()
+
+    def get_int(self, key: str, default: int) -> int:
+        """Get an int, falling back to default for missing or malformed values"""
+        value = self.data.get(key, default)
         try:
-            self.save()
-            logging.info(f"Config key '{key}' updated successfully")
-        except Exception as e:
-            logging.error(f"Config key '{key}' updated in memory but failed to save: {e}")
+            return int(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Config key '{key}' is not an int: {value!r}, using {default}")
+            return default
+
+    def get_bool(self, key: str, default: bool) -> bool:
+        """Get a bool; accepts the strings true/false written by hand"""
+        value = self.data.get(key, default)
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+
+    def get_str(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a string, None stays None"""
+        value = self.data.get(key, default)
+        return value if value is None or isinstance(value, str) else str(value)
 
     def get_last_video(self) -> Optional[str]:
         """Get last video path with logging"""
-        last_video = self.get("last_video")
-        logging.debug(f"Retrieved last video path: {last_video}")
+        last_video = self.get_str("last_video")
+        logger.debug(f"Retrieved last video path: {last_video}")
         return last_video
 
     def set_last_video(self, path: str):
         """Set last video path with logging"""
-        logging.info(f"Setting last video path: {path}")
+        logger.info(f"Setting last video path: {path}")
         self.set("last_video", path)
-        logging.debug(f"Last video path saved: {path}")
+        logger.debug(f"Last video path saved: {path}")
 
     def get_scheduler_settings(self) -> tuple:
         """Get scheduler settings with logging"""
-        source = self.get("scheduler_source")
-        interval = self.get("scheduler_interval", 30)
-        enabled = self.get("scheduler_enabled", False)
+        source = self.get_str("scheduler_source")
+        interval = self.get_int("scheduler_interval", 30)
+        enabled = self.get_bool("scheduler_enabled", False)
         
-        logging.debug(f"Retrieved scheduler settings - source: {source}, interval: {interval}, enabled: {enabled}")
+        logger.debug(f"Retrieved scheduler settings - source: {source}, interval: {interval}, enabled: {enabled}")
         return source, interval, enabled
 
     def set_scheduler_settings(self, source: str, interval: int, enabled: bool):
         """Set scheduler settings with logging"""
-        logging.info(f"Setting scheduler settings - source: {source}, interval: {interval}, enabled: {enabled}")
-        self.set("scheduler_source", source)
-        self.set("scheduler_interval", interval)
-        self.set("scheduler_enabled", enabled)
-        logging.debug("Scheduler settings saved successfully")
+        logger.info(f"Setting scheduler settings - source: {source}, interval: {interval}, enabled: {enabled}")
+        with self.batch():
+            self.set("scheduler_source", source)
+            self.set("scheduler_interval", interval)
+            self.set("scheduler_enabled", enabled)
+        logger.debug("Scheduler settings saved successfully")
 
     def get_range_preference(self) -> str:
         """Get range preference with logging"""
-        range_pref = self.get("range_preference", "all")
-        logging.debug(f"Retrieved range preference: {range_pref}")
+        range_pref = self.get_str("range_preference", "all")
+        logger.debug(f"Retrieved range preference: {range_pref}")
         return range_pref
 
     def set_range_preference(self, range_type: str):
         """Set range preference with logging"""
-        logging.info(f"Setting range preference: {range_type}")
+        logger.info(f"Setting range preference: {range_type}")
         self.set("range_preference", range_type)
-        logging.debug(f"Range preference saved: {range_type}")
+        logger.debug(f"Range preference saved: {range_type}")
 
     def get_language(self) -> str:
         """Get language preference with logging"""
-        config_language = self.get("language")
-        system_language = current_system_locale()
+        config_language = self.get_str("language")
+        # Locale detection is comparatively slow and does not change while running
+        if self._system_language is None:
+            self._system_language = current_system_locale()
+        system_language = self._system_language
         final_language = config_language or system_language
         
-        logging.debug(f"Language preference - config: {config_language}, system: {system_language}, final: {final_language}")
+        logger.debug(f"Language preference - config: {config_language}, system: {system_language}, final: {final_language}")
         return final_language
 
     def set_language(self, language: str):
         """Set language preference with logging"""
-        logging.info(f"Setting language preference: {language}")
+        logger.info(f"Setting language preference: {language}")
         self.set("language", language)
-        logging.debug(f"Language preference saved: {language}")
+        logger.debug(f"Language preference saved: {language}")
 
     def get_all_settings(self) -> Dict[str, Any]:
         """Get all settings for debugging purposes"""
-        logging.debug("Retrieving all configuration settings")
+        logger.debug("Retrieving all configuration settings")
         return self.data.copy()
 
     def clear(self):
         """Clear all configuration data with logging"""
-        logging.warning("Clearing all configuration data")
-        old_key_count = len(self.data)
-        self.data = {}
+        logger.warning("Clearing all configuration data")
+        with self._lock:
+            old_key_count = len(self.data)
+            self.data = {}
+            self._dirty_keys.clear()
         try:
             self.save()
-            logging.info(f"Configuration cleared - {old_key_count} keys removed")
+            logger.info(f"Configuration cleared - {old_key_count} keys removed")
         except Exception as e:
-            logging.error(f"Configuration cleared in memory but failed to save: {e}")
+            logger.error(f"Configuration cleared in memory but failed to save: {e}")
 
     def __str__(self) -> str:
         """String representation for debugging"""
         key_count = len(self.data)
-        return f"Config(keys={key_count}, path={CONFIG_PATH})"
\ No newline at end of file
+        return f"Config(keys={key_count}, path={CONFIG_PATH})"
+
+
+_config = None
+_config_lock = RLock()
+
+
+def get_config() -> Config:
+    """Return the process-wide configuration store"""
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = Config()
+    return _config
@@ -1,18 +1,88 @@
+import os
 import sys
+import queue
+import atexit
 import logging
+import logging.handlers
+from collections import deque
 import colorlog
 from utils.system_utils import isBundle
+from utils.path_utils import get_log_dir
+
+LOG_FILE_NAME = 'app.log'
+LOG_MAX_BYTES = 2 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+RING_BUFFER_SIZE = 500
+
+# Per-module levels on top of the root level. Chatty hot paths stay at INFO
+# even in dev builds; override with e.g.
+#   TAPECIARNIA_LOG_LEVELS="ui.dialogs=DEBUG,core.scheduler=WARNING"
+MODULE_LEVELS = {
+    'ui.dialogs': logging.INFO,
+    'models.config': logging.INFO,
+    'core.download_manager': logging.INFO,
+    'urllib3': logging.WARNING,
+    'PIL': logging.INFO,
+}
+
+_listener = None
+_ring_buffer = None
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the most recent records in memory for diagnostics"""
+
+    def __init__(self, capacity: int = RING_BUFFER_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def get_lines(self, limit: int = None) -> list:
+        records = list(self.records)
+        if limit:
+            records = records[-limit:]
+        return [self.format(record) for record in records]
+
+
+def get_recent_logs(limit: int = None) -> list:
+    """Formatted recent log lines, newest last (empty before InitLogging)"""
+    if _ring_buffer is None:
+        return []
+    return _ring_buffer.get_lines(limit)
+
+
+def shutdown_logging():
+    """Drain the queue and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _parse_module_levels(spec: str) -> dict:
+    levels = {}
+    for item in spec.split(','):
+        name, _, level = item.partition('=')
+        level = logging.getLevelName(level.strip().upper())
+        if name.strip() and isinstance(level, int):
+            levels[name.strip()] = level
+    return levels
+
 
 class InitLogging:
-    def __init__(self):
+    def __init__(self, log_dir=None, console=None):
         """
-        Sets up the Python logging module, integrating configuration from a ConfigModel.
-        This function configures logging to send messages to the QListWidget,
-        an optional file, and/or the console (with optional color).
+        Sets up the Python logging module.
+
+        Loggers only put records on a queue; a QueueListener thread does the
+        formatting and I/O for the rotating log file, the console and the
+        in-memory ring buffer, so logging never blocks the GUI or download threads.
         """
-        LOG_FILE_NAME = 'app.log'
-        logging_style = True  # If True, use colored console output 
-        
+        global _listener, _ring_buffer
+        logging_style = True  # If True, use colored console output
+
         # Get the root logger instance
         logger = logging.getLogger()
         if isBundle():
@@ -21,14 +91,17 @@ class InitLogging:
         else:
             logger.setLevel(logging.DEBUG)  # Set the base logging level
             LOGGING_MODE = 'both'  # Options: 'file', 'console', 'both'
+        if console is not None:
+            LOGGING_MODE = 'both' if console else 'file'
 
         # Clear any existing handlers to prevent duplicate log messages
+        shutdown_logging()
         if logger.hasHandlers():
             logger.debug("Clearing existing logging handlers")
             logger.handlers.clear()
 
         # --- Define formatters ---
-        # Basic formatter for file output and QListWidget (no color codes)
+        # Basic formatter for file output and the ring buffer (no color codes)
         basic_formatter = logging.Formatter(
             '[%(asctime)s][%(levelname)s]->%(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
@@ -54,17 +127,23 @@ class InitLogging:
                 }
             },
             style='%'
-        )
+        ) if logging_style else basic_formatter
 
+        handlers = []
         handlers_added = []
 
         # --- Conditionally add other handlers based on LOGGING_MODE ---
         if LOGGING_MODE in ['file', 'both']:
             try:
-                file_handler = logging.FileHandler(LOG_FILE_NAME)
+                log_dir = log_dir or get_log_dir()
+                os.makedirs(log_dir, exist_ok=True)
+                log_path = os.path.join(log_dir, LOG_FILE_NAME)
+                file_handler = logging.handlers.RotatingFileHandler(
+                    log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+                )
                 file_handler.setFormatter(basic_formatter) # File logs typically don't need color
-                logger.addHandler(file_handler)
-                handlers_added.append(f"file handler ({LOG_FILE_NAME})")
+                handlers.append(file_handler)
+                handlers_added.append(f"file handler ({log_path})")
             except Exception as e:
                 print(f"Failed to setup file logging: {e}")
 
@@ -72,12 +151,28 @@ class InitLogging:
             try:
                 stream_handler = logging.StreamHandler(sys.stdout)
                 stream_handler.setFormatter(console_formatter)
-                logger.addHandler(stream_handler)
+                handlers.append(stream_handler)
                 handlers_added.append("console handler")
             except Exception as e:
                 print(f"Failed to setup console logging: {e}")
 
+        _ring_buffer = RingBufferHandler()
+        _ring_buffer.setFormatter(basic_formatter)
+        handlers.append(_ring_buffer)
+
+        # Loggers only enqueue; the listener thread formats and writes
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        module_levels = dict(MODULE_LEVELS)
+        module_levels.update(_parse_module_levels(os.environ.get('TAPECIARNIA_LOG_LEVELS', '')))
+        for name, level in module_levels.items():
+            logging.getLogger(name).setLevel(level)
+
         if not handlers_added:
             logging.error("No logging handlers were successfully configured")
         else:
-            logging.info(f"Logging setup completed successfully. Handlers: {', '.join(handlers_added)}")
\ No newline at end of file
+            logging.info(f"Logging setup completed successfully. Handlers: {', '.join(handlers_added)}")
@@ -0,0 +1,51 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Run from code/scripts:  python -m pytest tests
+#
+# The app imports from code/scripts (core, utils, ...); the tools under
+# bin/tools are loaded by path. Everything the app would write goes to a
+# throwaway folder instead of the user's profile.
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+_home = tempfile.mkdtemp(prefix="tapeciarnia-tests-")
+os.environ.setdefault("TAPECIARNIA_HOME", os.path.join(_home, "Tapeciarnia"))
+os.environ.setdefault("XDG_STATE_HOME", os.path.join(_home, "state"))
+
+
+def load_tool(name: str):
+    """Import bin/tools/<name>.py as a module"""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / "bin" / "tools" / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def fake_shuffle_api(monkeypatch):
+    """
+    bin/tools/fake_shuffle_api.py on a free local port, with the app pointed
+    at it. The yielded handler class takes the fault rates (error_rate,
+    wrong_type_rate, ...) as attributes.
+    """
+    tool = load_tool("fake_shuffle_api")
+    handler = type("Handler", (tool.ShuffleHandler,), {"file_size": 1024, "log_message": lambda *args: None})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("TAPECIARNIA_SHUFFLE_API", f"http://127.0.0.1:{server.server_address[1]}/shuffle")
+    try:
+        yield handler
+    finally:
+        server.shutdown()
+        server.server_close()
+
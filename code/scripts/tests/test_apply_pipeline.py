@@ -0,0 +1,162 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from PySide6.QtCore import Qt
+
+from core.apply_pipeline import ApplyPipeline
+
+
+class FakeController:
+    """Records its calls and sleeps like a slow desktop backend"""
+
+    def __init__(self, backend_seconds: float):
+        self.backend_seconds = backend_seconds
+        self.current_is_video = False
+        self.alive = True
+        self.calls = []
+
+    def stop(self):
+        self.calls.append(("stop", None))
+        self.current_is_video = False
+
+    def start_video(self, path: str):
+        time.sleep(self.backend_seconds)
+        self.calls.append(("video", Path(path).name))
+        self.current_is_video = True
+
+    def start_image(self, path: str) -> bool:
+        time.sleep(self.backend_seconds)
+        self.calls.append(("image", Path(path).name))
+        if self.current_is_video:
+            self.stop()
+        self.current_is_video = False
+        return not Path(path).name.startswith("rejected")
+
+    def player_alive(self) -> bool:
+        return self.alive
+
+
+class Recorder:
+    """
+    Collects the pipeline's signals; wait() returns once enough jobs have ended.
+
+    There is no event loop here, so signals sent from the worker would be
+    queued and never arrive; the connections are direct and _record runs on
+    the worker thread.
+    """
+
+    def __init__(self, pipeline: ApplyPipeline):
+        self.events = []
+        self._ended = threading.Condition()
+        for name in ("finished", "failed", "cancelled"):
+            getattr(pipeline, name).connect(lambda job, name=name: self._record(name, job),
+                                            Qt.ConnectionType.DirectConnection)
+
+    def _record(self, name: str, job: dict):
+        with self._ended:
+            self.events.append((name, job))
+            self._ended.notify_all()
+
+    def wait(self, count: int, timeout: float = 10.0) -> bool:
+        with self._ended:
+            return self._ended.wait_for(lambda: len(self.events) >= count, timeout)
+
+    def outcome(self, job_id: int):
+        return next(((name, job) for name, job in self.events if job["id"] == job_id), (None, None))
+
+
+@pytest.fixture
+def files(tmp_path):
+    files = {}
+    for name in ("photo0.jpg", "photo1.jpg", "photo2.jpg", "clip.mp4", "broken.webm", "rejected.png"):
+        files[name] = tmp_path / name
+        files[name].write_bytes(b"\0")
+    return files
+
+
+@pytest.fixture
+def controller():
+    return FakeController(0.05)
+
+
+@pytest.fixture
+def pipeline(controller):
+    pipeline = ApplyPipeline(controller, verify_seconds=0.1)
+    pipeline.start()
+    yield pipeline
+    pipeline.stop()
+
+
+@pytest.fixture
+def recorder(pipeline):
+    return Recorder(pipeline)
+
+
+def test_a_burst_sets_the_desktop_at_most_twice(pipeline, recorder, controller, files):
+    controller.backend_seconds = 0.3
+    ids = [pipeline.submit(str(files[f"photo{index % 3}.jpg"])) for index in range(10)]
+    # Every job ends exactly once
+    assert recorder.wait(10)
+    assert sorted(job["id"] for _, job in recorder.events) == ids
+    # The first one may already be at the desktop when the rest arrive
+    assert [name for name, _ in recorder.events].count("cancelled") >= 8
+    name, job = recorder.outcome(ids[-1])
+    assert name == "finished" and job["path"] == str(files["photo0.jpg"]) and job["kind"] == "image"
+    assert controller.calls[-1] == ("image", "photo0.jpg") and len(controller.calls) <= 2
+
+
+def test_the_player_is_stopped_only_when_leaving_a_video(pipeline, recorder, controller, files):
+    for count, name in enumerate(("clip.mp4", "photo1.jpg"), start=1):
+        pipeline.submit(str(files[name]))
+        assert recorder.wait(count)
+    assert controller.calls == [("video", "clip.mp4"), ("image", "photo1.jpg"), ("stop", None)]
+    assert [job["kind"] for _, job in recorder.events] == ["video", "image"]
+
+
+@pytest.mark.parametrize("name, alive, stage", [
+    ("gone.jpg", True, "resolve"),
+    ("rejected.png", True, "backend"),
+    ("broken.webm", False, "verify"),
+])
+def test_failures_report_their_stage(pipeline, recorder, controller, files, tmp_path, name, alive, stage):
+    controller.alive = alive
+    job_id = pipeline.submit(str(tmp_path / name))
+    assert recorder.wait(1)
+    outcome, job = recorder.outcome(job_id)
+    assert outcome == "failed" and job["stage"] == stage and job["error"]
+
+
+def test_a_stop_replaces_the_waiting_apply(pipeline, recorder, controller, files):
+    controller.backend_seconds = 0.3
+    pipeline.submit(str(files["photo2.jpg"]))
+    time.sleep(0.1)
+    video = pipeline.submit(str(files["clip.mp4"]))
+    pipeline.submit_stop()
+    assert recorder.wait(3)
+    assert recorder.outcome(video)[0] == "cancelled"
+    assert controller.calls == [("image", "photo2.jpg"), ("stop", None)]
+
+
+def test_submit_does_not_wait_for_the_backend(pipeline, controller, files):
+    controller.backend_seconds = 0.5
+    pipeline.submit(str(files["photo0.jpg"]))
+    started = time.perf_counter()
+    pipeline.submit(str(files["photo1.jpg"]))
+    assert time.perf_counter() - started < 0.1
+    assert pipeline.busy()
+
+
+def test_jobs_submitted_before_start_wait_for_the_worker(controller, files):
+    pipeline = ApplyPipeline(controller, verify_seconds=0.1)
+    recorder = Recorder(pipeline)
+    try:
+        job_id = pipeline.submit(str(files["photo1.jpg"]))
+        time.sleep(0.1)
+        assert controller.calls == [] and pipeline.busy()
+        pipeline.start()
+        assert recorder.wait(1)
+        assert recorder.outcome(job_id)[0] == "finished"
+    finally:
+        pipeline.stop()
@@ -0,0 +1,161 @@
+import threading
+
+import pytest
+
+from core.autopause_controller import ALL_DESKTOPS, AutoPauseController, occluded_monitors
+
+LEFT = (0, 0, 1920, 1080)
+RIGHT = (1920, 0, 2560, 1440)
+PLAYER_PID = 4242
+
+
+def window(rect, fullscreen=False, maximized=False, hidden=False, desktop=0, pid=100):
+    return {"rect": rect, "fullscreen": fullscreen, "maximized": maximized, "hidden": hidden,
+            "desktop": desktop, "pid": pid}
+
+
+class FakeProvider:
+    """Serves a settable snapshot of a two-monitor desktop; wait() wakes up on set() like an X event would"""
+
+    def __init__(self):
+        self.windows = []
+        self.desktop = 0
+        self.monitors = [LEFT, RIGHT]
+        self._changed = threading.Event()
+
+    def set(self, windows=None, desktop=None):
+        if windows is not None:
+            self.windows = windows
+        if desktop is not None:
+            self.desktop = desktop
+        self._changed.set()
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def wait(self, timeout: float) -> bool:
+        changed = self._changed.wait(timeout)
+        self._changed.clear()
+        return changed
+
+    def snapshot(self) -> dict:
+        return {"monitors": list(self.monitors), "desktop": self.desktop, "windows": list(self.windows)}
+
+
+class FakePlayer:
+    def __init__(self):
+        self.calls = []
+        self.reachable = True
+        self.changed = threading.Event()
+
+    def set_paused(self, paused: bool) -> bool:
+        if not self.reachable:
+            return False
+        self.calls.append(paused)
+        self.changed.set()
+        return True
+
+
+BROWSER = window((0, 32, 1920, 1048), maximized=True)
+SPANNING_GAME = window((0, 0, 4480, 1440), fullscreen=True)
+
+
+@pytest.mark.parametrize("windows, covered", [
+    pytest.param([], [False, False], id="empty desktop"),
+    pytest.param([window((100, 100, 800, 600))], [False, False], id="small window"),
+    pytest.param([BROWSER], [True, False], id="maximised on the left"),
+    pytest.param([BROWSER, window(RIGHT, fullscreen=True)], [True, True], id="plus fullscreen on the right"),
+    pytest.param([dict(BROWSER, hidden=True), window(RIGHT, fullscreen=True)], [False, True], id="minimised"),
+    pytest.param([SPANNING_GAME], [True, True], id="spanning both monitors"),
+    pytest.param([window((0, 0, 1920, 1080)), window((1900, 0, 2580, 1440))], [True, True],
+                 id="big unmaximised windows"),
+    pytest.param([window(LEFT, fullscreen=True, desktop=1), window(RIGHT, fullscreen=True, desktop=1)],
+                 [False, False], id="other desktop"),
+    pytest.param([window(LEFT, maximized=True, desktop=ALL_DESKTOPS),
+                  window(RIGHT, maximized=True, desktop=ALL_DESKTOPS)], [True, True], id="sticky windows"),
+    pytest.param([window((0, 0, 4480, 1440), fullscreen=True, pid=PLAYER_PID)], [False, False],
+                 id="wallpaper player's own window"),
+])
+def test_occluded_monitors(windows, covered):
+    snapshot = {"monitors": [LEFT, RIGHT], "desktop": 0, "windows": windows}
+    assert occluded_monitors(snapshot, ignore_pids={PLAYER_PID}) == covered
+
+
+@pytest.fixture
+def provider():
+    return FakeProvider()
+
+
+@pytest.fixture
+def player():
+    return FakePlayer()
+
+
+@pytest.fixture
+def controller(provider, player):
+    controller = AutoPauseController(provider, player.set_paused, ignore_pids=lambda: {PLAYER_PID})
+    controller.set_active(True)
+    yield controller
+    controller.stop()
+
+
+def test_pauses_once_covered_and_resumes_once_visible(controller, provider, player):
+    provider.set([BROWSER])
+    assert not controller.evaluate()
+    provider.set([BROWSER, window(RIGHT, fullscreen=True)])
+    assert controller.evaluate()
+    # Nothing changes while it stays covered
+    assert controller.evaluate()
+    provider.set([BROWSER])
+    assert not controller.evaluate()
+    assert player.calls == [True, False]
+
+
+def test_leaves_the_player_alone_while_no_video_plays(controller, provider, player):
+    controller.set_active(False)
+    provider.set([SPANNING_GAME])
+    controller.evaluate()
+    provider.set([])
+    controller.evaluate()
+    assert player.calls == []
+
+
+def test_stopping_the_video_forgets_its_pause(controller, provider, player):
+    provider.set([SPANNING_GAME])
+    controller.evaluate()
+    controller.set_active(False)
+    provider.set([])
+    controller.evaluate()
+    assert player.calls == [True]
+
+
+def test_a_new_video_under_covering_windows_is_paused(controller, provider, player):
+    provider.set([SPANNING_GAME])
+    controller.evaluate()
+    controller.set_active(True)
+    controller.evaluate()
+    assert player.calls == [True, True]
+
+
+def test_worker_reacts_to_window_changes(controller, provider, player):
+    controller.poll_interval = 60.0
+    controller.start()
+    for windows, paused in (([SPANNING_GAME], True), ([], False), ([SPANNING_GAME], True)):
+        player.changed.clear()
+        provider.set(windows)
+        assert player.changed.wait(2.0)
+        assert player.calls[-1] is paused
+
+
+def test_worker_retries_while_the_player_is_unreachable(controller, provider, player):
+    controller.poll_interval = 60.0
+    player.reachable = False
+    controller.start()
+    provider.set([SPANNING_GAME])
+    assert not player.changed.wait(0.1)
+    player.reachable = True
+    assert player.changed.wait(2.0)
+    assert player.calls == [True]
@@ -0,0 +1,88 @@
+import json
+import os
+import random
+import threading
+import time
+
+import pytest
+
+import models.config as config_module
+from models.config import Config
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    monkeypatch.setattr(config_module, "CONFIG_PATH", path)
+    return path
+
+
+def edit_externally(path, data: dict):
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def test_external_edit_replaces_the_store(config_path):
+    edit_externally(config_path, {"language": "pl", "interval": 15, "range_preference": "all"})
+    config = Config(debounce_seconds=0.01)
+    changes = []
+    config.changed.connect(lambda key, value: changes.append((key, value)))
+
+    # Another process drops a key and changes one
+    edit_externally(config_path, {"language": "en", "interval": 15})
+    config._reload_from_disk()
+
+    assert config.data == {"language": "en", "interval": 15}
+    assert sorted(changes) == [("language", "en"), ("range_preference", None)]
+
+    # ...and the dropped key is not written back
+    config.set("interval", 30)
+    config.flush()
+    assert json.loads(config_path.read_text(encoding="utf-8")) == {"language": "en", "interval": 30}
+
+
+def test_unsaved_local_changes_survive_a_reload(config_path):
+    edit_externally(config_path, {"language": "pl", "interval": 15})
+    config = Config(debounce_seconds=60)
+    config.set("interval", 45)
+    config.set("last_video", "/tmp/a.mp4")
+
+    edit_externally(config_path, {"language": "en"})
+    config._reload_from_disk()
+
+    assert config.data == {"language": "en", "interval": 45, "last_video": "/tmp/a.mp4"}
+    config.flush()
+    assert json.loads(config_path.read_text(encoding="utf-8")) == config.data
+
+
+def test_own_writes_are_not_reloaded(config_path):
+    config = Config(debounce_seconds=0.01)
+    changes = []
+    config.changed.connect(lambda key, value: changes.append(key))
+    config.set("interval", 5)
+    config.flush()
+    changes.clear()
+    config._reload_from_disk()
+    assert changes == []
+
+
+def test_concurrent_saves_keep_the_last_change(config_path, monkeypatch, caplog):
+    config = Config(debounce_seconds=60)
+    # A slow disk widens the window between snapshot and rename
+    real_fsync = os.fsync
+    monkeypatch.setattr(config_module.os, "fsync", lambda fd: (time.sleep(random.random() / 500), real_fsync(fd)))
+
+    def save_repeatedly(prefix: str):
+        for index in range(30):
+            config.set(f"{prefix}_last", index)
+            config.save()
+
+    # The writer thread and flush() from the GUI or atexit
+    threads = [threading.Thread(target=save_repeatedly, args=(prefix,)) for prefix in ("writer", "flush")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert "Failed to save configuration" not in caplog.text
+    assert not config_path.with_name("config.json.tmp").exists()
+    assert json.loads(config_path.read_text(encoding="utf-8")) == {"writer_last": 29, "flush_last": 29}
@@ -0,0 +1,122 @@
+import os
+import threading
+
+import pytest
+
+from utils.desktop_backends import DesktopBackends
+
+# The fakes are shell scripts named like the real tools that log their
+# arguments (and stdin) to $CALL_LOG
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="fake backend tools are shell scripts")
+
+FAKE_TOOL = """#!/bin/sh
+if [ -t 0 ]; then input=""; else input=$(cat | tr '\\n' '|'); fi
+echo "$(basename "$0") $*${input:+ <<< $input}" >> "$CALL_LOG"
+case "$(basename "$0") $1" in
+  "gsettings list-keys") echo "picture-options picture-uri picture-uri-dark primary-color" ;;
+  "gsettings get") echo "'file:///home/me/Pictures/old%20one.jpg'" ;;
+  "xfconf-query -c")
+    case "$*" in
+      *" -l"*) echo "/backdrop/screen0/monitor0/workspace0/last-image"
+               echo "/backdrop/screen0/monitorHDMI-1/workspace0/last-image"
+               echo "/backdrop/single-workspace-mode" ;;
+      *" -s "*) ;;
+      *) echo "/usr/share/backgrounds/xfce/default.png" ;;
+    esac ;;
+esac
+"""
+
+SESSION_KEYS = ("XDG_CURRENT_DESKTOP", "XDG_SESSION_DESKTOP", "DESKTOP_SESSION", "WAYLAND_DISPLAY", "DISPLAY",
+                "SWAYSOCK")
+
+
+class FakeDesktop:
+    """A PATH holding only the fake tools (plus the basics they need) and a settable session"""
+
+    def __init__(self, folder, monkeypatch):
+        self.tools_dir = folder / "bin"
+        self.tools_dir.mkdir()
+        self.log = folder / "calls.log"
+        self.image = folder / "wall paper.jpg"
+        self.image.write_bytes(b"\xff\xd8\xff\xd9")
+        self.monkeypatch = monkeypatch
+        monkeypatch.setenv("CALL_LOG", str(self.log))
+        monkeypatch.setenv("PATH", os.pathsep.join((str(self.tools_dir), "/usr/bin", "/bin")))
+
+    def install(self, *tools):
+        for name in tools:
+            script = self.tools_dir / name
+            script.write_text(FAKE_TOOL)
+            script.chmod(0o755)
+
+    def session(self, **variables):
+        for key in SESSION_KEYS:
+            self.monkeypatch.delenv(key, raising=False)
+        for key, value in variables.items():
+            self.monkeypatch.setenv(key, value)
+
+    def take_calls(self) -> list:
+        """The commands run since the last call"""
+        calls = self.log.read_text().splitlines() if self.log.exists() else []
+        self.log.unlink(missing_ok=True)
+        return calls
+
+
+@pytest.fixture
+def desktop(tmp_path, monkeypatch):
+    return FakeDesktop(tmp_path, monkeypatch)
+
+
+@pytest.mark.parametrize("tools, session, expected, expected_calls", [
+    pytest.param(("gsettings", "dconf", "feh", "mpv"), {"XDG_CURRENT_DESKTOP": "ubuntu:GNOME", "DISPLAY": ":0"},
+                 "gnome", ["dconf load"], id="GNOME 42+"),
+    pytest.param(("gsettings",), {"XDG_CURRENT_DESKTOP": "GNOME", "WAYLAND_DISPLAY": "wayland-0"},
+                 "gnome", ["gsettings set", "gsettings set"], id="GNOME without dconf"),
+    pytest.param(("plasma-apply-wallpaperimage", "gsettings", "feh"), {"XDG_CURRENT_DESKTOP": "KDE", "DISPLAY": ":0"},
+                 "kde", ["plasma-apply-wallpaperimage"], id="KDE Plasma"),
+    pytest.param(("xfconf-query", "gsettings", "feh"), {"XDG_CURRENT_DESKTOP": "XFCE", "DISPLAY": ":0"},
+                 "xfce", ["xfconf-query -c", "xfconf-query -c"], id="XFCE, two monitors"),
+    pytest.param(("swaymsg", "swaybg", "gsettings"), {"XDG_CURRENT_DESKTOP": "sway", "WAYLAND_DISPLAY": "wayland-1",
+                                                       "SWAYSOCK": "/run/user/1000/sway.sock"},
+                 "sway", ["swaymsg output"], id="sway"),
+    pytest.param(("feh", "xwallpaper", "xwinwrap", "mpv"), {"XDG_CURRENT_DESKTOP": "i3", "DISPLAY": ":0"},
+                 "feh", ["feh --bg-fill"], id="i3 with feh"),
+    pytest.param(("xwallpaper",), {"DISPLAY": ":0"}, "xwallpaper", ["xwallpaper --zoom"], id="bare X11"),
+    pytest.param((), {"DISPLAY": ":0"}, None, [], id="nothing installed"),
+])
+def test_backend_selection_and_calls(desktop, tools, session, expected, expected_calls):
+    desktop.install(*tools)
+    desktop.session(**session)
+    registry = DesktopBackends()
+
+    # Four threads asking at once share one probe
+    threads = [threading.Thread(target=registry.probe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(desktop.take_calls()) <= 2
+    backend = registry.active()
+    assert (backend.name if backend else None) == expected
+
+    # Every apply runs exactly its backend's commands, without probing again
+    for _ in range(2):
+        applied = registry.set_wallpaper(desktop.image)
+        calls = desktop.take_calls()
+        assert len(calls) == len(expected_calls)
+        assert all(call.startswith(prefix) for call, prefix in zip(calls, expected_calls)), calls
+        assert applied == bool(expected)
+
+
+def test_session_change_or_removed_tool_probes_again(desktop):
+    desktop.install("gsettings", "plasma-apply-wallpaperimage")
+    desktop.session(XDG_CURRENT_DESKTOP="GNOME", DISPLAY=":0")
+    registry = DesktopBackends()
+    assert registry.active().name == "gnome"
+
+    desktop.monkeypatch.setenv("XDG_CURRENT_DESKTOP", "KDE")
+    assert registry.active().name == "kde"
+
+    (desktop.tools_dir / "plasma-apply-wallpaperimage").unlink()
+    registry.set_wallpaper(desktop.image)
+    assert registry.active().name == "gnome"
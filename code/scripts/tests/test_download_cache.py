@@ -0,0 +1,55 @@
+import pytest
+
+from utils.download_cache import DownloadCache
+from utils.file_utils import commit_staged_file
+from utils.path_utils import CACHE_DIR, IMAGES_DIR, STAGING_DIR, VIDEOS_DIR
+
+URL = "https://example.com/wallpaper.jpg"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DownloadCache(tmp_path / "downloads.sqlite")
+
+
+def make_file(folder, name: str, body: bytes = b"body"):
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / name
+    path.write_bytes(body)
+    return path
+
+
+def test_new_body_deletes_the_superseded_staged_download(cache):
+    old = make_file(STAGING_DIR, "old.jpg")
+    cache.store(URL, str(old))
+    new = make_file(STAGING_DIR, "new.jpg", b"newer body")
+    cache.store(URL, str(new))
+    assert not old.exists()
+    assert cache.lookup(URL)["path"] == str(new)
+
+
+def test_new_body_keeps_a_file_that_is_in_the_collection(cache):
+    kept = make_file(IMAGES_DIR, "applied.jpg")
+    cache.store(URL, str(kept))
+    cache.store(URL, str(make_file(STAGING_DIR, "again.jpg", b"newer body")))
+    assert kept.exists()
+
+
+def test_a_file_another_url_points_at_is_kept(cache):
+    shared = make_file(CACHE_DIR, "shared.jpg")
+    cache.store(URL, str(shared))
+    cache.store(URL + "?mirror", str(shared))
+    cache.store(URL, str(make_file(STAGING_DIR, "other.jpg")))
+    assert shared.exists()
+
+
+def test_commit_reuses_a_cached_file_already_in_the_collection():
+    existing = make_file(VIDEOS_DIR, "clip.mp4")
+    assert commit_staged_file(existing, IMAGES_DIR) == existing
+    assert list(IMAGES_DIR.glob("clip*")) == []
+
+
+def test_commit_moves_a_staged_download():
+    staged = make_file(STAGING_DIR, "fresh.jpg")
+    committed = commit_staged_file(staged, IMAGES_DIR)
+    assert committed.parent == IMAGES_DIR and committed.exists() and not staged.exists()
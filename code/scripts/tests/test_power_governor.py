@@ -0,0 +1,173 @@
+import pytest
+
+from core.power_governor import FULL, PAUSED, REDUCED, PowerGovernor, SysfsPowerSupply
+
+
+class FakeSysfs:
+    """A power_supply tree with one AC adapter, one laptop battery and a mouse battery"""
+
+    def __init__(self, root):
+        self.root = root
+        self._write("AC", type="Mains", online="1")
+        self._write("BAT0", type="Battery", scope="System", present="1", status="Charging", capacity="80")
+        self._write("hidpp_battery_0", type="Battery", scope="Device", present="1", status="Discharging",
+                    capacity="5")
+
+    def _write(self, supply: str, **attributes):
+        folder = self.root / supply
+        folder.mkdir(parents=True, exist_ok=True)
+        for name, value in attributes.items():
+            (folder / name).write_text(f"{value}\n")
+
+    def set(self, ac: bool = None, capacity: int = None):
+        if ac is not None:
+            self._write("AC", online="1" if ac else "0")
+            self._write("BAT0", status="Charging" if ac else "Discharging")
+        if capacity is not None:
+            self._write("BAT0", capacity=str(capacity))
+
+
+class FakeSession:
+    def __init__(self):
+        self.idle_seconds = 0.0
+        self.locked = False
+
+    def read(self) -> tuple:
+        return self.idle_seconds, self.locked
+
+
+class FakePlayer:
+    def __init__(self):
+        self.applied = []
+        self.reachable = True
+
+    def apply_profile(self, profile: str) -> bool:
+        if self.reachable:
+            self.applied.append(profile)
+        return self.reachable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Rig:
+    """A governor reading a fake sysfs tree and session, driving a fake player"""
+
+    def __init__(self, sysfs: FakeSysfs):
+        self.sysfs = sysfs
+        self.session = FakeSession()
+        self.player = FakePlayer()
+        self.clock = FakeClock()
+        self.fallbacks = []
+        self.governor = PowerGovernor(self.player, power=SysfsPowerSupply(sysfs.root), session=self.session,
+                                      fallback=self._fallback, clock=self.clock)
+        self.governor.set_active(True)
+
+    def _fallback(self, engage: bool) -> bool:
+        self.fallbacks.append(engage)
+        return True
+
+    def advance(self, seconds: float, ac: bool = None, capacity: int = None, idle: float = None,
+                locked: bool = None) -> str:
+        """Move the clock, change the inputs and tick once; returns the profile"""
+        self.clock.now += seconds
+        self.sysfs.set(ac=ac, capacity=capacity)
+        if idle is not None:
+            self.session.idle_seconds = idle
+        if locked is not None:
+            self.session.locked = locked
+        return self.governor.tick()
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    return FakeSysfs(tmp_path)
+
+
+@pytest.fixture
+def rig(sysfs):
+    return Rig(sysfs)
+
+
+def test_sysfs_ignores_device_batteries(sysfs):
+    power = SysfsPowerSupply(sysfs.root)
+    assert power.read() == (False, 80)
+    sysfs.set(ac=False, capacity=40)
+    assert power.read() == (True, 40)
+
+
+def test_sysfs_without_a_battery_counts_as_ac(tmp_path):
+    assert SysfsPowerSupply(tmp_path / "missing").read() == (False, None)
+    (tmp_path / "AC").mkdir()
+    (tmp_path / "AC" / "type").write_text("Mains\n")
+    (tmp_path / "AC" / "online").write_text("0\n")
+    assert SysfsPowerSupply(tmp_path).read() == (False, None)
+
+
+def test_unplugging_waits_for_the_dwell_time_and_does_not_flap(rig):
+    assert rig.advance(0) == FULL
+    assert rig.advance(5, ac=False) == FULL
+    assert rig.advance(5) == FULL
+    assert rig.advance(6) == REDUCED
+    # The charger back for a moment, then gone again
+    assert rig.advance(2, ac=True) == REDUCED
+    assert rig.advance(3, ac=False) == REDUCED
+    assert rig.player.applied == [REDUCED]
+
+
+def test_low_battery_pauses_with_hysteresis(rig):
+    rig.advance(0, ac=False)
+    rig.advance(11)
+    assert rig.advance(20, capacity=20) == REDUCED
+    assert rig.advance(11) == PAUSED
+    # Inside the band: stays paused
+    assert rig.advance(20, capacity=22) == PAUSED
+    assert rig.advance(20, capacity=26) == PAUSED
+    assert rig.advance(11) == REDUCED
+
+
+def test_locking_and_unlocking_act_at_once(rig):
+    assert rig.advance(5, locked=True) == PAUSED
+    assert rig.advance(60, locked=False) == FULL
+
+
+def test_idle_reduces_then_pauses(rig):
+    assert rig.advance(30, idle=130) == FULL
+    assert rig.advance(11, idle=141) == REDUCED
+    assert rig.advance(30, idle=610) == REDUCED
+    assert rig.advance(11, idle=621) == PAUSED
+    # Back at the keyboard
+    assert rig.advance(5, idle=0) == PAUSED
+    assert rig.advance(11) == FULL
+    assert rig.player.applied == [REDUCED, PAUSED, FULL]
+
+
+def test_time_in_state_counts_the_current_profile(rig):
+    rig.advance(5, locked=True)
+    rig.advance(20)
+    assert rig.governor.time_in_state() == {FULL: 5.0, REDUCED: 0.0, PAUSED: 20.0}
+
+
+def test_cap_applies_at_once_and_lifts(rig):
+    rig.governor.set_cap(REDUCED, "thermal")
+    assert rig.advance(1) == REDUCED
+    assert rig.governor.reason == "thermal"
+    rig.governor.set_cap(FULL)
+    assert rig.advance(1) == FULL
+
+
+def test_player_without_ipc_falls_back_to_a_poster_while_paused(rig):
+    rig.player.reachable = False
+    rig.advance(1, locked=True)
+    # mpv may still be starting: the first failed poll does not give up
+    assert rig.fallbacks == []
+    rig.governor.tick()
+    assert rig.fallbacks == [True]
+    rig.advance(1, locked=False)
+    rig.governor.tick()
+    assert rig.fallbacks == [True, False]
@@ -0,0 +1,87 @@
+import os
+import time
+
+import pytest
+
+import core.prefetch_pool as prefetch_module
+from core.prefetch_pool import PrefetchPool
+from core.shuffle_client import ShuffleClient
+from utils.path_utils import STAGING_DIR
+
+FILE_SIZE = 1024
+
+
+@pytest.fixture
+def prefetch_dir(tmp_path, monkeypatch):
+    folder = tmp_path / ".prefetch"
+    monkeypatch.setattr(prefetch_module, "PREFETCH_DIR", folder)
+    return folder
+
+
+def make_pool(**options) -> PrefetchPool:
+    client = ShuffleClient(1920, 1080, base_delay=0.0, max_delay=0.0)
+    return PrefetchPool(1920, 1080, fetch_url=client.fetch, **options)
+
+
+def suffixes(pool: PrefetchPool, kind: str) -> list:
+    return [entry.suffix for entry in pool._entries(kind)]
+
+
+def test_refill_tops_up_every_kind(fake_shuffle_api, prefetch_dir):
+    pool = make_pool(target_per_kind=2)
+    pool._refill()
+    assert suffixes(pool, "static") == [".jpg", ".jpg"]
+    assert suffixes(pool, "animated") == [".mp4", ".mp4"]
+    # Nothing more to do once full
+    pool._refill()
+    assert pool.available("static") == pool.available("animated") == 2
+
+
+def test_refill_stops_at_the_disk_budget(fake_shuffle_api, prefetch_dir):
+    fake_shuffle_api.file_size = FILE_SIZE
+    pool = make_pool(target_per_kind=3, disk_budget_bytes=4 * FILE_SIZE)
+    pool._refill()
+    assert pool.available("static") == 3
+    assert pool.available("animated") == 1
+    assert pool._disk_usage() == 4 * FILE_SIZE
+
+
+def test_take_hands_over_the_oldest_entry_as_a_staged_file(fake_shuffle_api, prefetch_dir):
+    pool = make_pool(target_per_kind=2)
+    pool._refill()
+    oldest = pool._entries("static")[0]
+    os.utime(oldest, (time.time() - 60, time.time() - 60))
+
+    staged = pool.take("static")
+    assert staged.parent == STAGING_DIR and staged.name == oldest.name and staged.exists()
+    assert not oldest.exists()
+    assert pool.available("static") == 1
+
+    pool.take("static")
+    assert pool.take("static") is None
+
+
+def test_stale_entries_partial_files_and_other_sizes_are_evicted(prefetch_dir):
+    pool = make_pool(max_age_seconds=3600)
+    current = prefetch_dir / "static_1920x1080"
+    other_size = prefetch_dir / "static_1280x720"
+    for folder in (current, other_size):
+        folder.mkdir(parents=True)
+    fresh = current / "fresh.jpg"
+    expired = current / "expired.jpg"
+    partial = current / "half.jpg.part"
+    for f in (fresh, expired, partial, other_size / "small.jpg"):
+        f.write_bytes(b"\0" * 16)
+    os.utime(expired, (time.time() - 7200, time.time() - 7200))
+
+    pool._evict_stale()
+    assert [f.name for f in current.iterdir()] == ["fresh.jpg"]
+    assert not other_size.exists()
+
+
+def test_failed_downloads_leave_no_entries(fake_shuffle_api, prefetch_dir):
+    fake_shuffle_api.error_rate = 1.0
+    pool = make_pool(target_per_kind=2)
+    pool._refill()
+    assert pool.available("static") == pool.available("animated") == 0
+    assert not list(prefetch_dir.rglob("*.part"))
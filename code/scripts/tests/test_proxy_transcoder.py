@@ -0,0 +1,165 @@
+import json
+import os
+import time
+
+import pytest
+
+from core.proxy_transcoder import QUEUE_FILE_NAME, ProxyTranscoder
+
+# The stand-ins for ffmpeg and ffprobe are shell scripts
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="stub ffmpeg/ffprobe are shell scripts")
+
+# Answers with <video>.probe.json next to the video, after $PROBE_SLEEP seconds
+FAKE_FFPROBE = """#!/bin/sh
+sleep "${PROBE_SLEEP:-0}"
+for last; do :; done
+cat "$last.probe.json" 2>/dev/null || echo '{}'
+"""
+
+# Copies the input to the output after $FFMPEG_SLEEP seconds; fails for "broken" inputs
+FAKE_FFMPEG = """#!/bin/sh
+echo "$*" >> "$FFMPEG_LOG"
+while [ "$#" -gt 1 ]; do
+  [ "$1" = "-i" ] && input="$2"
+  shift
+done
+sleep "${FFMPEG_SLEEP:-0}"
+case "$input" in *broken*) echo "Invalid data found" >&2; exit 1 ;; esac
+cp "$input" "$1"
+"""
+
+UHD_AV1 = {"codec_name": "av1", "width": 3840, "height": 2160, "avg_frame_rate": "60/1"}
+SCREEN_H264 = {"codec_name": "h264", "width": 1920, "height": 1080, "avg_frame_rate": "30000/1001"}
+
+
+def install(path, script: str):
+    path.write_text(script)
+    path.chmod(0o755)
+    return path
+
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    folder = tmp_path / "tools"
+    folder.mkdir()
+    monkeypatch.setenv("FFMPEG_LOG", str(tmp_path / "ffmpeg.log"))
+    return install(folder / "ffmpeg", FAKE_FFMPEG), install(folder / "ffprobe", FAKE_FFPROBE)
+
+
+@pytest.fixture
+def videos(tmp_path):
+    folder = tmp_path / "videos"
+    folder.mkdir()
+    return folder
+
+
+def make_video(folder, name: str, stream: dict = UHD_AV1):
+    video = folder / name
+    video.write_bytes(os.urandom(64))
+    (folder / f"{name}.probe.json").write_text(json.dumps({"streams": [stream]}))
+    return video
+
+
+def make_transcoder(tmp_path, tools) -> ProxyTranscoder:
+    ffmpeg, ffprobe = tools
+    return ProxyTranscoder(1920, 1080, directory=tmp_path / "proxies", ffmpeg=ffmpeg, ffprobe=ffprobe)
+
+
+def wait_idle(transcoder: ProxyTranscoder, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while transcoder.pending_count() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert transcoder.pending_count() == 0
+
+
+def ffmpeg_runs(tmp_path) -> int:
+    log = tmp_path / "ffmpeg.log"
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+@pytest.mark.parametrize("info, needed", [
+    pytest.param({}, True, id="unknown"),
+    pytest.param({"codec": "h264", "width": 1920, "height": 1080, "fps": 29.97}, False, id="screen-sized h264"),
+    pytest.param({"codec": "vp8", "width": 2000, "height": 1100, "fps": 30}, False, id="within 10%"),
+    pytest.param({"codec": "h264", "width": 3840, "height": 2160, "fps": 30}, True, id="too big"),
+    pytest.param({"codec": "h264", "width": 1920, "height": 1080, "fps": 60}, True, id="too fast"),
+    pytest.param({"codec": "av1", "width": 1280, "height": 720, "fps": 24}, True, id="heavy codec"),
+])
+def test_needs_proxy(tmp_path, tools, info, needed):
+    assert make_transcoder(tmp_path, tools)._needs_proxy(info) is needed
+
+
+def test_queued_video_gets_a_proxy(tmp_path, tools, videos):
+    video = make_video(videos, "uhd.mkv")
+    transcoder = make_transcoder(tmp_path, tools)
+    transcoder.start()
+    try:
+        assert transcoder.enqueue(video)
+        wait_idle(transcoder)
+        proxy = transcoder.proxy_for(video)
+        assert proxy and proxy.endswith(".mp4") and open(proxy, "rb").read() == video.read_bytes()
+        # Done once: neither queued nor transcoded again
+        assert not transcoder.enqueue(video)
+        assert ffmpeg_runs(tmp_path) == 1
+        assert not list((tmp_path / "proxies").glob("*.part"))
+    finally:
+        transcoder.stop()
+
+
+def test_light_and_broken_videos_get_skip_markers(tmp_path, tools, videos):
+    make_video(videos, "light.mp4", SCREEN_H264)
+    make_video(videos, "broken.webm")
+    make_video(videos, "notes.txt")
+    transcoder = make_transcoder(tmp_path, tools)
+    transcoder.start()
+    try:
+        assert transcoder.enqueue_folder(videos) == 2
+        wait_idle(transcoder)
+        for name in ("light.mp4", "broken.webm"):
+            assert transcoder.proxy_for(videos / name) is None
+            assert not transcoder.enqueue(videos / name)
+        assert len(list((tmp_path / "proxies").glob("*.skip"))) == 2
+        # Only the broken one reached ffmpeg
+        assert ffmpeg_runs(tmp_path) == 1
+    finally:
+        transcoder.stop()
+
+
+def test_interrupted_work_resumes_on_the_next_start(tmp_path, tools, videos, monkeypatch):
+    first, second = make_video(videos, "a.mkv"), make_video(videos, "b.mkv")
+    monkeypatch.setenv("FFMPEG_SLEEP", "2")
+    transcoder = make_transcoder(tmp_path, tools)
+    transcoder.start()
+    transcoder.enqueue(first)
+    transcoder.enqueue(second)
+    while not ffmpeg_runs(tmp_path):
+        time.sleep(0.02)
+    transcoder.stop()
+
+    saved = json.loads((tmp_path / "proxies" / QUEUE_FILE_NAME).read_text())["pending"]
+    assert saved == [str(first.resolve()), str(second.resolve())]
+    assert transcoder.proxy_for(first) is None
+
+    monkeypatch.setenv("FFMPEG_SLEEP", "0")
+    resumed = make_transcoder(tmp_path, tools)
+    resumed.start()
+    try:
+        wait_idle(resumed)
+        assert resumed.proxy_for(first) and resumed.proxy_for(second)
+    finally:
+        resumed.stop()
+
+
+def test_stop_while_probing_does_not_start_ffmpeg(tmp_path, tools, videos, monkeypatch):
+    video = make_video(videos, "uhd.mkv")
+    monkeypatch.setenv("PROBE_SLEEP", "0.5")
+    transcoder = make_transcoder(tmp_path, tools)
+    transcoder.start()
+    transcoder.enqueue(video)
+    time.sleep(0.1)
+    transcoder.stop()
+
+    time.sleep(0.6)
+    assert ffmpeg_runs(tmp_path) == 0
+    saved = json.loads((tmp_path / "proxies" / QUEUE_FILE_NAME).read_text())["pending"]
+    assert saved == [str(video.resolve())]
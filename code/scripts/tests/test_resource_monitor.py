@@ -0,0 +1,157 @@
+import pytest
+
+from core.power_governor import FULL, REDUCED
+from core.resource_monitor import CLOCK_TICKS, ResourceMonitor
+
+ROOT_PID = 1000
+PLAYER_PID = 1001
+WORKER_PID = 1002
+INTERVAL = 5
+
+
+class FakeProc:
+    """A /proc tree with the app and its children; CPU ticks advance as told"""
+
+    def __init__(self, root, children_files: bool = True):
+        self.root = root
+        self.children_files = children_files
+        self.ticks = {}
+        self.names = {}
+        self.parents = {}
+        self.add(ROOT_PID, "python3", 1)
+
+    def add(self, pid: int, name: str, ppid: int):
+        self.ticks[pid] = 0
+        self.names[pid] = name
+        self.parents[pid] = ppid
+        folder = self.root / str(pid)
+        (folder / "task" / str(pid)).mkdir(parents=True, exist_ok=True)
+        (folder / "status").write_text(f"Name:\t{name}\nVmRSS:\t   81920 kB\n")
+        (folder / "io").write_text("rchar: 0\nwchar: 0\nread_bytes: 0\nwrite_bytes: 0\n")
+        self._stat(pid)
+        if self.children_files:
+            for parent in self.names:
+                children = [child for child, ppid in self.parents.items() if ppid == parent]
+                (self.root / str(parent) / "task" / str(parent) / "children").write_text(" ".join(map(str, children)))
+
+    def _stat(self, pid: int):
+        fields = ["S", str(self.parents[pid])] + ["0"] * 9 + [str(self.ticks[pid]), "0"] + ["0"] * 6
+        (self.root / str(pid) / "stat").write_text(f"{pid} ({self.names[pid]}) {' '.join(fields)}\n")
+
+    def run(self, pid: int, cpu_percent: float, seconds: float = INTERVAL):
+        self.ticks[pid] += round(cpu_percent / 100 * seconds * CLOCK_TICKS)
+        self._stat(pid)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def proc(tmp_path):
+    proc = FakeProc(tmp_path)
+    proc.add(PLAYER_PID, "mpv", ROOT_PID)
+    return proc
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def caps():
+    return []
+
+
+@pytest.fixture
+def monitor(proc, clock, caps):
+    monitor = ResourceMonitor(root_pid=ROOT_PID, budget_percent=50, throttle=lambda cap, reason: caps.append(cap),
+                              log_every=0, proc_root=str(proc.root), clock=clock)
+    monitor.tick()
+    return monitor
+
+
+def sample(monitor, proc, clock, player_cpu: float) -> dict:
+    clock.now += INTERVAL
+    proc.run(PLAYER_PID, player_cpu)
+    return monitor.tick()
+
+
+def run(monitor, proc, clock, player_cpu: float, samples: int) -> list:
+    return [sample(monitor, proc, clock, player_cpu)["cap"] for _ in range(samples)]
+
+
+def test_player_cpu_is_measured_per_group(monitor, proc, clock):
+    summary = sample(monitor, proc, clock, 30)
+    assert summary["groups"]["player"]["cpu_percent"] == pytest.approx(30, abs=1)
+    assert summary["groups"]["player"]["rss_mb"] == 80.0
+    assert {entry["pid"]: entry["group"] for entry in summary["processes"]}[PLAYER_PID] == "player"
+    assert summary["cap"] == FULL
+
+
+def test_children_are_found_without_children_files(tmp_path, clock):
+    proc = FakeProc(tmp_path, children_files=False)
+    proc.add(PLAYER_PID, "mpv", ROOT_PID)
+    monitor = ResourceMonitor(root_pid=ROOT_PID, log_every=0, proc_root=str(tmp_path), clock=clock)
+    monitor.tick()
+    assert "player" in sample(monitor, proc, clock, 10)["groups"]
+
+
+def test_budget_is_enforced_after_three_samples_over_it(monitor, proc, clock, caps):
+    assert run(monitor, proc, clock, 80, 3) == [FULL, FULL, REDUCED]
+    assert caps == [REDUCED]
+    # Within budget but above half of it: the cap stays
+    assert run(monitor, proc, clock, 40, 20) == [REDUCED] * 20
+
+
+def test_a_short_spike_is_not_throttled(monitor, proc, clock, caps):
+    run(monitor, proc, clock, 80, 2)
+    run(monitor, proc, clock, 30, 1)
+    run(monitor, proc, clock, 80, 2)
+    assert caps == []
+
+
+def test_the_level_is_given_back_and_the_next_try_waits_twice_as_long(monitor, proc, clock, caps):
+    run(monitor, proc, clock, 80, 3)
+    # 60 s below half the budget
+    assert run(monitor, proc, clock, 20, 13) == [REDUCED] * 12 + [FULL]
+    # Still too expensive right after: stepped down again...
+    assert run(monitor, proc, clock, 80, 3) == [FULL, FULL, REDUCED]
+    assert monitor.relax_seconds == 120
+    # ...and given back only after twice the wait
+    assert run(monitor, proc, clock, 20, 25) == [REDUCED] * 24 + [FULL]
+    assert caps == [REDUCED, FULL, REDUCED, FULL]
+
+
+def test_a_level_that_holds_resets_the_wait(monitor, proc, clock):
+    run(monitor, proc, clock, 80, 3)
+    run(monitor, proc, clock, 20, 13)
+    run(monitor, proc, clock, 80, 3)
+    run(monitor, proc, clock, 20, 25)
+    assert monitor.relax_seconds == 120
+    # Full profile held within budget for twice the wait
+    run(monitor, proc, clock, 20, 48)
+    assert monitor.relax_seconds == 60
+
+
+def test_turning_the_budget_off_lifts_the_cap(monitor, proc, clock, caps):
+    run(monitor, proc, clock, 80, 3)
+    monitor.set_budget(0)
+    assert monitor.cap == FULL and caps == [REDUCED, FULL]
+    assert run(monitor, proc, clock, 95, 5) == [FULL] * 5
+
+
+def test_a_reused_pid_is_not_measured_against_the_old_process(monitor, proc, clock):
+    proc.add(WORKER_PID, "ffmpeg", ROOT_PID)
+    proc.ticks[WORKER_PID] = 10 ** 6
+    sample(monitor, proc, clock, 10)
+    proc.names[WORKER_PID] = "ffprobe"
+    proc.ticks[WORKER_PID] = 0
+    proc.run(WORKER_PID, 50)
+    worker = {entry["pid"]: entry for entry in sample(monitor, proc, clock, 10)["processes"]}[WORKER_PID]
+    assert worker["name"] == "ffprobe" and worker["cpu_percent"] is None
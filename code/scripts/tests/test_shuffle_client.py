@@ -0,0 +1,125 @@
+from core.shuffle_client import CIRCUIT_OPEN, CircuitBreaker, ShuffleClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_client() -> ShuffleClient:
+    # No backoff waits; the retry budget still applies
+    return ShuffleClient(1920, 1080, base_delay=0.0, max_delay=0.0)
+
+
+def click(client: ShuffleClient, is_animated: bool = False) -> list:
+    """One interactive shuffle, run in this thread; returns the signals it sent"""
+    events = []
+    client.url_ready.connect(lambda url, animated: events.append(("url", url)))
+    client.failed.connect(lambda reason, animated: events.append(("failed", reason)))
+    client._request_worker(client._generation, is_animated, "pl")
+    return events
+
+
+def test_fetch_returns_the_url_of_the_requested_type(fake_shuffle_api):
+    client = make_client()
+    assert client.fetch(1920, 1080, is_animated=False).endswith(".jpg")
+    assert client.fetch(1920, 1080, is_animated=True).endswith(".mp4")
+    assert client.latency.snapshot()["outcomes"] == {"ok": 2}
+
+
+def test_server_errors_open_the_interactive_breaker(fake_shuffle_api):
+    fake_shuffle_api.error_rate = 1.0
+    client = make_client()
+
+    events = click(client)
+    assert events[0][0] == "failed" and "503" in events[0][1]
+    assert client.is_available()
+
+    # Three attempts per click, the breaker opens on the fourth failure
+    events = click(client)
+    assert not client.is_available()
+    assert client.breaker.state == CircuitBreaker.OPEN
+    assert events[0][0] == "failed" and "503" in events[0][1]
+
+
+def test_prefetch_failures_do_not_block_clicks(fake_shuffle_api):
+    fake_shuffle_api.error_rate = 1.0
+    client = make_client()
+    for _ in range(5):
+        assert client.fetch(1920, 1080) is None
+    assert client.prefetch_breaker.state == CircuitBreaker.OPEN
+    assert client.is_available()
+
+    fake_shuffle_api.error_rate = 0.0
+    events = click(client)
+    assert events[0][0] == "url"
+
+
+def test_wrong_type_answers_do_not_open_the_breaker(fake_shuffle_api):
+    fake_shuffle_api.wrong_type_rate = 1.0
+    client = make_client()
+    for _ in range(5):
+        events = click(client)
+        assert events[0][0] == "failed" and "expected 'img'" in events[0][1]
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    assert client.is_available()
+
+
+def test_half_open_is_open_and_allow_agree():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=60, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.is_open() and not breaker.allow()
+
+    clock.now += 61
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # The trial is in flight: both refuse
+    assert breaker.is_open() and not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.is_open()
+
+    clock.now += 61
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and not breaker.is_open() and breaker.allow()
+
+
+def test_lost_trial_does_not_block_forever():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=60, clock=clock)
+    breaker.record_failure()
+    clock.now += 61
+    assert breaker.allow()
+    clock.now += 61
+    assert not breaker.is_open()
+    assert breaker.allow()
+
+
+def test_click_during_trial_reports_circuit_open(fake_shuffle_api):
+    client = make_client()
+    client.breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=60, clock=FakeClock())
+    client.breaker.record_failure()
+    client.breaker.clock.now += 61
+    assert client.breaker.allow()  # someone else's trial
+
+    assert not client.is_available()
+    assert click(client) == [("failed", CIRCUIT_OPEN)]
+
+
+def test_failed_trial_reports_the_real_error(fake_shuffle_api):
+    fake_shuffle_api.error_rate = 1.0
+    client = make_client()
+    client.breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=60, clock=FakeClock())
+    client.breaker.record_failure()
+    client.breaker.clock.now += 61
+
+    events = click(client)
+    assert events[0][0] == "failed" and "503" in events[0][1]
+    assert client.breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,72 @@
+import sys
+import threading
+import time
+
+import pytest
+
+import core.wallpaper_controller as controller_module
+from core.wallpaper_controller import WallpaperController
+
+
+class FakeProcess:
+    def __init__(self, pid: int):
+        self.pid = pid
+
+    def poll(self):
+        return None
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(WallpaperController, "_check_weebp_and_mpv", lambda self: True)
+    monkeypatch.setattr(sys, "platform", "linux")
+    return WallpaperController()
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def slow_backend(path):
+        calls.append(("image started", path))
+        time.sleep(0.2)
+        calls.append(("image set", path))
+        return True
+
+    monkeypatch.setattr(controller_module, "set_static_desktop_wallpaper", slow_backend)
+    monkeypatch.setattr(controller_module.subprocess, "call", lambda *args, **kwargs: calls.append(("pkill", None)))
+    return calls
+
+
+def in_background(target, *args) -> threading.Thread:
+    thread = threading.Thread(target=target, args=args)
+    thread.start()
+    return thread
+
+
+def test_stop_waits_for_an_image_being_set(controller, calls):
+    controller.current_is_video = True
+    worker = in_background(controller.start_image, "a.jpg")
+    time.sleep(0.05)
+    controller.stop()
+    worker.join()
+    # The image apply stops the player itself; the outside stop only runs after it
+    assert [name for name, _ in calls] == ["image started", "image set", "pkill", "pkill", "pkill", "pkill"]
+    assert not controller.current_is_video
+
+
+def test_player_pids_are_read_between_starts(controller, calls, monkeypatch):
+    monkeypatch.setattr(controller, "_find_tool", lambda name: None if name == "xwinwrap" else "/usr/bin/mpv")
+    started = threading.Event()
+
+    def slow_popen(*args, **kwargs):
+        started.set()
+        time.sleep(0.2)
+        return FakeProcess(4242)
+
+    monkeypatch.setattr(controller_module.subprocess, "Popen", slow_popen)
+    worker = in_background(controller.start_video, "clip.mp4")
+    started.wait(1)
+    assert controller.player_pids() == {4242}
+    worker.join()
+    assert controller.player_alive() and controller.current_is_video
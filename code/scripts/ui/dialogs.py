@@ -3,9 +3,12 @@ from PySide6.QtCore import Qt, QTimer
 import logging
 
 
+logger = logging.getLogger(__name__)
+
+
 class DownloadProgressDialog(QDialog):
     def __init__(self, parent=None):
-        logging.debug("Initializing DownloadProgressDialog")
+        logger.debug("Initializing DownloadProgressDialog")
         super().__init__(parent)
         self.setWindowTitle("Downloading Video")
         self.setModal(True)
@@ -24,6 +27,7 @@ class DownloadProgressDialog(QDialog):
         self.percentage_label = QLabel("0%", self)
         self.percentage_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.percentage_label.setStyleSheet("font-weight: bold; font-size: 14px;")
+        self._last_percent = None
         
         self.details_label = QLabel("Starting download...", self)
         self.details_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -34,12 +38,13 @@ class DownloadProgressDialog(QDialog):
         layout.addWidget(self.percentage_label)
         layout.addWidget(self.details_label)
         
-        logging.info("DownloadProgressDialog initialized successfully")
+        logger.info("DownloadProgressDialog initialized successfully")
 
     def update_progress(self, percent: float, status_msg: str = ""):
         """Update download progress with logging"""
         percent_int = int(percent)
-        logging.debug(f"Updating progress: {percent_int}% - {status_msg}")
+        # Called for every downloaded chunk: lazy %-style logging only
+        logger.debug("Updating progress: %d%% - %s", percent_int, status_msg)
         
         # Update progress bar
         self.progress.setValue(percent_int)
@@ -49,37 +54,37 @@ class DownloadProgressDialog(QDialog):
             if "Downloading..." in status_msg:
                 details = status_msg.replace("Downloading... ", "")
                 self.details_label.setText(details)
-                logging.debug(f"Download progress details: {details}")
             else:
                 self.details_label.setText(status_msg)
-                logging.debug(f"Download status: {status_msg}")
+                logger.debug("Download status: %s", status_msg)
         
-        # Log significant progress milestones
-        if percent_int in [0, 25, 50, 75, 90, 100]:
-            logging.info(f"Download progress milestone: {percent_int}% - {status_msg}")
+        # Log significant progress milestones, once each
+        if percent_int != self._last_percent and percent_int in (0, 25, 50, 75, 90, 100):
+            logger.info("Download progress milestone: %d%% - %s", percent_int, status_msg)
+        self._last_percent = percent_int
         
         # Log when download is complete
         if percent_int == 100:
-            logging.info("Download progress reached 100% - download complete")
+            logger.info("Download progress reached 100% - download complete")
 
     def show(self):
         """Override show method to log when dialog is displayed"""
-        logging.info("Showing DownloadProgressDialog")
+        logger.info("Showing DownloadProgressDialog")
         super().show()
 
     def close(self):
         """Override close method to log when dialog is closed"""
-        logging.info("Closing DownloadProgressDialog")
+        logger.info("Closing DownloadProgressDialog")
         super().close()
 
     def reject(self):
         """Handle dialog cancellation with logging"""
-        logging.warning("DownloadProgressDialog cancelled by user")
+        logger.warning("DownloadProgressDialog cancelled by user")
         super().reject()
 
     def accept(self):
         """Handle dialog acceptance with logging"""
-        logging.info("DownloadProgressDialog accepted")
+        logger.info("DownloadProgressDialog accepted")
         super().accept()
 
 class ShutdownProgressDialog(QDialog):
@@ -143,7 +148,7 @@ class ShutdownProgressDialog(QDialog):
     
     def update_progress(self, value: int, status: str = ""):
         """Update progress bar and status with detailed logging"""
-        logging.info(f"Shutdown progress: {value}% - {status}")
+        logger.info(f"Shutdown progress: {value}% - {status}")
         
         self.progress_bar.setValue(value)
         self.percentage_label.setText(f"{value}%")
@@ -156,7 +161,7 @@ class ShutdownProgressDialog(QDialog):
     
     def execute_shutdown_sequence(self):
         """Execute the shutdown sequence with progress updates"""
-        logging.info("Starting shutdown sequence")
+        logger.info("Starting shutdown sequence")
         
         for step_text, step_progress in self.shutdown_steps:
             self.update_progress(step_progress, step_text)
@@ -2,8 +2,6 @@ import os
 import sys
 import random
 import logging
-import shutil
-import logging
 from pathlib import Path
 import time
 import webbrowser
@@ -41,14 +39,32 @@ from core.wallpaper_controller import WallpaperController
 from core.download_manager import DownloaderThread,DirectDownloadThread,ImageDownloadThread
 from core.scheduler import WallpaperScheduler
 from  core.language_controller import LanguageController
+from core.prefetch_pool import PrefetchPool
+from core.shuffle_client import CIRCUIT_OPEN, ShuffleClient
+from core.connectivity_monitor import ConnectivityMonitor
+from core.startup import StartupTasks, get_startup_trace
+from core.image_loader import ImageLoader
+from core.rendition_cache import RenditionCache
+from core.proxy_transcoder import ProxyTranscoder
+from core.faststart_remuxer import FaststartRemuxer
+from core.animation_converter import ANIMATED_EXTENSIONS, AnimationConverter
+from core.power_governor import FULL, PAUSED, MpvPlayer, PowerGovernor, extract_poster
+from core.autopause_controller import AutoPauseController, X11WindowProvider
+from core.resource_monitor import ResourceMonitor
+from core.apply_pipeline import ApplyPipeline
 # Import utilities
-from utils.path_utils import COLLECTION_DIR, VIDEOS_DIR, IMAGES_DIR, FAVS_DIR, get_folder_for_range, get_folder_for_source, open_folder_in_explorer
-from utils.system_utils import get_current_desktop_wallpaper, is_connected_to_internet, get_primary_screen_dimensions, fetch_shuffled_wallpaper, resource_path
+from utils.animation_links import get_animation_links
+from utils.mpv_ipc import MpvIpcError, set_paused
+from utils.path_utils import COLLECTION_DIR, VIDEOS_DIR, IMAGES_DIR, FAVS_DIR, RENDITIONS_DIR, get_folder_for_range, get_folder_for_source, open_folder_in_explorer, ensure_collection_dirs
+from utils.system_utils import get_current_desktop_wallpaper, get_primary_screen_dimensions, resource_path
 from utils.validators import validate_url_or_path, get_media_type
-from utils.file_utils import copy_to_collection, cleanup_temp_marker
+from utils.file_utils import (
+    copy_to_collection, cleanup_temp_marker, get_staging_path,
+    commit_staged_file, discard_staged_file, cleanup_staging_dir, is_staged_file
+)
 
 # Import models
-from models.config import Config
+from models.config import get_config
 
 # Import UI components
 from .widgets import FadeOverlay
@@ -57,24 +73,71 @@ from .dialogs import DownloadProgressDialog, ShutdownProgressDialog
 
 
 class TapeciarniaApp(QMainWindow):
+    # (animated original, looping video made from it or "") from the converter
+    animation_converted = Signal(str, str)
+    # Poster still to show while the power governor pauses a player without IPC ("" = video back)
+    power_poster = Signal(str)
+
     def __init__(self):
         logging.info("Initializing TapeciarniaApp")
         super().__init__()
-        self.ui = Ui_MainWindow()
-        self.ui.setupUi(self)
+        # Only what the first paint needs runs here; blocking probes run in
+        # _run_startup_tasks once the event loop is up
+        self.startup_trace = get_startup_trace()
+        with self.startup_trace.stage("ui_setup"):
+            self.ui = Ui_MainWindow()
+            self.ui.setupUi(self)
         self.x , self.y = get_primary_screen_dimensions()
+        # Collection folders are created here rather than when path_utils is imported
+        ensure_collection_dirs()
 
         # Initialize controllers
         logging.debug("Initializing controllers")
-        self.controller = WallpaperController()
-        self.scheduler = WallpaperScheduler()
-        self.language_controller = LanguageController()
-        self.scheduler.set_change_callback(self._apply_wallpaper_from_path)
-        self.config = Config()
-
-        self._set_lang()
-        # connect to the language controller signals
+        with self.startup_trace.stage("controllers"):
+            self.controller = WallpaperController()
+            self.scheduler = WallpaperScheduler()
+            self.language_controller = LanguageController()
+            self.scheduler.set_change_callback(self._apply_wallpaper_from_path)
+            # Shared with the language controller and scheduler
+            self.config = get_config()
+            self.config.watch_file()
+
+            # Online/offline state, probed in the background and read without blocking
+            self.connectivity = ConnectivityMonitor(parent=self)
+
+            # Shuffle API calls run off the GUI thread, with retries and a circuit breaker
+            self.shuffle_client = ShuffleClient(self.x, self.y, self.language_controller.get_current_language,
+                                                connectivity=self.connectivity, parent=self)
+            self.shuffle_client.url_ready.connect(self._on_shuffle_url_ready)
+            self.shuffle_client.failed.connect(self._on_shuffle_failed)
+
+            # Imported MP4s get their index moved to the front (ffmpeg -c copy)
+            self.faststart_remuxer = None
+            if self.config.get_bool("faststart_remux", True):
+                remuxer = FaststartRemuxer()
+                self.faststart_remuxer = remuxer if remuxer.is_available() else None
+            # Animated GIF/WebP imports become looping videos (worker process)
+            self.animation_converter = None
+            if self.config.get_bool("convert_animations", True):
+                converter = AnimationConverter(self.x, self.y)
+                self.animation_converter = converter if converter.is_available() else None
+
+            # Keep a few online shuffle wallpapers ready in the background; started
+            # on the first shuffle unless prefetch_on_launch is set
+            self.prefetch_pool = PrefetchPool(self.x, self.y, self.language_controller.get_current_language,
+                                              fetch_url=self.shuffle_client.fetch,
+                                              post_process=self.faststart_remuxer.remux if self.faststart_remuxer else None)
+
+            # Prefetching waits while offline
+            self.connectivity.online_changed.connect(self._on_online_changed)
+
+        # connect to the language controller signals; the language combo is
+        # filled once the translations startup task is done
         self.language_controller.language_changed.connect(self._update_lang)
+        # The widgets built below need the active language's strings now (one
+        # read of the cached catalog)
+        with self.startup_trace.stage("language"):
+            self.lang = self.language_controller.get_language_by_name(self.language_controller.get_current_language())
         # add event handler to uplaod area
         self.ui.uploadArea.mousePressEvent = self.upload_area_mousePressEvent
         # remove focuse from email input textEdit
@@ -85,32 +148,190 @@ class TapeciarniaApp(QMainWindow):
         self.auto_pause_process = None
         self.last_wallpaper_path = None
         self.current_shuffle_mode = None
+        self.video_paused = False
 
         # UI components
         self.fade_overlay = FadeOverlay(self)
         self.fade_overlay.hide()
+        # Fade previews are decoded on a worker at window size
+        self.image_loader = ImageLoader(parent=self)
+        self.image_loader.loaded.connect(self._on_fade_image_loaded)
+        self.image_loader.failed.connect(self._on_fade_image_failed)
+        self._fade_request = 0
+        # Large images are scaled to the screen before the desktop sees them
+        self.rendition_cache = RenditionCache(self.x, self.y)
+        # Applies run on a worker (resolve, rendition, desktop backend, verify); newer ones supersede older
+        self.apply_pipeline = ApplyPipeline(self.controller, prepare_image=self.rendition_cache.get, parent=self)
+        self.apply_pipeline.started.connect(self._on_apply_started)
+        self.apply_pipeline.finished.connect(self._on_apply_finished)
+        self.apply_pipeline.failed.connect(self._on_apply_failed)
+        # Started once the "desktop_wallpaper" startup task has recorded the
+        # original wallpaper; applies submitted before then (URI arguments, IPC)
+        # wait in the pipeline's pending slot
+        self.animation_converted.connect(self._on_animation_converted)
+        # Opt-in: low-priority ffmpeg proxies of video wallpapers at screen size
+        self.proxy_transcoder = None
+        if self.config.get_bool("proxy_transcoding", False):
+            transcoder = ProxyTranscoder(self.x, self.y, max_fps=self.config.get_int("proxy_max_fps", 30),
+                                         codec="vp9" if self.config.get_str("proxy_codec") == "vp9" else "h264")
+            if transcoder.is_available():
+                self.proxy_transcoder = transcoder
+                self.controller.proxy_lookup = transcoder.proxy_for
+            else:
+                logging.warning("Proxy transcoding is enabled but ffmpeg was not found")
+        # Video playback follows AC/battery, idle and lock state (sysfs + logind)
+        self.power_governor = None
+        self._power_poster_video = None
+        if sys.platform.startswith("linux") and self.config.get_bool("power_governor", True):
+            player = MpvPlayer(keep_paused=lambda: bool(self.autopause and self.autopause.occluded))
+            self.power_governor = PowerGovernor(player, fallback=self._power_fallback, parent=self)
+            self.power_poster.connect(self._on_power_poster)
+        # ...and pauses while windows cover the whole desktop (X11 window events)
+        self.autopause = None
+        if (sys.platform.startswith("linux") and self.config.get_bool("auto_pause", True)
+                and X11WindowProvider.is_supported()):
+            self.autopause = AutoPauseController(X11WindowProvider(), self._autopause_set_paused,
+                                                 ignore_pids=self._player_pids, parent=self)
+        # What the players and helpers cost; a CPU budget caps the playback profile
+        self.resource_monitor = None
+        if sys.platform.startswith("linux") and self.config.get_bool("resource_monitor", True):
+            self.resource_monitor = ResourceMonitor(
+                budget_percent=self.config.get_int("cpu_budget_percent", 0),
+                throttle=self.power_governor.set_cap if self.power_governor else None, parent=self)
+            self.resource_monitor.sampled.connect(self._on_resources_sampled)
 
         # Enhanced drag & drop
         self.drag_drop_widget = EnhancedDragDropWidget(self)
 
         # State
         self.current_range = "all"
-        self.previous_wallpaper = get_current_desktop_wallpaper()
+        # Filled in by the "desktop_wallpaper" startup task
+        self.previous_wallpaper = None
         self.is_minimized_to_tray = False
 
         # Setup
-        self._setup_ui()
-        self._setup_tray()
-        self._load_settings()
+        with self.startup_trace.stage("window_setup"):
+            self._setup_ui()
+            self._setup_tray()
+            self._load_settings()
         
         # Setup enhanced features
         # self._setup_enhanced_features()
         
         # Ensure status bar is always visible
         # self._ensure_status_visible()
+
+        self.startup_tasks = StartupTasks(self.startup_trace, parent=self)
+        self.startup_tasks.task_done.connect(self._on_startup_task_done)
+        self.startup_tasks.task_failed.connect(self._on_startup_task_failed)
+        self.startup_tasks.all_done.connect(self._on_startup_finished)
+        QTimer.singleShot(0, self._run_startup_tasks)
         
         logging.info("TapeciarniaApp initialization completed successfully")
 
+    # Staged startup
+    def _run_startup_tasks(self):
+        """First event loop turn: the window is on screen, start the slow work"""
+        self.startup_trace.mark("first_window")
+        tasks = {
+            "translations": self.language_controller.load_translations,
+            "desktop_wallpaper": get_current_desktop_wallpaper,
+            "tools": self.controller.discover_tools,
+            # Drop half-finished or unclaimed downloads from a previous run
+            "staging_cleanup": cleanup_staging_dir,
+            "rendition_prune": self.rendition_cache.prune,
+        }
+        if self.proxy_transcoder:
+            tasks["proxy_scan"] = self._start_proxy_transcoder
+        self.startup_tasks.run(tasks)
+        if self.config.get_bool("prefetch_on_launch", False):
+            self.prefetch_pool.start()
+        self.connectivity.start()
+        if self.power_governor:
+            self.power_governor.start()
+        if self.autopause:
+            self.autopause.start()
+        if self.resource_monitor:
+            self.resource_monitor.start()
+
+    def _start_proxy_transcoder(self) -> int:
+        """Resume the saved proxy queue and queue collection videos without a proxy"""
+        self.proxy_transcoder.start()
+        return sum(self.proxy_transcoder.enqueue_folder(folder) for folder in (VIDEOS_DIR, FAVS_DIR))
+
+    def _on_startup_task_done(self, name: str, result):
+        if name == "translations":
+            with self.startup_trace.stage("apply_language"):
+                self._set_lang()
+        elif name == "desktop_wallpaper":
+            self.previous_wallpaper = result
+            logging.info(f"Original desktop wallpaper: {result}")
+            self.apply_pipeline.start()
+
+    def _on_startup_task_failed(self, name: str, error: str):
+        if name == "desktop_wallpaper":
+            # Nothing to restore later, but applies must not wait forever
+            self.apply_pipeline.start()
+
+    def _on_startup_finished(self):
+        interactive_ms = self.startup_trace.mark("interactive")
+        logging.info(f"Startup finished, interactive after {interactive_ms:.1f} ms")
+        logging.debug(self.startup_trace.summary())
+
+    # Remote control (IPC)
+    def register_ipc_commands(self, server):
+        """Commands for scripts and other instances; see bin/tools/tapeciarnia_ctl.py"""
+        # A burst of wallpaper changes only applies the last one
+        server.register("apply", self._ipc_apply, coalesce="wallpaper")
+        server.register("next", self._ipc_next, coalesce="wallpaper")
+        server.register("pause", lambda args: self._ipc_set_paused(True), coalesce="playback")
+        server.register("resume", lambda args: self._ipc_set_paused(False), coalesce="playback")
+        server.register("status", self._ipc_status, read_only=True)
+        server.register("metrics", self._ipc_metrics, read_only=True)
+        self.ipc_server = server
+
+    def _ipc_apply(self, args: dict) -> dict:
+        target = str(args.get("target") or "").strip()
+        validated = validate_url_or_path(target) if target else None
+        if not validated:
+            raise ValueError(f"Not a file path or URL: {target!r}")
+        self._apply_input_string(validated)
+        return {"target": validated}
+
+    def _ipc_next(self, args: dict) -> dict:
+        self._apply_shuffled_wallpaper(args.get("mode", "all"))
+        return {"wallpaper": self.last_wallpaper_path}
+
+    def _ipc_set_paused(self, paused: bool) -> dict:
+        if not self.controller.set_video_paused(paused):
+            raise RuntimeError("No video wallpaper is playing")
+        self.video_paused = paused
+        return {"paused": paused}
+
+    def _ipc_status(self, args: dict) -> dict:
+        return {
+            "wallpaper": self.last_wallpaper_path,
+            "type": self.current_wallpaper_type,
+            "paused": self.video_paused,
+            "scheduler": self.scheduler.is_active(),
+            "range": self.current_range,
+            "online": self.connectivity.is_online(),
+            "language": self.language_controller.get_current_language(),
+        }
+
+    def _ipc_metrics(self, args: dict) -> dict:
+        trace = self.startup_trace
+        return {
+            "startup_ms": {name: round(offset, 1) for name, offset in trace.milestones.items()},
+            "startup_stages_ms": {name: round(duration, 1) for name, _, duration, _ in trace.stages},
+            "shuffle_latency": self.shuffle_client.latency.snapshot(),
+            "prefetch_available": {kind: self.prefetch_pool.available(kind) for kind in self.prefetch_pool.KINDS},
+            "config_writes": self.config.write_count,
+            "ipc": dict(self.ipc_server.stats),
+            "power_profile_seconds": self.power_governor.time_in_state() if self.power_governor else None,
+            "resources": self.resource_monitor.snapshot() if self.resource_monitor else None,
+        }
+
     def _update_lang(self, lang:dict):
         """Update UI language based on selected language"""
         self.lang = lang
@@ -120,9 +341,15 @@ class TapeciarniaApp(QMainWindow):
 
     def _set_lang(self):
         logging.info("Eumarating all language options into combo box")
-        self.language_controller.enumerate_languages(self.ui.langCombo)
-        # Set initial language
-        self.lang = self.language_controller.setup_initial_language(self.ui.langCombo)
+        # The combo is already bound to on_language_changed; filling it must not
+        # count as the user picking a language
+        self.ui.langCombo.blockSignals(True)
+        try:
+            self.language_controller.enumerate_languages(self.ui.langCombo)
+            # Set initial language
+            self.lang = self.language_controller.setup_initial_language(self.ui.langCombo)
+        finally:
+            self.ui.langCombo.blockSignals(False)
         self.update_ui_language()
 
     def _make_icon(self,icon_name:QIcon,className:str ="primary") -> QIcon:
@@ -286,21 +513,9 @@ class TapeciarniaApp(QMainWindow):
     def change_wallpaper_with_optimization(self, new_wallpaper_path):
         """Optimized wallpaper change with minimal process management"""
         logging.info(f"Changing wallpaper with optimization: {os.path.basename(new_wallpaper_path)}")
-        new_wallpaper_type = self.get_wallpaper_type(new_wallpaper_path)
-        logging.debug(f"New wallpaper type: {new_wallpaper_type}")
-        
-        # Determine if process stop is needed
-        needs_process_stop = self.needs_process_stop(self.current_wallpaper_type, new_wallpaper_type)
-        logging.debug(f"Process stop needed: {needs_process_stop} (current: {self.current_wallpaper_type}, new: {new_wallpaper_type})")
-        
-        if needs_process_stop:
-            logging.debug("Stopping current wallpaper processes")
-            self.controller.stop()
-        
-        # Set new wallpaper using existing method
+        # Running players are stopped on the apply worker, only when the new wallpaper needs it;
+        # _on_apply_finished records it as the current wallpaper once it is set
         self._apply_wallpaper_from_path(Path(new_wallpaper_path))
-        self.current_wallpaper_type = new_wallpaper_type
-        self.last_wallpaper_path = new_wallpaper_path
         
 
     def needs_process_stop(self, current_type, new_type):
@@ -337,28 +552,12 @@ class TapeciarniaApp(QMainWindow):
         
         # Update button states
         self._update_shuffle_button_states('animated')
-        
-        # Check internet connection first
-        if not is_connected_to_internet():
-            logging.warning("No internet connection, using local shuffle")
-            self._set_status("No internet - using local animated wallpapers")
-            self._fallback_to_local_shuffle(True)
+
+        # A prefetched wallpaper needs neither the API nor a download
+        if self._apply_prefetched_wallpaper("animated"):
             return
         
-        try:
-            # Try to fetch online wallpaper
-            online_url = fetch_shuffled_wallpaper(self.x,self.y,True,self.language_controller.get_current_language())
-            logging.debug(f"Online URl : {online_url}")
-            if online_url:
-                # Download and set online wallpaper
-                self.download_and_set_online_wallpaper(online_url, is_animated=True)
-            else:
-                # Online fetch failed, use local
-                self._fallback_to_local_shuffle(True)
-                
-        except Exception as e:
-            logging.error(f"Online shuffle animated failed: {e}")
-            self._fallback_to_local_shuffle(True)
+        self._request_online_shuffle(is_animated=True)
 
     def on_shuffle_wallpaper(self):
         """Shuffle through static wallpapers - try online first, fallback to local"""
@@ -368,34 +567,77 @@ class TapeciarniaApp(QMainWindow):
         
         # Update button states
         self._update_shuffle_button_states('wallpaper')
+
+        # A prefetched wallpaper needs neither the API nor a download
+        if self._apply_prefetched_wallpaper("static"):
+            return
         
-        # Check internet connection first
-        if not is_connected_to_internet():
+        self._request_online_shuffle(is_animated=False)
+
+    def _request_online_shuffle(self, is_animated: bool):
+        """Ask the shuffle API for a wallpaper in the background"""
+        if not self.connectivity.is_online():
             logging.warning("No internet connection, using local shuffle")
-            self._set_status("No internet - using local wallpapers")
-            self._fallback_to_local_shuffle(False)
+            self._set_status(f"No internet - using local {'animated ' if is_animated else ''}wallpapers")
+            self._fallback_to_local_shuffle(is_animated, notify=False)
             return
-        
+        if not self.shuffle_client.is_available():
+            # The API failed repeatedly, skip it until the cooldown is over
+            logging.warning("Shuffle API circuit open, using local shuffle")
+            self._set_status("Online shuffle unavailable - using local collection")
+            self._fallback_to_local_shuffle(is_animated, notify=False)
+            return
+        self.shuffle_client.request(is_animated)
+
+    def _on_online_changed(self, online: bool):
+        """Pause background prefetching while offline"""
+        logging.info(f"Connectivity changed: {'online' if online else 'offline'}")
+        self.prefetch_pool.set_paused(not online)
+
+    def _on_shuffle_url_ready(self, url: str, is_animated: bool):
+        """Shuffle API answered - download and set the wallpaper"""
+        logging.debug(f"Online URl : {url}")
+        self.download_and_set_online_wallpaper(url, is_animated=is_animated)
+
+    def _on_shuffle_failed(self, reason: str, is_animated: bool):
+        """Shuffle API gave up - use the local collection"""
+        logging.error(f"Online shuffle {'animated' if is_animated else 'wallpaper'} failed: {reason}")
+        # Another click holds the breaker's trial; same as the is_available() check, no dialog
+        self._fallback_to_local_shuffle(is_animated, notify=reason != CIRCUIT_OPEN)
+
+    def _apply_prefetched_wallpaper(self, kind):
+        """Apply a wallpaper from the prefetch pool. Returns False if none is ready."""
+        # Users who never shuffle never download anything ahead of time
+        self.prefetch_pool.start()
+        staged = self.prefetch_pool.take(kind)
+        if not staged:
+            return False
+
         try:
-            # Try to fetch online wallpaper
-            online_url = fetch_shuffled_wallpaper(self.x,self.y,False,self.language_controller.get_current_language())
-            logging.debug(f"Online URl : {online_url}")
-            
-            if online_url:
-                # Download and set online wallpaper
-                self.download_and_set_online_wallpaper(online_url, is_animated=False)
-            else:
-                # Online fetch failed, use local
-                self._fallback_to_local_shuffle(False)
-                
+            dest_folder = VIDEOS_DIR if kind == "animated" else IMAGES_DIR
+            dest_path = commit_staged_file(staged, dest_folder)
         except Exception as e:
-            logging.error(f"Online shuffle wallpaper failed: {e}")
-            self._fallback_to_local_shuffle(False)
+            logging.error(f"Failed to commit prefetched wallpaper {staged}: {e}")
+            discard_staged_file(staged)
+            return False
+
+        logging.info(f"Applying prefetched {kind} wallpaper: {dest_path}")
+        self._update_shuffle_button_states(None)
+        if hasattr(self.ui, 'urlInput'):
+            self.ui.urlInput.setText(str(dest_path))
+        self._apply_wallpaper_from_path(dest_path)
+        self._set_status(f"Online {'animated' if kind == 'animated' else 'static'} wallpaper set")
+        return True
 
     def _perform_reset(self):
         """Reset to default wallpaper WITHOUT confirmation but WITH success message"""
         logging.info("Performing reset without confirmation")
-        self.controller.stop()
+        self.apply_pipeline.submit_stop()
+        self._power_poster_video = None
+        if self.power_governor:
+            self.power_governor.set_active(False)
+        if self.autopause:
+            self.autopause.set_active(False)
         self.scheduler.stop()
         
         # Reset enhanced state
@@ -422,7 +664,7 @@ class TapeciarniaApp(QMainWindow):
         if hasattr(self, 'drag_drop_widget'):
             self.drag_drop_widget.restore_original_wallpaper()
         elif self.previous_wallpaper:
-            self.controller.start_image(self.previous_wallpaper)
+            self.apply_pipeline.submit(self.previous_wallpaper, remember=False)
             self._set_status("Restored previous wallpaper")
         else:
             self._set_status("Reset complete (no previous wallpaper)")
@@ -452,11 +694,56 @@ class TapeciarniaApp(QMainWindow):
         success_dialog.exec()
         logging.info("Reset success confirmation shown")
 
-    def cleanup(self):
-        """Enhanced cleanup on app close"""
+    def cleanup(self, progress=None):
+        """
+        Stop every worker, player and background process and save settings.
+        progress(percent, message), e.g. the shutdown dialog's update_progress,
+        is told about each step as it starts.
+        """
+        def step(percent, message):
+            if progress:
+                progress(percent, message)
+                QApplication.processEvents()
+
         logging.info("Performing application cleanup")
+
+        # Step 1: Stop wallpaper processes (25%)
+        step(25, "Stopping wallpaper processes...")
+        self.apply_pipeline.stop()
         self.controller.stop()
-        self.stop_auto_pause_process()
+
+        # Step 2: Stop scheduler and workers (50%)
+        step(50, "Stopping scheduler...")
+        self.scheduler.stop()
+        self.shuffle_client.stop()
+        self.startup_tasks.shutdown()
+        self.image_loader.shutdown()
+        self.rendition_cache.shutdown()
+        if self.faststart_remuxer:
+            self.faststart_remuxer.shutdown()
+        if self.animation_converter:
+            self.animation_converter.shutdown()
+        if self.proxy_transcoder:
+            self.proxy_transcoder.stop()
+        self.prefetch_pool.stop()
+        self.connectivity.stop()
+        if self.power_governor:
+            self.power_governor.stop()
+        if self.autopause:
+            self.autopause.stop()
+        if self.resource_monitor:
+            self.resource_monitor.stop()
+
+        # Step 3: Cleanup resources (75%)
+        step(75, "Cleaning up resources...")
+        try:
+            self.stop_auto_pause_process()
+        except Exception as e:
+            logging.warning(f"Error stopping auto-pause process: {e}")
+
+        # Step 4: Save settings (90%)
+        step(90, "Saving settings...")
+        self.config.flush()
         logging.info("Application cleanup completed")
 
     # Rest of your existing methods remain the same...
@@ -504,30 +791,8 @@ class TapeciarniaApp(QMainWindow):
         """Perform shutdown with coordinated progress updates"""
         try:
             logging.info("Performing coordinated shutdown sequence")
-            
-            # Step 1: Stop wallpaper processes (25%)
-            self.shutdown_dialog.update_progress(25, "Stopping wallpaper processes...")
-            self.controller.stop()
-            QApplication.processEvents()
-            
-            # Step 2: Stop scheduler (50%)
-            self.shutdown_dialog.update_progress(50, "Stopping scheduler...")
-            self.scheduler.stop()
-            QApplication.processEvents()
-            
-            # Step 3: Cleanup resources (75%)
-            self.shutdown_dialog.update_progress(75, "Cleaning up resources...")
-            try:
-                if hasattr(self, 'stop_auto_pause_process'):
-                    self.stop_auto_pause_process()
-            except Exception as e:
-                logging.warning(f"Error stopping auto-pause process: {e}")
-            QApplication.processEvents()
-            
-            # Step 4: Save settings (90%)
-            self.shutdown_dialog.update_progress(90, "Saving settings...")
-            # Add any final settings save operations here
-            QApplication.processEvents()
+
+            self.cleanup(self.shutdown_dialog.update_progress)
             
             # Step 5: Complete (100%)
             self.shutdown_dialog.update_progress(100, "Shutdown complete!")
@@ -584,29 +849,8 @@ class TapeciarniaApp(QMainWindow):
         """Perform shutdown from tray with progress updates"""
         try:
             logging.info("Performing shutdown sequence from tray")
-            
-            # Step 1: Stop wallpaper processes (25%)
-            self.shutdown_dialog.update_progress(25, "Stopping wallpaper processes...")
-            self.controller.stop()
-            QApplication.processEvents()
-            
-            # Step 2: Stop scheduler (50%)
-            self.shutdown_dialog.update_progress(50, "Stopping scheduler...")
-            self.scheduler.stop()
-            QApplication.processEvents()
-            
-            # Step 3: Cleanup (75%)
-            self.shutdown_dialog.update_progress(75, "Cleaning up resources...")
-            try:
-                if hasattr(self, 'stop_auto_pause_process'):
-                    self.stop_auto_pause_process()
-            except Exception as e:
-                logging.warning(f"Error stopping auto-pause process: {e}")
-            QApplication.processEvents()
-            
-            # Step 4: Save settings (90%)
-            self.shutdown_dialog.update_progress(90, "Saving settings...")
-            QApplication.processEvents()
+
+            self.cleanup(self.shutdown_dialog.update_progress)
             
             # Step 5: Complete (100%)
             self.shutdown_dialog.update_progress(100, "Shutdown complete!")
@@ -1302,16 +1546,37 @@ class TapeciarniaApp(QMainWindow):
         logging.warning(f"Unsupported input type: {text}")
         QMessageBox.warning(self, "Invalid Input", "Unsupported input type.")
 
+    def _process_imported_file(self, path: Path):
+        """Background passes for a file that just entered the collection"""
+        path = Path(path)
+        if self.faststart_remuxer:
+            # MP4/MOV only: moov to the front
+            self.faststart_remuxer.submit(path)
+        if self.animation_converter and path.suffix.lower() in ANIMATED_EXTENSIONS:
+            # The video goes where the user put the original: favorites or the video collection
+            folder = FAVS_DIR if path.parent == FAVS_DIR else VIDEOS_DIR
+            future = self.animation_converter.submit(path, folder)
+            future.add_done_callback(lambda done: self.animation_converted.emit(str(path), done.result() or ""))
+
+    def _on_animation_converted(self, original: str, video: str):
+        """Switch to the video if the animated original is still the wallpaper"""
+        if video and self.config.get_last_video() == original:
+            logging.info(f"Switching to the looping video made from {Path(original).name}")
+            self._apply_video(video)
+
     def _handle_local_file(self, file_path: Path):
         """Handle local file application"""
         logging.info(f"Processing local file: {file_path}")
         if file_path.suffix.lower() in (".mp4", ".mkv", ".webm", ".avi", ".mov"):
             logging.debug("Local file is video, copying to videos directory")
             dest = copy_to_collection(file_path, VIDEOS_DIR)
+            self._process_imported_file(dest)
             self._apply_video(str(dest))
-        elif file_path.suffix.lower() in (".jpg", ".jpeg", ".png", ".bmp", ".gif"):
+        elif file_path.suffix.lower() in (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp"):
             logging.debug("Local file is image, copying to images directory")
             dest = copy_to_collection(file_path, IMAGES_DIR)
+            # Animated GIF/WebP: shown as a still until its video is ready
+            self._process_imported_file(dest)
             self._apply_image_with_fade(str(dest))
         else:
             logging.warning(f"Unsupported local file type: {file_path.suffix}")
@@ -1402,9 +1667,9 @@ class TapeciarniaApp(QMainWindow):
             
             # Sanitize filename
             filename = self._get_safe_filename(filename)
-            download_path = VIDEOS_DIR / filename
+            download_path = get_staging_path(filename)
             
-            logging.info(f"Downloading to: {download_path}")
+            logging.info(f"Downloading to staging: {download_path}")
             
             # Start download in a thread to avoid blocking UI
             self.direct_download_thread = DirectDownloadThread(url, str(download_path))
@@ -1590,7 +1855,11 @@ class TapeciarniaApp(QMainWindow):
             add_to_favorites_btn.clicked.connect(
                 lambda: self._safe_process_destination(downloaded_file, "favorites", dialog)
             )
-            cancel_btn.clicked.connect(dialog.reject)
+            # Cancel drops the staged download; anything else left behind is
+            # removed by cleanup_staging_dir() on the next start
+            cancel_btn.clicked.connect(
+                lambda: (discard_staged_file(downloaded_file), dialog.reject())
+            )
             
             buttons_layout.addWidget(add_to_collection_btn)
             buttons_layout.addWidget(add_to_favorites_btn)
@@ -1650,15 +1919,9 @@ class TapeciarniaApp(QMainWindow):
                     dest_folder = IMAGES_DIR
                 dest_name = "collection"
             
-            # Copy file with duplicate handling
-            dest_path = dest_folder / downloaded_file.name
-            counter = 1
-            original_stem = downloaded_file.stem
-            while dest_path.exists():
-                dest_path = dest_folder / f"{original_stem}_{counter}{downloaded_file.suffix}"
-                counter += 1
-            
-            shutil.copy2(downloaded_file, dest_path)
+            # Rename out of staging (deduplicates the name, no second write)
+            dest_path = commit_staged_file(downloaded_file, dest_folder)
+            self._process_imported_file(dest_path)
             
             # Close the destination dialog
             dialog.accept()
@@ -1704,99 +1967,141 @@ class TapeciarniaApp(QMainWindow):
                 self.ui.urlInput.setText(str(file_path))
 
     def _apply_wallpaper_from_path(self, file_path: Path):
-        """Apply wallpaper from file path - OPTIMIZED to avoid unnecessary stops"""
+        """Queue a wallpaper on the apply pipeline; safe from the scheduler's thread too"""
         logging.info(f"Applying wallpaper from path: {file_path}")
-        current_is_video = self.controller.current_is_video
-        new_is_video = file_path.suffix.lower() in (".mp4", ".mkv", ".webm", ".avi", ".mov")
-        
-        # Only stop if necessary (video to video, video to image, or image to video)
-        needs_stop = (current_is_video and new_is_video) or (current_is_video and not new_is_video) or (not current_is_video and new_is_video)
-        # No need to stop here, as the controller methods handle it
-        # if needs_stop:
-        #     logging.debug("Stopping current wallpaper due to type change")
-        #     self.controller.stop()
-        
-        if new_is_video:
-            self._apply_video(str(file_path))
-        else:
-            self._apply_image_with_fade(str(file_path))
+        self.apply_pipeline.submit(str(file_path))
 
     def _apply_video(self, video_path: str):
-        """Apply video wallpaper"""
-        try:
-            logging.info(f"Applying video wallpaper: {video_path}")
-            self.controller.start_video(video_path)
-            self.config.set_last_video(video_path)
-            self._set_status(f"Playing video: {Path(video_path).name}")
-            self._update_url_input(video_path)
-            logging.info(f"Video wallpaper applied successfully: {Path(video_path).name}")
-        except Exception as e:
-            logging.error(f"Failed to play video: {e}", exc_info=True)
-            QMessageBox.critical(self, "Error", f"Failed to play video: {e}")
+        """Apply video wallpaper; see _on_apply_finished"""
+        logging.info(f"Applying video wallpaper: {video_path}")
+        self.apply_pipeline.submit(video_path)
 
     def _apply_image_with_fade(self, image_path: str):
-        """Apply image wallpaper with fade effect - FIXED for null pixmap"""
+        """Apply image wallpaper; the fade starts once a window-sized preview is decoded"""
+        logging.info(f"Applying image wallpaper with fade: {image_path}")
+        self.apply_pipeline.submit(image_path)
+
+    def _on_apply_started(self, job: dict):
+        """Resolved on the apply worker: fade in the preview while the desktop is being set"""
+        if not job["remember"]:
+            return
+        if job["kind"] == "image":
+            # Decoded off the GUI thread at window size; see _on_fade_image_loaded
+            target = self.size() * self.devicePixelRatioF()
+            self._fade_request = self.image_loader.request(job["path"], target)
+        self._set_status(f"Applying {Path(job['path']).name}...")
+
+    def _on_apply_finished(self, job: dict):
+        if not job["remember"]:
+            return
+        path = job["path"]
+        is_video = job["kind"] == "video"
+        # The submitted file (not a GIF's linked video), as the collection lists it
+        self.last_wallpaper_path = job["target"]
+        self.current_wallpaper_type = job["kind"]
+        if is_video:
+            self.video_paused = False
+        self._power_poster_video = None
+        if self.power_governor:
+            self.power_governor.set_active(is_video)
+        if self.autopause:
+            self.autopause.set_active(is_video)
+        if is_video and self.proxy_transcoder and not self.proxy_transcoder.proxy_for(path):
+            # Plays the original this time, the proxy from the next apply on
+            self.proxy_transcoder.enqueue(path)
+        self.config.set_last_video(path)
+        self._set_status(f"{'Playing video' if is_video else 'Image applied'}: {Path(path).name}")
+        self._update_url_input(path)
+
+    def _on_apply_failed(self, job: dict):
+        if job["kind"] == "stop" or not job["remember"]:
+            self._set_status("Could not change the wallpaper")
+            return
+        name = Path(job["path"] or job["target"]).name
+        self._set_status(f"Failed to apply {name}")
+        QMessageBox.warning(self, "Error", f"Failed to apply {name}: {job['error']}")
+
+    def _power_fallback(self, engage: bool) -> bool:
+        """Power governor worker: the player cannot pause over IPC, swap it for a poster still"""
+        video = self.config.get_last_video()
+        if not engage:
+            self.power_poster.emit("")
+            return False
+        poster = extract_poster(video, RENDITIONS_DIR) if video else None
+        poster = poster or self.previous_wallpaper
+        if not poster:
+            return False
+        self.power_poster.emit(poster)
+        return True
+
+    def _on_resources_sampled(self, summary: dict):
+        """Show what the video wallpaper costs in the tray tooltip"""
+        if not hasattr(self, "tray"):
+            return
+        player = summary["groups"].get("player")
+        tooltip = "Tapeciarnia - Live Wallpaper Manager"
+        if player:
+            tooltip += f"\nWallpaper: {player['cpu_percent']:.0f}% CPU, {player['rss_mb']:.0f} MB"
+            if summary["cap"] != FULL:
+                tooltip += f" ({summary['cap']} to stay within {summary['budget_percent']:.0f}% CPU)"
+        self.tray.setToolTip(tooltip)
+
+    def _player_pids(self) -> set:
+        """Processes of the video wallpaper; their fullscreen window does not cover the desktop"""
+        return self.controller.player_pids()
+
+    def _autopause_set_paused(self, paused: bool) -> bool:
+        """Auto-pause worker: pause the covered wallpaper; resume it unless it is paused for another reason"""
+        if not paused and (self.video_paused or
+                           (self.power_governor and self.power_governor.profile == PAUSED)):
+            return True
         try:
-            logging.info(f"Applying image wallpaper with fade: {image_path}")
-            
-            # Check if image file exists and is valid
-            if not os.path.exists(image_path):
-                logging.error(f"Image file does not exist: {image_path}")
-                raise FileNotFoundError(f"Image file not found: {image_path}")
-            
-            # Load the new pixmap first
-            new_pix = QPixmap(image_path)
-            if new_pix.isNull():
-                logging.error(f"Failed to load image: {image_path}")
-                raise ValueError(f"Invalid image file: {image_path}")
-            
-            # Scale the new pixmap
-            new_pix = new_pix.scaled(self.size(), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
-            
-            # Try to get old pixmap, but continue if it fails
-            old_pix = None
-            try:
-                old_pix = self.grab()
-                if old_pix.isNull():
-                    logging.debug("Old pixmap is null, using default fade")
-                    old_pix = None
-            except Exception as e:
-                logging.debug(f"Could not grab old pixmap: {e}")
+            set_paused(paused)
+        except MpvIpcError as e:
+            # mpv may still be starting; the controller retries
+            logging.debug(f"Auto-pause could not reach the video wallpaper: {e}")
+            return False
+        return True
+
+    def _on_power_poster(self, poster: str):
+        if poster:
+            if not self.controller.current_is_video:
+                return
+            self._power_poster_video = self.config.get_last_video()
+            logging.info(f"Power saving: showing a still instead of {self._power_poster_video}")
+            self.apply_pipeline.submit(poster, remember=False)
+        elif self._power_poster_video:
+            logging.info("Power saving over, resuming the video wallpaper")
+            self._apply_video(self._power_poster_video)
+
+    def _on_fade_image_loaded(self, request_id: int, image_path: str, new_pix: QPixmap):
+        if request_id != self._fade_request:
+            return
+        # Try to get old pixmap, but continue if it fails
+        old_pix = None
+        try:
+            old_pix = self.grab()
+            if old_pix.isNull():
+                logging.debug("Old pixmap is null, using default fade")
                 old_pix = None
-            
-            # Setup fade overlay
-            self.fade_overlay.set_pixmaps(old_pix, new_pix)
-            self.fade_overlay.show()
-            self.fade_overlay.raise_()
-            self.fade_overlay.animate_to(duration=650)
-            
-            # Apply wallpaper
-            self.controller.start_image(image_path)
-            self.config.set_last_video(image_path)
-            
-            # Hide overlay after animation
-            QTimer.singleShot(700, self.fade_overlay.hide)
-            self._set_status(f"Image applied: {Path(image_path).name}")
-            self._update_url_input(image_path)
-            logging.info(f"Image wallpaper applied with fade: {Path(image_path).name}")
-            
         except Exception as e:
-            logging.error(f"Fade apply failed: {e}", exc_info=True)
-            # Fallback to direct application without fade
-            try:
-                logging.info("Attempting direct image application without fade")
-                self.controller.start_image(image_path)
-                self.config.set_last_video(image_path)
-                self._set_status(f"Image applied (no fade): {Path(image_path).name}")
-                self._update_url_input(image_path)
-            except Exception as fallback_error:
-                logging.error(f"Fallback image application also failed: {fallback_error}")
-                QMessageBox.warning(self, "Error", f"Failed to apply image: {fallback_error}")
+            logging.debug(f"Could not grab old pixmap: {e}")
+            old_pix = None
+
+        # Setup fade overlay; it hides itself and releases both pixmaps when done
+        self.fade_overlay.set_pixmaps(old_pix, new_pix)
+        self.fade_overlay.show()
+        self.fade_overlay.raise_()
+        self.fade_overlay.animate_to(duration=650)
+
+    def _on_fade_image_failed(self, request_id: int, image_path: str, error: str):
+        if request_id == self._fade_request:
+            logging.debug(f"No fade preview for {image_path}: {error}")
 
     # Utility methods - FIXED: Proper media type separation
     def _get_media_files(self, media_type="all"):
         """Get media files based on current range and media type - FIXED LOGIC"""
-        logging.debug(f"Getting media files - type: {media_type}, range: {self.current_range}")
+        logger.debug("Getting media files - type: %s, range: %s", media_type, self.current_range)
         files = []
         
         # Define search folders based on CURRENT SOURCE (not just range)
@@ -1820,7 +2125,7 @@ class TapeciarniaApp(QMainWindow):
                 search_folders = [VIDEOS_DIR, IMAGES_DIR, FAVS_DIR]
             source_type = "range-based"
         
-        logging.debug(f"Using source: {source_type}, folders: {[str(f) for f in search_folders]}")
+        logger.debug("Using source: %s, folders: %s", source_type, search_folders)
         
         # Define extensions based on media type
         if media_type == "mp4":
@@ -1830,16 +2135,18 @@ class TapeciarniaApp(QMainWindow):
         else:
             extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.mp4', '.mkv', '.webm', '.avi', '.mov')
         
+        animation_links = get_animation_links()
         for folder in search_folders:
             if folder.exists():
+                # Animated originals are listed through their linked video
                 folder_files = [
                     f for f in folder.iterdir() 
-                    if f.is_file() and f.suffix.lower() in extensions
+                    if f.is_file() and f.suffix.lower() in extensions and not animation_links.is_linked_original(f)
                 ]
                 files.extend(folder_files)
-                logging.debug(f"Found {len(folder_files)} files in {folder}")
+                logger.debug("Found %d files in %s", len(folder_files), folder)
         
-        logging.debug(f"Total media files found: {len(files)} from {source_type}")
+        logger.debug("Total media files found: %d from %s", len(files), source_type)
         return files
 
     def _get_range_display_name(self):
@@ -1934,16 +2241,9 @@ class TapeciarniaApp(QMainWindow):
             # self.progress_dialog.show()
             self.progress_dialog.update_progress(0, "Starting download...")
             
-            # Determine destination folder and filename
-            if is_animated:
-                dest_folder = VIDEOS_DIR
-            else:
-                dest_folder = IMAGES_DIR
-            
-            # Generate unique filename
-            # timestamp = int(time.time())
-            filename = f"{url.split("/")[-1]}"
-            download_path = dest_folder / filename
+            # Download into staging; moved into Videos/Images once complete
+            filename = self._get_safe_filename(url.split("/")[-1])
+            download_path = get_staging_path(filename)
             
             # Start download thread
             if is_animated:
@@ -1977,6 +2277,7 @@ class TapeciarniaApp(QMainWindow):
         Handle successful online wallpaper download
         """
         logging.info(f"Online download completed: {file_path}")
+        self.connectivity.report_success()
         self._update_shuffle_button_states(None)
         
         # Close progress dialog
@@ -1989,6 +2290,18 @@ class TapeciarniaApp(QMainWindow):
             self._fallback_to_local_shuffle(is_animated)
             return
         
+        # Move out of staging into the collection (no confirmation for online shuffle).
+        # Cache hits already point at a file in the collection and are used in place.
+        try:
+            if is_staged_file(Path(file_path)):
+                dest_folder = VIDEOS_DIR if is_animated else IMAGES_DIR
+                file_path = str(commit_staged_file(Path(file_path), dest_folder))
+                self._process_imported_file(Path(file_path))
+        except Exception as e:
+            logging.error(f"Failed to move online wallpaper into collection: {e}")
+            self._fallback_to_local_shuffle(is_animated)
+            return
+        
         # Update URL input
         if hasattr(self.ui, 'urlInput'):
             self.ui.urlInput.setText(file_path)
@@ -2026,19 +2339,20 @@ class TapeciarniaApp(QMainWindow):
         is_animated = "animated" in error_msg.lower() or "video" in error_msg.lower()
         self._fallback_to_local_shuffle(is_animated)
 
-    def _fallback_to_local_shuffle(self, is_animated: bool):
+    def _fallback_to_local_shuffle(self, is_animated: bool, notify: bool = True):
         """
         Fallback to local shuffle when online fails
         """
         logging.warning(f"Falling back to local shuffle for {'animated' if is_animated else 'static'}")
         
         # Show warning message
-        QMessageBox.warning(
-            self,
-            "Online Unavailable",
-            "Could not fetch online wallpaper. Using local collection instead.",
-            QMessageBox.StandardButton.Ok
-        )
+        if notify:
+            QMessageBox.warning(
+                self,
+                "Online Unavailable",
+                "Could not fetch online wallpaper. Using local collection instead.",
+                QMessageBox.StandardButton.Ok
+            )
         
         # Use local shuffle
         if is_animated:
@@ -2110,16 +2424,13 @@ class TapeciarniaApp(QMainWindow):
             self.ui.urlInput.setText(last_video)
             logging.info(f"Loaded last video from config: {last_video}")
 
-        # Load range preference
+        # Load range preference (the scheduler reads it from the shared config)
         self.current_range = self.config.get_range_preference()
-        self.scheduler.set_range(self.current_range)
         self._update_range_buttons_active(self.current_range)
         logging.info(f"Loaded range preference: {self.current_range}")
 
         # Load scheduler settings
         source, interval, enabled = self.config.get_scheduler_settings()
-        self.scheduler.source = source
-        self.scheduler.interval_minutes = interval
         
         if hasattr(self.ui, "interval_spinBox"):
             self.ui.interval_spinBox.setValue(interval)
@@ -2130,11 +2441,20 @@ class TapeciarniaApp(QMainWindow):
                 self.scheduler.start(self.scheduler.source, interval)
         
         logging.info(f"Loaded scheduler settings - source: {source}, interval: {interval}, enabled: {enabled}")
+
+        # Keep the range buttons in sync with edits made outside the window
+        self.config.changed.connect(self._on_config_changed)
         
         # Update UI state based on scheduler
         self._update_scheduler_ui_state()
         logging.info("Settings loaded successfully")
 
+    def _on_config_changed(self, key: str, value):
+        """React to config changes made by other components or by hand"""
+        if key == "range_preference" and value and value != self.current_range:
+            self.current_range = value
+            self._update_range_buttons_active(value)
+
     # System tray
     def _setup_tray(self):
         logging.debug("Setting up system tray")
@@ -44,14 +44,24 @@ class FadeOverlay(QWidget):
             painter.drawPixmap(self.rect(), self._pixmap_new)
 
     def animate_to(self, duration=600):
+        if self._anim is not None:
+            self._anim.stop()
         anim = QPropertyAnimation(self, b"overlayOpacity", self)
         anim.setStartValue(0.0)
         anim.setEndValue(1.0)
         anim.setDuration(duration)
         anim.setEasingCurve(QEasingCurve.Type.InOutQuad)
-        anim.start()
+        anim.finished.connect(self._on_animation_finished)
+        anim.start(QPropertyAnimation.DeletionPolicy.DeleteWhenStopped)
         self._anim = anim
 
+    def _on_animation_finished(self):
+        """Hide and drop both window-sized pixmaps; nothing draws them any more"""
+        self._anim = None
+        self.hide()
+        self._pixmap_old = None
+        self._pixmap_new = None
+
     def getOpacity(self):
         return self._opacity
 
@@ -115,8 +125,14 @@ class EnhancedDragDropWidget(QWidget):
         self.dropped_file_path = None
         self.original_wallpaper = None
         self.parent_app = parent
+        # Id of the apply job set_as_wallpaper() is waiting for
+        self._apply_job = None
         self.setup_ui()
         self.update_language()
+        pipeline = self.parent_app.apply_pipeline
+        pipeline.finished.connect(self._on_apply_finished)
+        pipeline.failed.connect(self._on_apply_failed)
+        pipeline.cancelled.connect(self._on_apply_cancelled)
     
     # Function for toggling visibility of buttons and upload icon
     def toggle_buttons_visibility(self, visible: bool):
@@ -373,27 +389,10 @@ class EnhancedDragDropWidget(QWidget):
                 if hasattr(self.parent_app, 'ui') and hasattr(self.parent_app.ui, 'urlInput'):
                     self.parent_app.ui.urlInput.setText(self.destination_path)
                 
-                # Apply the wallpaper
-                if self.is_video_file(self.destination_path):
-                    logging.info(f"Setting video wallpaper: {self.destination_path}")
-                    self.parent_app.controller.start_video(self.destination_path)
-                else:
-                    logging.info(f"Setting image wallpaper: {self.destination_path}")
-                    self.parent_app.controller.start_image(self.destination_path)
-                
-                # Show success message
-                self.upload_text.setText("Wallpaper set successfully!")
-                
-                # Update status
-                if hasattr(self.parent_app, '_set_status'):
-                    self.parent_app._set_status(f"Wallpaper set: {os.path.basename(self.destination_path)}")
-                
-                # Store in config
-                self.parent_app.config.set_last_video(self.destination_path)
-                logging.info(f"Wallpaper set successfully and saved to config: {os.path.basename(self.destination_path)}")
-                
-                # Hide buttons after successful set with delay
-                QTimer.singleShot(3000, self.reset_selection)
+                # Apply the wallpaper on the apply worker; the outcome arrives in _on_apply_*
+                logging.info(f"Setting wallpaper: {self.destination_path}")
+                self._apply_job = self.parent_app.apply_pipeline.submit(self.destination_path)
+                self.upload_text.setText("Setting wallpaper...")
                 
             except Exception as e:
                 logging.error(f"Failed to set wallpaper: {e}", exc_info=True)
@@ -403,9 +402,32 @@ class EnhancedDragDropWidget(QWidget):
             logging.warning("No destination path available for setting wallpaper")
             QMessageBox.warning(self, "Error", "No file available to set as wallpaper.")
     
+    def _on_apply_finished(self, job: dict):
+        if job["id"] != self._apply_job:
+            return
+        self._apply_job = None
+        self.upload_text.setText("Wallpaper set successfully!")
+        # Hide buttons after successful set with delay
+        QTimer.singleShot(3000, self.reset_selection)
+
+    def _on_apply_failed(self, job: dict):
+        # The main window shows the error itself
+        if job["id"] != self._apply_job:
+            return
+        self._apply_job = None
+        self.upload_text.setText("Failed to set wallpaper!")
+
+    def _on_apply_cancelled(self, job: dict):
+        # Another wallpaper was applied before this one reached the desktop
+        if job["id"] != self._apply_job:
+            return
+        self._apply_job = None
+        self.upload_text.setText("Wallpaper not set, another one was applied first")
+
     def reset_selection(self):
         """Reset to original selection state"""
         logging.info("Reset selection triggered")
+        self._apply_job = None
         self.dropped_file_path = None
         if hasattr(self, 'destination_path'):
             delattr(self, 'destination_path')
@@ -428,12 +450,8 @@ class EnhancedDragDropWidget(QWidget):
                 logging.info(f"Attempting to restore original wallpaper: {self.previous_wallpaper}")
                 
                 if os.path.exists(self.previous_wallpaper):
-                    if self.is_video_file(self.previous_wallpaper):
-                        logging.info("Restoring original video wallpaper")
-                        self.parent_app.controller.start_video(self.previous_wallpaper)
-                    else:
-                        logging.info("Restoring original image wallpaper")
-                        self.parent_app.controller.start_image(self.previous_wallpaper)
+                    # Not recorded as the last wallpaper; it was the desktop's own
+                    self.parent_app.apply_pipeline.submit(self.previous_wallpaper, remember=False)
                     
                     if hasattr(self.parent_app, '_set_status'):
                         self.parent_app._set_status("Original wallpaper restored")
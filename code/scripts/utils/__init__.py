@@ -1,11 +1,22 @@
-from .path_utils import *
-from .system_utils import *
-from .validators import *
-from .file_utils import *
+import importlib
+
+# Submodules are imported on first attribute access, so `import utils.path_utils`
+# does not drag in every helper (and its dependencies) at startup.
+_SUBMODULES = ('path_utils', 'system_utils', 'validators', 'file_utils')
 
 __all__ = [
     'get_collections_folder', 'COLLECTION_DIR', 'VIDEOS_DIR', 'IMAGES_DIR', 'FAVS_DIR',
     'which', 'current_system_locale', 'get_current_desktop_wallpaper', 'set_static_desktop_wallpaper',
     'is_image_url_or_path', 'is_video_url_or_path', 'validate_url_or_path', 'validate_cli_arg',
     'download_image', 'copy_to_collection', 'cleanup_temp_marker'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    for submodule in _SUBMODULES:
+        module = importlib.import_module(f".{submodule}", __name__)
+        if hasattr(module, name):
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
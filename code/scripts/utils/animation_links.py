@@ -0,0 +1,103 @@
+import os
+import json
+import threading
+import logging
+from pathlib import Path
+from typing import Optional
+
+from .path_utils import CACHE_DIR
+
+
+class AnimationLinks:
+    """
+    Links animated GIF/WebP wallpapers to the looping videos made from them.
+
+    The original stays in the collection; applying it plays the linked video
+    instead, and media listings show only the video. A link is dropped when
+    the video disappears or the original changes (size or mtime), so an edited
+    GIF gets converted again. Stored as JSON next to the other caches.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path) if path else CACHE_DIR / "animation_links.json"
+        self._lock = threading.Lock()
+        self._links = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                links = json.load(f)
+            self._links = links if isinstance(links, dict) else {}
+            logging.debug(f"Animation links loaded - {len(self._links)} entries")
+        except FileNotFoundError:
+            self._links = {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Animation links unreadable, starting empty: {e}")
+            self._links = {}
+
+    def _save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._links, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not save animation links: {e}")
+
+    @staticmethod
+    def _key(original) -> str:
+        return os.path.abspath(original)
+
+    @staticmethod
+    def _signature(original) -> Optional[list]:
+        try:
+            stat = os.stat(original)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def link(self, original, video):
+        """Record that video was made from original"""
+        signature = self._signature(original)
+        if signature is None:
+            return
+        with self._lock:
+            self._links[self._key(original)] = {"video": os.path.abspath(video), "source": signature}
+            self._save()
+        logging.info(f"Linked animated wallpaper {Path(original).name} -> {Path(video).name}")
+
+    def video_for(self, original) -> Optional[str]:
+        """The linked video for original, or None if there is none (or it is stale)"""
+        key = self._key(original)
+        with self._lock:
+            entry = self._links.get(key)
+        if not entry:
+            return None
+        if entry.get("source") != self._signature(original) or not os.path.exists(entry.get("video", "")):
+            logging.debug(f"Dropping stale animation link for {original}")
+            with self._lock:
+                self._links.pop(key, None)
+                self._save()
+            return None
+        return entry["video"]
+
+    def is_linked_original(self, path) -> bool:
+        """Cheap check for listings: does path have a (still existing) video made from it?"""
+        entry = self._links.get(self._key(path))
+        return bool(entry) and os.path.exists(entry.get("video", ""))
+
+
+_animation_links = None
+_animation_links_lock = threading.Lock()
+
+
+def get_animation_links() -> AnimationLinks:
+    """Return the process-wide animation link registry"""
+    global _animation_links
+    if _animation_links is None:
+        with _animation_links_lock:
+            if _animation_links is None:
+                _animation_links = AnimationLinks()
+    return _animation_links
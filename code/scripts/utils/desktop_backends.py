@@ -0,0 +1,373 @@
+import os
+import shutil
+import logging
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.parse import unquote
+
+# Linux desktop wallpaper backends (GNOME, KDE Plasma, XFCE, sway/swaybg,
+# feh, xwallpaper) behind one registry. The registry probes every backend once,
+# in parallel, picks the one for the running session and caches the choice
+# until the session environment or PATH changes; applying a wallpaper then is
+# a single call into the chosen backend. No Qt here: system_utils uses it.
+
+# Environment that decides the backend; the probe is redone when it changes
+SESSION_VARIABLES = ("XDG_CURRENT_DESKTOP", "XDG_SESSION_DESKTOP", "DESKTOP_SESSION",
+                     "WAYLAND_DISPLAY", "DISPLAY", "SWAYSOCK", "PATH")
+
+# Players for video wallpapers, looked up in the same probe
+PLAYER_TOOLS = ("xwinwrap", "mpv")
+
+COMMAND_TIMEOUT = 5
+
+
+def _run(command: list, input: str = None) -> Optional[subprocess.CompletedProcess]:
+    """Run a backend command; None (and a log entry) when it cannot run at all"""
+    try:
+        return subprocess.run(command, input=input, capture_output=True, text=True, timeout=COMMAND_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        logging.error(f"{command[0]} timed out after {COMMAND_TIMEOUT} s")
+    except OSError as e:
+        logging.error(f"{command[0]} could not run: {e}")
+    return None
+
+
+def _succeeded(result: Optional[subprocess.CompletedProcess], what: str) -> bool:
+    if result is None:
+        return False
+    if result.returncode != 0:
+        logging.error(f"{what} failed - returncode: {result.returncode}, stderr: {result.stderr.strip()}")
+        return False
+    return True
+
+
+def _path_from_uri(value: str) -> Optional[str]:
+    value = value.strip().strip("'\"")
+    if value.startswith("file://"):
+        return unquote(value[7:])
+    return value or None
+
+
+def _gvariant_string(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+class DesktopBackend:
+    """
+    One way of setting the desktop wallpaper.
+
+    probe() runs once per session (on a registry worker thread) and returns
+    whether the backend can work here, filling in self.executables; it
+    may also record capabilities. matches() says whether the backend belongs
+    to the running session. set_wallpaper()/get_wallpaper() are then called
+    without any further lookups.
+    """
+
+    name = ""
+    # Session names (XDG_CURRENT_DESKTOP entries, lower case) the backend belongs to
+    sessions = ()
+    required = ()
+
+    def __init__(self):
+        self.executables = {}
+
+    def probe(self, which: Callable) -> bool:
+        self.executables = {name: which(name) for name in self.required}
+        return all(self.executables.values())
+
+    def matches(self, env) -> bool:
+        current = {part.strip().lower() for part in env.get("XDG_CURRENT_DESKTOP", "").split(":") if part.strip()}
+        return bool(current & set(self.sessions))
+
+    def set_wallpaper(self, path: Path) -> bool:
+        raise NotImplementedError
+
+    def get_wallpaper(self) -> Optional[str]:
+        return None
+
+
+class GnomeBackend(DesktopBackend):
+    """gsettings org.gnome.desktop.background; sets picture-uri-dark too where it exists (GNOME 42+)"""
+
+    name = "gnome"
+    sessions = ("gnome", "gnome-classic", "gnome-flashback", "unity", "ubuntu", "budgie", "pop")
+    required = ("gsettings",)
+    SCHEMA = "org.gnome.desktop.background"
+
+    def __init__(self):
+        super().__init__()
+        self.has_dark = False
+
+    def probe(self, which: Callable) -> bool:
+        if not super().probe(which):
+            return False
+        self.executables["dconf"] = which("dconf")
+        result = _run([self.executables["gsettings"], "list-keys", self.SCHEMA])
+        if result is None or result.returncode != 0:
+            # gsettings without the GNOME schemas (e.g. installed by another app)
+            return False
+        self.has_dark = "picture-uri-dark" in result.stdout.split()
+        return True
+
+    def set_wallpaper(self, path: Path) -> bool:
+        uri = path.as_uri()
+        if self.has_dark and self.executables.get("dconf"):
+            # Both keys in one write
+            settings = f"[/]\npicture-uri={_gvariant_string(uri)}\npicture-uri-dark={_gvariant_string(uri)}\n"
+            return _succeeded(_run([self.executables["dconf"], "load", "/org/gnome/desktop/background/"],
+                                   input=settings), "dconf load")
+        keys = ("picture-uri", "picture-uri-dark") if self.has_dark else ("picture-uri",)
+        return all(_succeeded(_run([self.executables["gsettings"], "set", self.SCHEMA, key, uri]),
+                              f"gsettings set {key}") for key in keys)
+
+    def get_wallpaper(self) -> Optional[str]:
+        result = _run([self.executables["gsettings"], "get", self.SCHEMA, "picture-uri"])
+        return _path_from_uri(result.stdout) if _succeeded(result, "gsettings get") else None
+
+
+class KdeBackend(DesktopBackend):
+    """plasma-apply-wallpaperimage (Plasma 5.24+); the current image is read from the applet config"""
+
+    name = "kde"
+    sessions = ("kde", "plasma")
+    required = ("plasma-apply-wallpaperimage",)
+    APPLETS_CONFIG = Path.home() / ".config" / "plasma-org.kde.plasma.desktop-appletsrc"
+
+    def set_wallpaper(self, path: Path) -> bool:
+        return _succeeded(_run([self.executables["plasma-apply-wallpaperimage"], str(path)]),
+                          "plasma-apply-wallpaperimage")
+
+    def get_wallpaper(self) -> Optional[str]:
+        try:
+            lines = self.APPLETS_CONFIG.read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            return None
+        for line in lines:
+            if line.startswith("Image="):
+                return _path_from_uri(line[len("Image="):])
+        return None
+
+
+class XfceBackend(DesktopBackend):
+    """xfconf-query on the xfce4-desktop channel; every monitor/workspace image property found by the probe"""
+
+    name = "xfce"
+    sessions = ("xfce",)
+    required = ("xfconf-query",)
+
+    def __init__(self):
+        super().__init__()
+        self.properties = []
+
+    def probe(self, which: Callable) -> bool:
+        if not super().probe(which):
+            return False
+        result = _run([self.executables["xfconf-query"], "-c", "xfce4-desktop", "-l"])
+        if result is None or result.returncode != 0:
+            return False
+        self.properties = [line.strip() for line in result.stdout.splitlines() if line.strip().endswith("/last-image")]
+        # A fresh profile has none yet; xfdesktop reads this one
+        self.properties = self.properties or ["/backdrop/screen0/monitor0/workspace0/last-image"]
+        return True
+
+    def set_wallpaper(self, path: Path) -> bool:
+        # xfconf-query sets one property per run: one call per monitor/workspace
+        return all(_succeeded(_run([self.executables["xfconf-query"], "-c", "xfce4-desktop", "-p", prop,
+                                    "-n", "-t", "string", "-s", str(path)]), f"xfconf-query {prop}")
+                   for prop in self.properties)
+
+    def get_wallpaper(self) -> Optional[str]:
+        result = _run([self.executables["xfconf-query"], "-c", "xfce4-desktop", "-p", self.properties[0]])
+        if not _succeeded(result, "xfconf-query"):
+            return None
+        return result.stdout.strip() or None
+
+
+class SwayBackend(DesktopBackend):
+    """swaymsg on sway, else a swaybg process kept for the session (wlroots compositors)"""
+
+    name = "sway"
+    sessions = ("sway", "hyprland", "river", "wayfire", "labwc")
+    required = ("swaybg",)
+
+    def __init__(self):
+        super().__init__()
+        self._process = None
+
+    def probe(self, which: Callable) -> bool:
+        self.executables = {"swaybg": which("swaybg"), "swaymsg": which("swaymsg")}
+        return bool(self.executables["swaybg"] or self.executables["swaymsg"])
+
+    def matches(self, env) -> bool:
+        return bool(env.get("SWAYSOCK")) or (bool(env.get("WAYLAND_DISPLAY")) and super().matches(env))
+
+    def set_wallpaper(self, path: Path) -> bool:
+        if self.executables.get("swaymsg") and os.environ.get("SWAYSOCK"):
+            return _succeeded(_run([self.executables["swaymsg"], "output", "*", "bg", str(path), "fill"]),
+                              "swaymsg output bg")
+        if not self.executables.get("swaybg"):
+            return False
+        previous = self._process
+        try:
+            self._process = subprocess.Popen([self.executables["swaybg"], "-m", "fill", "-i", str(path)],
+                                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                             start_new_session=True)
+        except OSError as e:
+            logging.error(f"swaybg could not run: {e}")
+            return False
+        # The new surface is up before the old one goes: no flash of the bare background
+        if previous is not None and previous.poll() is None:
+            previous.terminate()
+        return True
+
+
+class FehBackend(DesktopBackend):
+    """feh --bg-fill for bare X11 window managers; the current image is read from ~/.fehbg"""
+
+    name = "feh"
+    required = ("feh",)
+    FEHBG = Path.home() / ".fehbg"
+
+    def set_wallpaper(self, path: Path) -> bool:
+        return _succeeded(_run([self.executables["feh"], "--bg-fill", str(path)]),
+                          "feh --bg-fill")
+
+    def get_wallpaper(self) -> Optional[str]:
+        try:
+            script = self.FEHBG.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return None
+        for line in script.splitlines():
+            if line.startswith("feh "):
+                return line.rsplit(" ", 1)[-1].strip("'\"") or None
+        return None
+
+
+class XwallpaperBackend(DesktopBackend):
+    """xwallpaper --zoom for bare X11 window managers"""
+
+    name = "xwallpaper"
+    required = ("xwallpaper",)
+
+    def set_wallpaper(self, path: Path) -> bool:
+        return _succeeded(_run([self.executables["xwallpaper"], "--zoom", str(path)]), "xwallpaper")
+
+
+# In order of preference when no backend matches the session
+BACKENDS = (GnomeBackend, KdeBackend, XfceBackend, SwayBackend, FehBackend, XwallpaperBackend)
+
+
+class DesktopBackends:
+    """
+    The registry: probes every backend concurrently on first use and caches
+    which one to use for this session.
+
+    The probe result is kept until the session variables (SESSION_VARIABLES)
+    change, invalidate() is called, or the chosen backend's executable has
+    disappeared. Choice: the first available backend matching
+    XDG_CURRENT_DESKTOP (or sway's socket); else, on X11, the first available
+    generic setter (feh, xwallpaper); else any available backend.
+    """
+
+    def __init__(self, backends=None, env=None, which: Callable = shutil.which):
+        self.backends = [backend() for backend in (backends or BACKENDS)]
+        self.env = os.environ if env is None else env
+        self.which = which
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._active = None
+        self._available = []
+        self._tools = {}
+
+    def probe(self) -> dict:
+        """Probe once (cached) and describe the result"""
+        with self._lock:
+            fingerprint = tuple(self.env.get(name) for name in SESSION_VARIABLES)
+            if fingerprint != self._fingerprint:
+                self._probe()
+                self._fingerprint = fingerprint
+            return {"backend": self._active.name if self._active else None,
+                    "available": [backend.name for backend in self._available],
+                    "tools": dict(self._tools)}
+
+    def invalidate(self):
+        with self._lock:
+            self._fingerprint = None
+
+    def active(self) -> Optional[DesktopBackend]:
+        self.probe()
+        return self._active
+
+    def find_tool(self, name: str) -> Optional[str]:
+        """Path of a video player tool (see PLAYER_TOOLS), from the probe"""
+        self.probe()
+        if name not in self._tools:
+            self._tools[name] = self.which(name)
+        return self._tools[name]
+
+    def set_wallpaper(self, path) -> bool:
+        backend = self.active()
+        if backend is None:
+            logging.error("No desktop wallpaper backend available on this system")
+            return False
+        path = Path(path).resolve()
+        if backend.set_wallpaper(path):
+            logging.info(f"Linux wallpaper set via {backend.name}: {path}")
+            return True
+        self._check_executables(backend)
+        return False
+
+    def get_wallpaper(self) -> Optional[str]:
+        backend = self.active()
+        if backend is None:
+            return None
+        wallpaper = backend.get_wallpaper()
+        if wallpaper is None:
+            self._check_executables(backend)
+        return wallpaper
+
+    def _check_executables(self, backend: DesktopBackend):
+        # Uninstalled or moved since the probe: choose again next time
+        if any(path and not os.path.exists(path) for path in backend.executables.values()):
+            logging.warning(f"{backend.name} backend executables are gone, probing again on next use")
+            self.invalidate()
+
+    def _probe(self):
+        def probe_backend(backend: DesktopBackend) -> bool:
+            try:
+                return backend.probe(self.which)
+            except Exception as e:
+                logging.error(f"Probing the {backend.name} wallpaper backend failed: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=len(self.backends) + 1, thread_name_prefix="BackendProbe") as pool:
+            tools = pool.submit(lambda: {name: self.which(name) for name in PLAYER_TOOLS})
+            results = list(pool.map(probe_backend, self.backends))
+            self._tools = tools.result()
+        self._available = [backend for backend, ok in zip(self.backends, results) if ok]
+
+        x11_only = bool(self.env.get("DISPLAY")) and not self.env.get("WAYLAND_DISPLAY")
+        matching = [backend for backend in self._available if backend.matches(self.env)]
+        generic = [backend for backend in self._available
+                   if x11_only and isinstance(backend, (FehBackend, XwallpaperBackend))]
+        self._active = next(iter(matching + generic + self._available), None)
+        logging.info(f"Desktop wallpaper backends available: {[b.name for b in self._available]}, "
+                     f"using {self._active.name if self._active else 'none'}; players: {self._tools}")
+
+
+_desktop_backends = None
+_desktop_backends_lock = threading.Lock()
+
+
+def get_desktop_backends() -> DesktopBackends:
+    """Return the process-wide desktop backend registry"""
+    global _desktop_backends
+    if _desktop_backends is None:
+        with _desktop_backends_lock:
+            if _desktop_backends is None:
+                _desktop_backends = DesktopBackends()
+    return _desktop_backends
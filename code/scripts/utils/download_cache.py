@@ -0,0 +1,206 @@
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Optional
+
+from .path_utils import CACHE_DIR, STAGING_DIR
+
+
+class DownloadCache:
+    """
+    Maps a wallpaper URL to the local file it was downloaded to, together with
+    the HTTP validators (ETag / Last-Modified) and size of that response.
+
+    A repeat request for the same URL can then skip the network entirely while
+    the entry is fresh, or do a conditional GET and reuse the file on 304.
+    Every known URL is also kept in an in-memory set, so the common case of a
+    URL we have never seen is answered without touching SQLite.
+    """
+
+    # Within this window a cached file is reused without asking the server
+    FRESHNESS_SECONDS = 6 * 60 * 60
+
+    def __init__(self, db_path: Path = None):
+        self.db_path = Path(db_path) if db_path else CACHE_DIR / "downloads.sqlite"
+        self._lock = threading.Lock()
+        self._conn = None
+        self._known_urls = set()
+        self._open()
+
+    def _open(self):
+        """Open the database and load the membership set"""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Download threads share one connection, guarded by self._lock
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS downloads ("
+                " url TEXT PRIMARY KEY,"
+                " path TEXT NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " size INTEGER NOT NULL,"
+                " checked_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            self._known_urls = {row[0] for row in self._conn.execute("SELECT url FROM downloads")}
+            logging.info(f"Download cache opened - {len(self._known_urls)} entries: {self.db_path}")
+        except sqlite3.Error as e:
+            logging.error(f"Download cache unavailable, continuing without it: {e}")
+            self._conn = None
+            self._known_urls = set()
+
+    def might_contain(self, url: str) -> bool:
+        """Cheap in-memory membership check"""
+        return url in self._known_urls
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """
+        Return the cache entry for a URL if its local file is still intact.
+
+        Returns:
+            dict: path, etag, last_modified, size, checked_at - or None
+        """
+        if self._conn is None or not self.might_contain(url):
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, etag, last_modified, size, checked_at FROM downloads WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+        if not row:
+            self._known_urls.discard(url)
+            return None
+
+        entry = {
+            'path': row[0],
+            'etag': row[1],
+            'last_modified': row[2],
+            'size': row[3],
+            'checked_at': row[4],
+        }
+
+        # The file may have been deleted, moved or truncated since
+        try:
+            if Path(entry['path']).stat().st_size != entry['size']:
+                raise FileNotFoundError(entry['path'])
+        except OSError:
+            logging.debug(f"Cached file missing or changed, dropping entry: {entry['path']}")
+            self.remove(url)
+            return None
+
+        logging.debug(f"Download cache hit: {url} -> {entry['path']}")
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Check whether an entry can be reused without revalidating"""
+        return (time.time() - entry['checked_at']) < self.FRESHNESS_SECONDS
+
+    def conditional_headers(self, entry: Optional[dict]) -> dict:
+        """Build If-None-Match / If-Modified-Since headers for revalidation"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    @staticmethod
+    def _app_managed(path: str) -> bool:
+        """Whether path is a download the app owns (staging or cache), not a collection file"""
+        try:
+            resolved = Path(path).resolve()
+            return any(resolved.is_relative_to(folder.resolve()) for folder in (STAGING_DIR, CACHE_DIR))
+        except OSError:
+            return False
+
+    def store(self, url: str, path: str, etag: str = None, last_modified: str = None):
+        """
+        Record a completed download. When it replaces an entry whose file is
+        somewhere else (the server sent a new body), that older file is deleted
+        if it is still in staging or the cache and no other URL points at it.
+        Files already moved into the collection belong to the user and are kept.
+        """
+        if self._conn is None:
+            return
+        try:
+            size = Path(path).stat().st_size
+            with self._lock:
+                previous = self._conn.execute("SELECT path FROM downloads WHERE url = ?", (url,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO downloads (url, path, etag, last_modified, size, checked_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, str(path), etag, last_modified, size, time.time())
+                )
+                self._conn.commit()
+                orphan = None
+                if previous and previous[0] != str(path):
+                    shared = self._conn.execute("SELECT 1 FROM downloads WHERE path = ?", (previous[0],)).fetchone()
+                    orphan = None if shared or not self._app_managed(previous[0]) else previous[0]
+            self._known_urls.add(url)
+            logging.debug(f"Download cached: {url} -> {path} ({size} bytes, etag={etag})")
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"Could not record download in cache: {e}")
+            return
+
+        if orphan:
+            try:
+                Path(orphan).unlink()
+                logging.info(f"Removed superseded download of {url}: {orphan}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Could not remove superseded download {orphan}: {e}")
+
+    def touch(self, url: str):
+        """Mark an entry as revalidated now (after a 304)"""
+        if self._conn is None or not self.might_contain(url):
+            return
+        try:
+            with self._lock:
+                self._conn.execute("UPDATE downloads SET checked_at = ? WHERE url = ?", (time.time(), url))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Could not refresh cache entry: {e}")
+
+    def relocate(self, old_path: str, new_path: str):
+        """Follow a cached file when it is moved, e.g. out of staging"""
+        if self._conn is None or not self._known_urls:
+            return
+        try:
+            with self._lock:
+                self._conn.execute("UPDATE downloads SET path = ? WHERE path = ?", (str(new_path), str(old_path)))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Could not relocate cache entry: {e}")
+
+    def remove(self, url: str):
+        """Forget a URL"""
+        self._known_urls.discard(url)
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM downloads WHERE url = ?", (url,))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Could not remove cache entry: {e}")
+
+
+_download_cache = None
+_download_cache_lock = threading.Lock()
+
+
+def get_download_cache() -> DownloadCache:
+    """Return the process-wide download cache"""
+    global _download_cache
+    if _download_cache is None:
+        with _download_cache_lock:
+            if _download_cache is None:
+                _download_cache = DownloadCache()
+    return _download_cache
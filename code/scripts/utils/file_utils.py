@@ -1,17 +1,19 @@
+import os
 import shutil
-import requests
 import re
 import logging
 from pathlib import Path
 from typing import Optional
 
-from .path_utils import IMAGES_DIR, TMP_DOWNLOAD_FILE
+from .path_utils import IMAGES_DIR, VIDEOS_DIR, FAVS_DIR, TMP_DOWNLOAD_FILE, STAGING_DIR
+from .download_cache import get_download_cache
 
 
 
 def download_image(url: str) -> str:
     """Download image from URL and return local path"""
     logging.info(f"Starting image download from: {url}")
+    import requests  # deferred: only needed once something is downloaded
     
     try:
         logging.debug("Making HTTP GET request with streaming")
@@ -154,6 +156,115 @@ def cleanup_temp_marker():
         logging.debug("No temporary download marker found to clean up")
 
 
+def get_staging_path(filename: str) -> Path:
+    """Return a unique path inside the staging directory for a new download"""
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    staged = STAGING_DIR / filename
+    counter = 1
+    while staged.exists():
+        staged = STAGING_DIR / f"{Path(filename).stem}_{counter}{Path(filename).suffix}"
+        counter += 1
+    logging.debug(f"Staging path allocated: {staged}")
+    return staged
+
+
+def is_staged_file(file_path: Path) -> bool:
+    """Check whether a file still lives in the staging directory"""
+    try:
+        return Path(file_path).resolve().parent == STAGING_DIR.resolve()
+    except OSError:
+        return False
+
+
+def is_collection_file(file_path: Path) -> bool:
+    """Check whether a file is already in one of the collection folders"""
+    try:
+        resolved = Path(file_path).resolve()
+        return any(resolved.parent == folder.resolve() for folder in (VIDEOS_DIR, IMAGES_DIR, FAVS_DIR))
+    except OSError:
+        return False
+
+
+def commit_staged_file(staged_file: Path, dest_folder: Path) -> Path:
+    """
+    Move a finished download from the staging directory into its collection folder.
+
+    The move is a single os.replace on the same filesystem, so the file is never
+    copied and never visible in the collection half-written. A file already in
+    the collection (a cached download reused) is returned as it is; any other
+    file is copied via copy_to_collection.
+
+    Args:
+        staged_file: Path of the completed download
+        dest_folder: Collection folder the user picked
+
+    Returns:
+        Path: Final location of the file
+    """
+    staged_file = Path(staged_file)
+    logging.info(f"Committing staged file - Source: {staged_file}, Destination: {dest_folder}")
+
+    if not staged_file.exists():
+        logging.error(f"Staged file does not exist: {staged_file}")
+        raise FileNotFoundError(f"Staged file not found: {staged_file}")
+
+    if not is_staged_file(staged_file):
+        if is_collection_file(staged_file) or staged_file.parent.resolve() == Path(dest_folder).resolve():
+            logging.debug("File already in the collection, reusing it")
+            return staged_file
+        return copy_to_collection(staged_file, dest_folder)
+
+    dest_folder.mkdir(parents=True, exist_ok=True)
+
+    # Deduplicate the final name the same way the UI always has
+    dest_path = dest_folder / staged_file.name
+    counter = 1
+    while dest_path.exists():
+        dest_path = dest_folder / f"{staged_file.stem}_{counter}{staged_file.suffix}"
+        counter += 1
+
+    os.replace(staged_file, dest_path)
+    get_download_cache().relocate(str(staged_file), str(dest_path))
+    logging.info(f"Staged file committed: {dest_path}")
+    return dest_path
+
+
+def discard_staged_file(staged_file: Path) -> bool:
+    """Delete a staged download the user decided not to keep"""
+    if not is_staged_file(staged_file):
+        logging.debug(f"Not a staged file, leaving in place: {staged_file}")
+        return False
+    return safe_delete_file(Path(staged_file))
+
+
+def cleanup_staging_dir() -> int:
+    """
+    Remove orphaned downloads left in the staging directory by a crash
+    or an unanswered destination dialog. Called once at startup.
+
+    Returns:
+        int: Number of files removed
+    """
+    logging.debug(f"Cleaning up staging directory: {STAGING_DIR}")
+    if not STAGING_DIR.exists():
+        return 0
+
+    removed = 0
+    for entry in STAGING_DIR.iterdir():
+        try:
+            if entry.is_dir():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
+            removed += 1
+        except Exception as e:
+            logging.warning(f"Could not remove orphaned staging entry {entry}: {e}")
+
+    if removed:
+        logging.info(f"Removed {removed} orphaned staging entries")
+    return removed
+
+
 def safe_delete_file(file_path: Path) -> bool:
     """
     Safely delete a file with comprehensive logging
@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import socket
+import struct
+import logging
+import itertools
+
+# Standard library only: this module is imported by the launcher before Qt, so a
+# second instance can hand its arguments to the running one and exit at once.
+#
+# Wire format, both directions: a 4-byte big-endian length, then that many bytes
+# of UTF-8 JSON. Requests look like
+#   {"id": 1, "command": "status", "args": {}}
+# and are answered with
+#   {"id": 1, "ok": true, "result": {...}}   or   {"id": 1, "ok": false, "error": "..."}
+# A request without an "id" is a notification and gets no reply.
+
+logger = logging.getLogger(__name__)
+
+SERVER_NAME = "Tapeciarnia_IPC"
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 1024 * 1024
+
+_request_ids = itertools.count(1)
+
+
+class IpcError(Exception):
+    """The running instance could not be reached or rejected a command"""
+
+
+def ipc_address(name: str = SERVER_NAME) -> str:
+    """
+    Where QLocalServer.listen(name) listens: a named pipe on Windows, otherwise
+    a Unix socket in QDir.tempPath() (TMPDIR, falling back to /tmp).
+    """
+    if sys.platform.startswith("win"):
+        return rf"\\.\pipe\{name}"
+    temp_dir = os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(temp_dir.rstrip("/") or "/", name)
+
+
+def encode_frame(message: dict) -> bytes:
+    payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ValueError(f"IPC message too large ({len(payload)} bytes)")
+    return HEADER.pack(len(payload)) + payload
+
+
+class FrameDecoder:
+    """Turns a byte stream into messages; bytes may arrive in any split"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list:
+        """Append received bytes and return every complete message. Raises ValueError on garbage."""
+        self._buffer += data
+        messages = []
+        while len(self._buffer) >= HEADER.size:
+            (length,) = HEADER.unpack_from(self._buffer)
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f"IPC frame too large ({length} bytes)")
+            end = HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            payload = bytes(self._buffer[HEADER.size:end])
+            del self._buffer[:end]
+            message = json.loads(payload.decode("utf-8"))
+            if not isinstance(message, dict):
+                raise ValueError("IPC message is not an object")
+            messages.append(message)
+        return messages
+
+
+def _connect(address: str, timeout: float):
+    """Connected socket (or pipe file on Windows) to the primary instance"""
+    if sys.platform.startswith("win"):
+        return open(address, "r+b", buffering=0)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _send(channel, data: bytes):
+    if isinstance(channel, socket.socket):
+        channel.sendall(data)
+    else:
+        channel.write(data)
+
+
+def _recv(channel, size: int) -> bytes:
+    if isinstance(channel, socket.socket):
+        return channel.recv(size)
+    return channel.read(size)
+
+
+def send_command(command: str, args: dict = None, timeout: float = 5.0, name: str = SERVER_NAME):
+    """
+    Run a command in the running instance and return its result.
+    Raises IpcError when no instance is running or the command failed.
+    """
+    request_id = next(_request_ids)
+    address = ipc_address(name)
+    try:
+        with _connect(address, timeout) as channel:
+            _send(channel, encode_frame({"id": request_id, "command": command, "args": args or {}}))
+            decoder = FrameDecoder()
+            while True:
+                data = _recv(channel, 65536)
+                if not data:
+                    raise IpcError("Connection closed before a reply arrived")
+                for reply in decoder.feed(data):
+                    if reply.get("id") == request_id:
+                        if not reply.get("ok"):
+                            raise IpcError(reply.get("error") or "Command failed")
+                        return reply.get("result")
+    except (OSError, ValueError) as e:
+        raise IpcError(f"Tapeciarnia is not reachable at {address}: {e}") from e
+
+
+def forward_to_primary(argv: list, timeout: float = 0.5, name: str = SERVER_NAME) -> bool:
+    """
+    Hand this process's arguments to a running instance as an "open"
+    notification. Returns False when nobody is listening (no socket, stale
+    socket after a crash, pipe busy), so the caller can start up normally.
+    """
+    address = ipc_address(name)
+    if not sys.platform.startswith("win") and not os.path.exists(address):
+        return False
+    try:
+        data = encode_frame({"command": "open", "args": {"argv": list(argv)}})
+        with _connect(address, timeout) as channel:
+            _send(channel, data)
+    except (OSError, ValueError) as e:
+        logger.debug("No primary instance at %s: %s", address, e)
+        return False
+    logger.info("Forwarded arguments to the primary instance")
+    return True
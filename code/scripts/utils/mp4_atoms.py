@@ -0,0 +1,72 @@
+import os
+import struct
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# ISO base media files (MP4, MOV, M4V) that can carry their index up front
+FASTSTART_EXTENSIONS = ('.mp4', '.m4v', '.mov')
+
+# A sane file has a handful of top-level boxes; stop on anything stranger
+MAX_TOP_LEVEL_BOXES = 1024
+
+
+def top_level_boxes(path: str) -> list:
+    """
+    List the top-level boxes of an ISO base media file as (type, offset, size).
+
+    Only the 8 or 16 byte box headers are read; the scan seeks over box
+    payloads, so it costs a few small reads whatever the file size. Raises
+    ValueError for data that is not a box structure.
+    """
+    boxes = []
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        offset = 0
+        while offset < file_size:
+            if len(boxes) >= MAX_TOP_LEVEL_BOXES:
+                raise ValueError(f"Too many top-level boxes in {path}")
+            f.seek(offset)
+            header = f.read(8)
+            if len(header) < 8:
+                # Trailing padding some muxers leave behind
+                break
+            size, box_type = struct.unpack(">I4s", header)
+            header_size = 8
+            if size == 1:
+                large = f.read(8)
+                if len(large) < 8:
+                    raise ValueError(f"Truncated box header at {offset} in {path}")
+                size = struct.unpack(">Q", large)[0]
+                header_size = 16
+            elif size == 0:
+                # Box runs to the end of the file
+                size = file_size - offset
+            if size < header_size or offset + size > file_size:
+                raise ValueError(f"Invalid box size {size} at {offset} in {path}")
+            boxes.append((box_type.decode("latin-1"), offset, size))
+            offset += size
+    return boxes
+
+
+def needs_faststart(path: str) -> Optional[bool]:
+    """
+    True when the movie header (moov) comes after the media data (mdat), so a
+    player has to seek to the end of the file before it can show a frame.
+    False when moov is already first, None when the file cannot be read as
+    MP4/MOV or has no moov at all (fragmented or broken).
+    """
+    try:
+        boxes = top_level_boxes(path)
+    except (OSError, ValueError) as e:
+        logger.debug("Atom scan failed for %s: %s", path, e)
+        return None
+    types = [box_type for box_type, _, _ in boxes]
+    if not types or types[0] not in ("ftyp", "wide", "free", "skip", "moov", "mdat", "pnot"):
+        return None
+    if "moov" not in types:
+        return None
+    if "mdat" not in types:
+        return False
+    return types.index("mdat") < types.index("moov")
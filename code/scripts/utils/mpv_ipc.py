@@ -0,0 +1,69 @@
+import os
+import sys
+import json
+import socket
+import logging
+import itertools
+from typing import Any
+
+# Client for mpv's JSON IPC (--input-ipc-server), used to pause and resume the
+# video wallpaper without restarting the player.
+
+logger = logging.getLogger(__name__)
+
+MPV_SOCKET_NAME = "mpvsocket"
+
+_request_ids = itertools.count(1)
+
+
+class MpvIpcError(Exception):
+    """mpv is not running with IPC enabled, or rejected the command"""
+
+
+def mpv_ipc_address(name: str = MPV_SOCKET_NAME) -> str:
+    """Value for mpv's --input-ipc-server"""
+    if sys.platform.startswith("win"):
+        return rf"\\.\pipe\{name}"
+    temp_dir = os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(temp_dir, f"tapeciarnia-{name}")
+
+
+def mpv_command(*command, timeout: float = 1.0, address: str = None) -> Any:
+    """Send one command (e.g. "set_property", "pause", True) and return its data"""
+    address = address or mpv_ipc_address()
+    request_id = next(_request_ids)
+    payload = (json.dumps({"command": list(command), "request_id": request_id}) + "\n").encode("utf-8")
+    try:
+        if sys.platform.startswith("win"):
+            with open(address, "r+b", buffering=0) as pipe:
+                pipe.write(payload)
+                lines = iter(pipe.readline, b"")
+                return _read_reply(lines, request_id)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(address)
+            sock.sendall(payload)
+            with sock.makefile("rb") as stream:
+                return _read_reply(iter(stream.readline, b""), request_id)
+    except (OSError, ValueError) as e:
+        raise MpvIpcError(f"mpv IPC at {address} failed: {e}") from e
+
+
+def _read_reply(lines, request_id: int) -> Any:
+    # mpv interleaves event messages with replies; skip until ours arrives
+    for line in lines:
+        message = json.loads(line)
+        if message.get("request_id") != request_id:
+            continue
+        if message.get("error") != "success":
+            raise MpvIpcError(message.get("error") or "unknown error")
+        return message.get("data")
+    raise MpvIpcError("mpv closed the connection without replying")
+
+
+def set_paused(paused: bool, address: str = None):
+    mpv_command("set_property", "pause", bool(paused), address=address)
+
+
+def is_paused(address: str = None) -> bool:
+    return bool(mpv_command("get_property", "pause", address=address))
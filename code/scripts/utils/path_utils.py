@@ -1,10 +1,11 @@
 # utils/path_utils.py
 import platform
+import shutil
 import subprocess
-import json
 import sys
 import os
 import logging
+from functools import cached_property
 from pathlib import Path
 
 
@@ -19,42 +20,167 @@ def get_app_root():
         base_path = Path(sys.argv[0]).resolve()
     return base_path.parent
 
-# Base paths
-BASE_DIR = get_app_root()
-ROOT_DIR = BASE_DIR.parent.parent
-CONFIG_PATH = ROOT_DIR / "config.json"
+class AppPaths:
+    """
+    Every location the app uses, resolved lazily on first access.
+
+    Nothing here touches the disk until a property is read, and directories are
+    only created by ensure_dirs(). Pass explicit locations (or set
+    TAPECIARNIA_HOME) to relocate the collection and config, e.g. for tests or a
+    portable install.
+    """
+
+    def __init__(self, base_dir=None, collection_dir=None, config_path=None):
+        self._base_dir = Path(base_dir) if base_dir else None
+        self._collection_dir = Path(collection_dir) if collection_dir else None
+        self._config_path = Path(config_path) if config_path else None
+        self._dirs_ensured = False
+
+        home_override = os.environ.get("TAPECIARNIA_HOME")
+        if home_override:
+            self._collection_dir = self._collection_dir or Path(home_override)
+            self._config_path = self._config_path or Path(home_override) / "config.json"
+
+    # Base paths
+    @cached_property
+    def base_dir(self) -> Path:
+        return self._base_dir or get_app_root()
+
+    @cached_property
+    def root_dir(self) -> Path:
+        return self.base_dir.parent.parent
+
+    @cached_property
+    def config_path(self) -> Path:
+        return self._config_path or self.root_dir / "config.json"
+
+    @cached_property
+    def translations_dir(self) -> Path:
+        return self.base_dir / "code" / "scripts" / "translations"
+
+    # Collection structure
+    @cached_property
+    def collection_dir(self) -> Path:
+        return self._collection_dir or Path.home() / "Pictures" / "Tapeciarnia"
+
+    @property
+    def videos_dir(self) -> Path:
+        return self.collection_dir / "Videos"
+
+    @property
+    def images_dir(self) -> Path:
+        return self.collection_dir / "Images"
+
+    @property
+    def favs_dir(self) -> Path:
+        return self.collection_dir / "Favorites"
+
+    # Downloads land here first and are renamed into their final folder on completion.
+    # Lives inside the collection so the rename never crosses a filesystem boundary.
+    @property
+    def staging_dir(self) -> Path:
+        return self.collection_dir / ".staging"
+
+    # Download cache database and other app-managed data
+    @property
+    def cache_dir(self) -> Path:
+        return self.collection_dir / ".cache"
+
+    # Screen-sized copies of large images, handed to the desktop instead of the original
+    @property
+    def renditions_dir(self) -> Path:
+        return self.cache_dir / "renditions"
+
+    # Screen-resolution proxies of video wallpapers, played instead of the original
+    @property
+    def proxies_dir(self) -> Path:
+        return self.cache_dir / "proxies"
+
+    # Online shuffle wallpapers downloaded ahead of time
+    @property
+    def prefetch_dir(self) -> Path:
+        return self.collection_dir / ".prefetch"
+
+    @property
+    def tmp_download_file(self) -> Path:
+        return self.collection_dir / "download_path.tmp"
+
+    def ensure_dirs(self):
+        """Create the collection folder structure (once per process)"""
+        if self._dirs_ensured:
+            return
+        for d in (self.collection_dir, self.videos_dir, self.images_dir, self.favs_dir,
+                  self.staging_dir, self.cache_dir, self.prefetch_dir):
+            d.mkdir(parents=True, exist_ok=True)
+        self._dirs_ensured = True
+        logging.debug(f"Collection folders ensured under {self.collection_dir}")
+
+
+_app_paths = None
+
+# Module-level names kept for existing imports, e.g. `from utils.path_utils import VIDEOS_DIR`
+_PATH_ATTRIBUTES = {
+    'BASE_DIR': 'base_dir',
+    'ROOT_DIR': 'root_dir',
+    'CONFIG_PATH': 'config_path',
+    'COLLECTION_DIR': 'collection_dir',
+    'VIDEOS_DIR': 'videos_dir',
+    'IMAGES_DIR': 'images_dir',
+    'FAVS_DIR': 'favs_dir',
+    'STAGING_DIR': 'staging_dir',
+    'CACHE_DIR': 'cache_dir',
+    'RENDITIONS_DIR': 'renditions_dir',
+    'PROXIES_DIR': 'proxies_dir',
+    'PREFETCH_DIR': 'prefetch_dir',
+    'TMP_DOWNLOAD_FILE': 'tmp_download_file',
+    'TRANSLATIONS_DIR': 'translations_dir',
+}
+
+
+def get_app_paths() -> AppPaths:
+    """Return the process-wide AppPaths"""
+    global _app_paths
+    if _app_paths is None:
+        _app_paths = AppPaths()
+    return _app_paths
+
+
+def set_app_paths(paths: AppPaths):
+    """
+    Replace the process-wide paths (tests, portable installs).
+    Must run before other modules import path constants from here.
+    """
+    global _app_paths
+    _app_paths = paths
+
+
+def __getattr__(name):
+    attribute = _PATH_ATTRIBUTES.get(name)
+    if attribute is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(get_app_paths(), attribute)
+
+
+def ensure_collection_dirs():
+    """Create the collection folders if they are missing"""
+    get_app_paths().ensure_dirs()
+
 
 # Collection structure
 def get_collections_folder() -> Path:
     """Return the main collection folder for all wallpapers"""
-    home = Path.home()
-    collection_dir = home / "Pictures" / "Tapeciarnia"
+    collection_dir = get_app_paths().collection_dir
     collection_dir.mkdir(parents=True, exist_ok=True)
     return collection_dir
 
-COLLECTION_DIR = get_collections_folder()
-VIDEOS_DIR = COLLECTION_DIR / "Videos"
-IMAGES_DIR = COLLECTION_DIR / "Images" 
-FAVS_DIR = COLLECTION_DIR / "Favorites"
-
-# Ensure folders exist
-for d in (COLLECTION_DIR, VIDEOS_DIR, IMAGES_DIR, FAVS_DIR):
-    d.mkdir(parents=True, exist_ok=True)
-
-TMP_DOWNLOAD_FILE = COLLECTION_DIR / "download_path.tmp"
-TRANSLATIONS_DIR = BASE_DIR / "code" / "scripts" / "translations"
-
-# Config file init
-if not CONFIG_PATH.exists():
-    CONFIG_PATH.write_text(json.dumps({}), encoding="utf-8")
-
 # Executable paths
 def get_mpv_path() -> Path:
     """Get MPV executable path"""
+    base_dir = get_app_paths().base_dir
     candidates = [
-        BASE_DIR / "bin" / "mpv" / "mpv.exe",
-        BASE_DIR / "bin" / "tools" / "mpv.exe",
-        BASE_DIR / "bin" / "mpv.exe",
+        base_dir / "bin" / "mpv" / "mpv.exe",
+        base_dir / "bin" / "tools" / "mpv.exe",
+        base_dir / "bin" / "mpv.exe",
     ]
     for c in candidates:
         if c.exists():
@@ -63,27 +189,61 @@ def get_mpv_path() -> Path:
 
 def get_weebp_path() -> Path:
     """Get weebp executable path for Windows wallpaper"""
+    base_dir = get_app_paths().base_dir
     candidates = [
-        BASE_DIR / "bin" / "weebp" / "wp.exe",
-        BASE_DIR / "bin" / "tools" / "wp.exe",
-        BASE_DIR / "bin" / "wp.exe",
+        base_dir / "bin" / "weebp" / "wp.exe",
+        base_dir / "bin" / "tools" / "wp.exe",
+        base_dir / "bin" / "wp.exe",
     ]
     for c in candidates:
         if c.exists():
             return c
     return None
 
+def _find_media_tool(name: str) -> Path:
+    """Bundled ffmpeg/ffprobe first, then PATH"""
+    base_dir = get_app_paths().base_dir
+    exe = f"{name}.exe" if sys.platform.startswith("win") else name
+    candidates = [
+        base_dir / "bin" / "ffmpeg" / exe,
+        base_dir / "bin" / "tools" / exe,
+        base_dir / "bin" / exe,
+    ]
+    for c in candidates:
+        if c.exists():
+            return c
+    found = shutil.which(name)
+    return Path(found) if found else None
+
+def get_ffmpeg_path() -> Path:
+    """Get ffmpeg executable path (None if not installed)"""
+    return _find_media_tool("ffmpeg")
+
+def get_ffprobe_path() -> Path:
+    """Get ffprobe executable path (None if not installed)"""
+    return _find_media_tool("ffprobe")
+
 def get_style_path() -> Path:
     """Get style file path"""
-    return BASE_DIR / "ui" / "style" / "style.qss"
+    return get_app_paths().base_dir / "ui" / "style" / "style.qss"
 
 def get_bin_path() -> Path:
     """Get binary folder path"""
-    return BASE_DIR / "bin" 
+    return get_app_paths().base_dir / "bin" 
 
 def get_tools_path() -> Path:
     """Get tools folder path"""
-    return BASE_DIR / "bin" / "tools"
+    return get_app_paths().base_dir / "bin" / "tools"
+
+def get_log_dir() -> Path:
+    """Per-user log folder (not created here)"""
+    if sys.platform.startswith("win"):
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+        return base / "Tapeciarnia" / "Logs"
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Logs" / "Tapeciarnia"
+    base = Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state")
+    return base / "tapeciarnia" / "logs"
 
 # Folder opening functionality
 def open_folder_in_explorer(folder_path: Path):
@@ -102,30 +262,32 @@ def open_folder_in_explorer(folder_path: Path):
 
 def get_folder_for_source(source_type: str) -> Path:
     """Get the corresponding folder path for a source type"""
+    paths = get_app_paths()
     folder_map = {
-        "favorites": FAVS_DIR,
-        "added": COLLECTION_DIR,
-        "super": COLLECTION_DIR,  # Fallback for super wallpaper
-        "all": COLLECTION_DIR,
-        "wallpaper": IMAGES_DIR,
-        "mp4": VIDEOS_DIR
+        "favorites": paths.favs_dir,
+        "added": paths.collection_dir,
+        "super": paths.collection_dir,  # Fallback for super wallpaper
+        "all": paths.collection_dir,
+        "wallpaper": paths.images_dir,
+        "mp4": paths.videos_dir
     }
-    return folder_map.get(source_type, COLLECTION_DIR)
+    return folder_map.get(source_type, paths.collection_dir)
 
 def get_folder_for_range(range_type: str) -> Path:
     """Get the corresponding folder path for a range type"""
+    paths = get_app_paths()
     folder_map = {
-        "all": COLLECTION_DIR,
-        "wallpaper": IMAGES_DIR,
-        "mp4": VIDEOS_DIR
+        "all": paths.collection_dir,
+        "wallpaper": paths.images_dir,
+        "mp4": paths.videos_dir
     }
-    return folder_map.get(range_type, COLLECTION_DIR)
+    return folder_map.get(range_type, paths.collection_dir)
 
 def get_icon_absolute_path(icon_filename):
     """
     Returns the absolute path to a specific icon file within the bundled assets.
     """
-    return os.path.join(BASE_DIR, 'ui', 'icons', icon_filename)
+    return os.path.join(get_app_paths().base_dir, 'ui', 'icons', icon_filename)
 
 # Backward compatibility
 get_app_root = get_app_root
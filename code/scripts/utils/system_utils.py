@@ -1,5 +1,4 @@
 import sys
-import subprocess
 import locale
 import shutil
 import ctypes
@@ -8,11 +7,12 @@ from pathlib import Path
 from typing import Optional
 import socket
 import os
-import requests
 import logging
 import json
 from PySide6.QtWidgets import QApplication
 
+from .desktop_backends import get_desktop_backends
+
 # logging = logging.getlogging()
 # logging.setLevel(logging.ERROR)
 
@@ -102,38 +102,12 @@ def get_current_desktop_wallpaper() -> Optional[str]:
     elif sys.platform.startswith("linux"):
         logging.debug("Linux platform detected for wallpaper retrieval")
         try:
-            logging.debug("Attempting to get wallpaper via gsettings")
-            res = subprocess.run(
-                ["gsettings", "get", "org.gnome.desktop.background", "picture-uri"],
-                capture_output=True, 
-                text=True,
-                timeout=10  # Add timeout to prevent hanging
-            )
-            
-            if res.returncode == 0:
-                val = res.stdout.strip().strip("'\"")
-                logging.debug(f"Raw gsettings output: {val}")
-                
-                if val.startswith("file://"):
-                    wallpaper_path = val[7:]
-                    logging.info(f"Current Linux wallpaper: {wallpaper_path}")
-                    return wallpaper_path
-                elif val:
-                    logging.info(f"Current Linux wallpaper (non-file URI): {val}")
-                    return val
-                else:
-                    logging.warning("gsettings returned empty wallpaper URI")
-                    return None
+            wallpaper_path = get_desktop_backends().get_wallpaper()
+            if wallpaper_path:
+                logging.info(f"Current Linux wallpaper: {wallpaper_path}")
             else:
-                logging.error(f"gsettings command failed - returncode: {res.returncode}, stderr: {res.stderr.strip()}")
-                return None
-                
-        except subprocess.TimeoutExpired:
-            logging.error("gsettings command timed out while retrieving wallpaper")
-            return None
-        except FileNotFoundError:
-            logging.error("gsettings command not found - likely not running on GNOME desktop")
-            return None
+                logging.warning("Desktop backend reported no wallpaper")
+            return wallpaper_path
         except Exception as e:
             logging.error(f"Error retrieving Linux wallpaper: {e}", exc_info=True)
             return None
@@ -182,34 +156,8 @@ def set_static_desktop_wallpaper(path: str) -> bool:
                 
         elif sys.platform.startswith("linux"):
             logging.debug("Linux platform detected for wallpaper setting")
-            try:
-                uri = f"file://{str(wallpaper_path.resolve())}"
-                logging.debug(f"Using URI for gsettings: {uri}")
-                
-                result = subprocess.run(
-                    ["gsettings", "set", "org.gnome.desktop.background", "picture-uri", uri],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode == 0:
-                    logging.info(f"Linux wallpaper set successfully via gsettings: {uri}")
-                    return True
-                else:
-                    logging.error(f"gsettings failed to set wallpaper - returncode: {result.returncode}")
-                    logging.error(f"gsettings stderr: {result.stderr.strip()}")
-                    return False
-                    
-            except subprocess.TimeoutExpired:
-                logging.error("gsettings command timed out while setting wallpaper")
-                return False
-            except FileNotFoundError:
-                logging.error("gsettings command not found - cannot set wallpaper on this Linux system")
-                return False
-            except Exception as e:
-                logging.error(f"Error setting Linux wallpaper: {e}", exc_info=True)
-                return False
+            # One call into the backend chosen by the startup probe
+            return get_desktop_backends().set_wallpaper(wallpaper_path)
         else:
             logging.warning(f"Unsupported platform for wallpaper setting: {sys.platform}")
             return False
@@ -265,18 +213,12 @@ def verify_wallpaper_access() -> bool:
         logging.debug("Windows platform supports wallpaper operations")
         return True
     elif sys.platform.startswith("linux"):
-        # Check if gsettings is available
-        try:
-            result = subprocess.run(["which", "gsettings"], capture_output=True, text=True)
-            if result.returncode == 0:
-                logging.debug("Linux system supports wallpaper operations via gsettings")
-                return True
-            else:
-                logging.warning("Linux system does not have gsettings - wallpaper operations may not work")
-                return False
-        except Exception as e:
-            logging.error(f"Error verifying Linux wallpaper access: {e}")
-            return False
+        backend = get_desktop_backends().active()
+        if backend:
+            logging.debug(f"Linux system supports wallpaper operations via {backend.name}")
+            return True
+        logging.warning("No desktop wallpaper backend found - wallpaper operations may not work")
+        return False
     else:
         logging.warning(f"Wallpaper operations not supported on platform: {sys.platform}")
         return False
@@ -297,21 +239,15 @@ def is_connected_to_internet(host="8.8.8.8", port=53, timeout=3):
         bool: True if connected, False otherwise.
     """
     try:
-        # Create a socket object
-        socket.setdefaulttimeout(timeout)
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        
-        # Attempt to connect to the host
-        s.connect((host, port))
-        
-        # Connection successful
-        s.close()
-        logging.info("Internet connection verified successfully.")
+        # Per-socket timeout; socket.setdefaulttimeout would change it process-wide
+        with socket.create_connection((host, port), timeout=timeout):
+            pass
+        logging.debug("Internet connection verified successfully.")
         return True
     
-    except socket.error as e:
+    except OSError as e:
         # Connection failed, indicating no internet access or a firewall block
-        logging.warning(f"Internet connection failed check: {e}")
+        logging.debug(f"Internet connection failed check: {e}")
         return False
     except Exception as e:
         # Catch all other potential errors (e.g., DNS resolution failure if host was a name)
@@ -353,32 +289,37 @@ def get_primary_screen_dimensions() -> tuple[int, int]:
 
 
 
-def fetch_shuffled_wallpaper(width: int, height: int, is_animated: bool = False,lang:str="pl") -> str | None:
+def _shuffle_api_url() -> str:
+    # TAPECIARNIA_SHUFFLE_API points the app at a local stand-in (bin/tools/fake_shuffle_api.py)
+    return os.environ.get("TAPECIARNIA_SHUFFLE_API", "https://tapeciarnia.pl/program/wybierz_tapete_2025.php")
+
+
+def request_shuffle_url(width: int, height: int, is_animated: bool = False, lang: str = "pl",
+                        timeout=(3.05, 7)) -> tuple:
     """
-    Fetches a shuffled wallpaper download URL from the server using a POST request.
+    Performs a single shuffle API request, without any retrying.
 
     Args:
         width (int): Device width in pixels.
         height (int): Device height in pixels.
         is_animated (bool): True for animated wallpapers (all_mp4), False for static (all).
+        lang (str): Interface language sent to the server.
+        timeout: requests timeout, (connect, read) in seconds.
 
     Returns:
-        str | None: The wallpaper download URL if successful, otherwise None.
+        tuple: (url, type) as reported by the server, type is "img" or "mp4".
+
+    Raises:
+        requests.exceptions.RequestException: on network and HTTP errors.
+        ValueError: if the response is not JSON or has no URL.
     """
-    BASE_URL = "https://tapeciarnia.pl/program/wybierz_tapete_2025.php"
+    import requests  # deferred: keeps it out of app startup
+
     # 1. Determine the 'pokaz' parameter based on the type of wallpaper
     pokaz_value = "all_mp4" if is_animated else "all"
-    
-    # 2. Construct the full URL with GET parameters (pokaz, x, y)
-    # Note: Although the user wants POST for variables, the base structure
-    # of the URL provided already includes these as GET parameters. 
-    # We will send the data in the POST body for robustness, but structure the URL 
-    # as provided by the user's example.
-    url = f"{BASE_URL}?pokaz={pokaz_value}&x={width}&y={height}"
-
-    # 3. Define the data to be sent via POST (optional, but good practice)
-    # Since the user explicitly mentioned sending variables via POST, we can
-    # place the critical data (or redundancy) in the body.
+
+    # 2. The endpoint takes the values in the query string, the POST body repeats them
+    url = f"{_shuffle_api_url()}?pokaz={pokaz_value}&x={width}&y={height}"
     post_data = {
         'x': width,
         'y': height,
@@ -386,62 +327,78 @@ def fetch_shuffled_wallpaper(width: int, height: int, is_animated: bool = False,
         'lang': lang
     }
 
-    logging.info(f"Requesting shuffle URL. Animated: {is_animated}. Dims: {width}x{height}")
     logging.debug(f"API URL: {url}")
     logging.debug(f"POST Data: {post_data}")
 
+    response = requests.post(url, data=post_data, timeout=timeout)
+    # Raise an exception for bad status codes (4xx or 5xx)
+    response.raise_for_status()
+
+    if 'application/json' not in response.headers.get('Content-Type', ''):
+        raise ValueError(f"API response was not JSON. Status: {response.status_code}. "
+                         f"Content Type: {response.headers.get('Content-Type')}")
+
     try:
-        # 4. Make the POST request
-        response = requests.post(
-            url, 
-            data=post_data,
-            timeout=10 # Set a reasonable timeout
-        )
-        
-        # Raise an exception for bad status codes (4xx or 5xx)
-        response.raise_for_status() 
+        data = response.json()
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to decode JSON response from the server: {e}")
 
-        # 5. Check the Content Type and attempt JSON parsing
-        if 'application/json' in response.headers.get('Content-Type', ''):
-            data = response.json()
-            
-            # Assuming the JSON response structure contains a key like 'url' or 'download_link'
-            # Adjust the key 'url' based on the actual response structure from the API
-            download_url:str = data.get('url') 
-            
+    download_url = data.get('url')
+    if not download_url:
+        raise ValueError(f"JSON response is missing the 'url' key. Full response: {data}")
+    return download_url, data.get('type')
 
-            if not is_animated:
-                if data.get("type") == "img":
-                    return download_url
-                else:
-                    return fetch_shuffled_wallpaper(width=width,height=height,is_animated=is_animated,lang=lang)
 
-            elif data.get("type") == "mp4":
-                logging.info(f"Successfully fetched shuffle URL: {download_url}")
-                return download_url
-            
-            else:
-                logging.error(f"JSON response is missing the 'url' key. Full response: {data}")
-                return None
-        else:
-            logging.error(f"API response was not JSON. Status: {response.status_code}. Content Type: {response.headers.get('Content-Type')}")
+def fetch_shuffled_wallpaper(width: int, height: int, is_animated: bool = False, lang: str = "pl",
+                             max_attempts: int = 3) -> str | None:
+    """
+    Fetches a shuffled wallpaper download URL from the server using a POST request.
+
+    The server sometimes answers with the wrong kind of wallpaper; such answers
+    are retried, but at most `max_attempts` requests are made in total.
+
+    Args:
+        width (int): Device width in pixels.
+        height (int): Device height in pixels.
+        is_animated (bool): True for animated wallpapers (all_mp4), False for static (all).
+        max_attempts (int): Upper bound on API requests for this call.
+
+    Returns:
+        str | None: The wallpaper download URL if successful, otherwise None.
+    """
+    import requests
+
+    logging.info(f"Requesting shuffle URL. Animated: {is_animated}. Dims: {width}x{height}")
+    expected_type = "mp4" if is_animated else "img"
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            download_url, wallpaper_type = request_shuffle_url(width, height, is_animated, lang)
+        except requests.exceptions.Timeout:
+            logging.error("API request timed out.")
+            return None
+        except requests.exceptions.ConnectionError:
+            logging.error("API connection error. Check internet connection and firewall.")
+            return None
+        except requests.exceptions.HTTPError as e:
+            logging.error(f"HTTP error occurred: {e}")
+            return None
+        except ValueError as e:
+            logging.error(str(e))
+            return None
+        except Exception as e:
+            logging.critical(f"An unexpected error occurred during API call: {e}")
             return None
 
-    except requests.exceptions.Timeout:
-        logging.error("API request timed out (10 seconds).")
-        return None
-    except requests.exceptions.ConnectionError:
-        logging.error("API connection error. Check internet connection and firewall.")
-        return None
-    except requests.exceptions.HTTPError as e:
-        logging.error(f"HTTP error occurred: {e}. Status: {response.status_code}")
-        return None
-    except json.JSONDecodeError:
-        logging.error("Failed to decode JSON response from the server.")
-        return None
-    except Exception as e:
-        logging.critical(f"An unexpected error occurred during API call: {e}")
-        return None
+        if wallpaper_type == expected_type:
+            logging.info(f"Successfully fetched shuffle URL: {download_url}")
+            return download_url
+
+        logging.warning(f"Shuffle API returned type '{wallpaper_type}', expected '{expected_type}' "
+                        f"(attempt {attempt}/{max_attempts})")
+
+    logging.error(f"Shuffle API did not return a '{expected_type}' wallpaper after {max_attempts} attempts")
+    return None
 
 def gen_name_from_url(url:str) -> str:
     return url.split("/")[-1]